@@ -9,21 +9,36 @@ Flask web dashboard to display:
 - Trade history
 """
 
-import os
 import json
+import hashlib
+import pickle
 import threading
-from datetime import datetime
-from flask import Flask, render_template, jsonify, send_from_directory
+import time
+from datetime import datetime, timezone
+from types import MappingProxyType
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory
 from pathlib import Path
 import pandas as pd
 import sqlite3
 
+from src.candle_store import get_candle_store
+from src.candles import CandleCache, align_range, bucket_bars_for, downsample_ohlc
+from src.config import get_config, get_config_manager
+from src.confluence import TIMEFRAME_SECONDS
+from src.engine import collect_live_state, snapshot_file
+from src.shared_snapshot import SnapshotReader
+from src.signal_history import SignalHistory, get_shared_signal_history
+from src.state_store import Snapshotter, load_state, state_path
+from src.execution_quality import get_execution_quality
+from src.trade_journal import get_trade_journal
+from src.zones import get_shared_zone_book
+
 # Create Flask app
 app = Flask(__name__, static_folder='static', template_folder='templates')
 app.config['JSON_SORT_KEYS'] = False
 
-# Global state
-dashboard_data = {
+# Global state: the refresher publishes immutable, versioned snapshots
+DEFAULT_DASHBOARD_DATA = {
     'symbol': 'US30m',
     'current_price': 0.0,
     'price_change': 0.0,
@@ -40,183 +55,292 @@ dashboard_data = {
     'total_profit_loss': 0.0,
     'trades_today': 0,
     'win_rate': 0.0,
+    'shadow': {'enabled': False, 'variants': [], 'last_bar_time': None, 'eval_ms': 0.0},
+    'regime': None,
 }
 
-# Load configuration
-def load_config():
-    """Load bot configuration."""
-    config_path = os.getenv('CONFIG_PATH', './config_us30.json')
-    try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
-    except:
-        return {}
-
-# Initialize data
-CONFIG = load_config()
 
-
-def get_open_tickets():
-    """Fetch open tickets from MT5 or database."""
+class DashboardSnapshot:
+    """
+    Immutable view of the dashboard state with pre-serialized JSON bodies
+    and ETags for every API view. Handlers never see a half-updated dict.
+    """
+
+    __slots__ = ('version', 'data', 'bodies', 'etags')
+
+    def __init__(self, version: int, data: dict):
+        self.version = version
+        self.data = MappingProxyType(data)
+        self.bodies = {}
+        self.etags = {}
+        for name, view in _build_views(data).items():
+            body = json.dumps(view, separators=(',', ':'), default=str).encode('utf-8')
+            self.bodies[name] = body
+            self.etags[name] = hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def _build_views(data: dict) -> dict:
+    """Payloads for each cached API endpoint."""
+    return {
+        # Shadow variants have their own (less frequently polled) view
+        'dashboard': {k: v for k, v in data.items() if k != 'shadow'},
+        'price': {
+            'symbol': data['symbol'],
+            'price': data['current_price'],
+            'change': data['price_change'],
+            'change_pct': data['price_change_pct'],
+            'timestamp': data['last_updated'],
+        },
+        'tickets': {
+            'tickets': data['open_tickets'],
+            'count': len(data['open_tickets']),
+            'total_pl': data['total_profit_loss'],
+            'timestamp': data['last_updated'],
+        },
+        'account': {
+            'balance': data['account_balance'],
+            'equity': data['equity'],
+            'free_margin': data['free_margin'],
+            'used_margin': data['used_margin'],
+            'margin_level': data['margin_level'],
+            'timestamp': data['last_updated'],
+        },
+        'status': {
+            'status': data['bot_status'],
+            'active_strategies': data['active_strategies'],
+            'symbol': data['symbol'],
+            'timestamp': data['last_updated'],
+        },
+        'shadow': dict(data['shadow'], timestamp=data['last_updated']),
+    }
+
+
+_snapshot = DashboardSnapshot(0, dict(DEFAULT_DASHBOARD_DATA))
+
+
+def current_snapshot() -> DashboardSnapshot:
+    """Latest published snapshot (a single atomic reference read)."""
+    return _snapshot
+
+
+def publish_snapshot(data: dict) -> DashboardSnapshot:
+    """
+    Publish new dashboard data. If nothing but the timestamp changed, the
+    previous snapshot (and its ETags) is kept, so clients get 304s;
+    ``last_updated`` therefore marks the last change.
+    """
+    global _snapshot
+    previous = _snapshot
+    unchanged = all(
+        previous.data.get(key) == value
+        for key, value in data.items() if key != 'last_updated'
+    )
+    if unchanged and len(previous.data) == len(data):
+        return previous
+    _snapshot = DashboardSnapshot(previous.version + 1, data)
+    return _snapshot
+
+
+def _cached_response(view: str):
+    """Serve a pre-serialized snapshot body, or 304 if the client has it."""
+    snap = _snapshot
+    etag = snap.etags[view]
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(snap.bodies[view], mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Snapshot-Version'] = str(snap.version)
+    return response
+
+
+# Shared, hot-reloaded configuration (same instance the executor uses)
+config_manager = get_config_manager()
+
+
+candle_cache = CandleCache()
+
+
+def get_rates_range(symbol, timeframe, start, end):
+    """Fetch OHLC bars for [start, end] (epoch seconds) from MT5, falling back to the local candle store."""
+    rates = get_mt5_rates_range(symbol, timeframe, start, end)
+    if rates is None or len(rates) == 0:
+        stored = get_candle_store(get_config()).range(symbol, timeframe, start, end)
+        if len(stored):
+            return stored
+    return rates
+
+
+def get_mt5_rates_range(symbol, timeframe, start, end):
+    """Fetch OHLC bars for [start, end] (epoch seconds) from MT5."""
     try:
         import MetaTrader5 as mt5
         
         if not mt5.initialize():
-            return []
+            return None
         
-        symbol = CONFIG.get('broker', {}).get('symbol', 'US30m')
-        positions = mt5.positions_get(symbol=symbol)
-        
-        if positions is None:
-            return []
-        
-        tickets = []
-        for pos in positions:
-            ticket = {
-                'ticket': pos.ticket,
-                'symbol': pos.symbol,
-                'type': 'BUY' if pos.type == 0 else 'SELL',
-                'volume': pos.volume,
-                'entry_price': pos.price_open,
-                'current_price': pos.price_current,
-                'profit_loss': pos.profit,
-                'profit_loss_pct': (pos.profit / (pos.volume * pos.price_open) * 100) if pos.price_open > 0 else 0,
-                'open_time': datetime.fromtimestamp(pos.time).isoformat() if pos.time > 0 else '',
-                'comment': pos.comment if pos.comment else '',
-            }
-            tickets.append(ticket)
-        
-        return tickets
+        tf_const = getattr(mt5, f'TIMEFRAME_{timeframe}')
+        return mt5.copy_rates_range(
+            symbol,
+            tf_const,
+            datetime.fromtimestamp(start, tz=timezone.utc),
+            datetime.fromtimestamp(end, tz=timezone.utc),
+        )
     except Exception as e:
-        print(f"Error fetching tickets: {e}")
-        return []
+        print(f"Error fetching rates: {e}")
+        return None
 
 
-def get_account_info():
-    """Get account information from MT5."""
+def get_trade_markers(symbol, start, end):
+    """Entry/exit markers for bot deals in [start, end] from MT5 history."""
     try:
         import MetaTrader5 as mt5
         
         if not mt5.initialize():
-            return {
-                'balance': 0,
-                'equity': 0,
-                'free_margin': 0,
-                'used_margin': 0,
-                'margin_level': 0,
-            }
-        
-        account_info = mt5.account_info()
-        if account_info is None:
-            return {
-                'balance': 0,
-                'equity': 0,
-                'free_margin': 0,
-                'used_margin': 0,
-                'margin_level': 0,
-            }
-        
-        return {
-            'balance': account_info.balance,
-            'equity': account_info.equity,
-            'free_margin': account_info.margin_free,
-            'used_margin': account_info.margin,
-            'margin_level': account_info.margin_level if account_info.margin > 0 else 0,
-        }
-    except Exception as e:
-        print(f"Error fetching account info: {e}")
-        return {
-            'balance': 0,
-            'equity': 0,
-            'free_margin': 0,
-            'used_margin': 0,
-            'margin_level': 0,
-        }
-
-
-def get_current_price():
-    """Get current US30 price from MT5."""
-    try:
-        import MetaTrader5 as mt5
-        
-        if not mt5.initialize():
-            return 0.0, 0.0, 0.0
-        
-        symbol = CONFIG.get('broker', {}).get('symbol', 'US30m')
-        tick = mt5.symbol_info_tick(symbol)
-        
-        if tick is None:
-            return 0.0, 0.0, 0.0
+            return []
         
-        # Get previous close (from yesterday or 1 day ago)
-        rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_D1, 1, 2)
-        if rates is not None and len(rates) >= 2:
-            prev_close = rates[0]['close']
-            current_price = tick.bid
-            change = current_price - prev_close
-            change_pct = (change / prev_close * 100) if prev_close > 0 else 0
-        else:
-            current_price = tick.bid
-            change = 0.0
-            change_pct = 0.0
+        deals = mt5.history_deals_get(
+            datetime.fromtimestamp(start, tz=timezone.utc),
+            datetime.fromtimestamp(end, tz=timezone.utc),
+            group=symbol,
+        )
+        if deals is None:
+            return []
         
-        return current_price, change, change_pct
+        magic = get_config().execution.magic_number
+        markers = []
+        for deal in deals:
+            if deal.symbol != symbol or (magic and deal.magic != magic):
+                continue
+            if deal.type not in (mt5.DEAL_TYPE_BUY, mt5.DEAL_TYPE_SELL):
+                continue
+            markers.append({
+                'time': deal.time,
+                'price': deal.price,
+                'kind': 'trade',
+                'side': 'BUY' if deal.type == mt5.DEAL_TYPE_BUY else 'SELL',
+                'entry': 'in' if deal.entry == mt5.DEAL_ENTRY_IN else 'out',
+                'ticket': deal.position_id,
+            })
+        return markers
     except Exception as e:
-        print(f"Error fetching price: {e}")
-        return 0.0, 0.0, 0.0
+        print(f"Error fetching deals: {e}")
+        return []
+
+
+def build_candle_payload(symbol, timeframe, start, end, bucket_bars):
+    """Downsampled candles plus trade markers for one aligned range."""
+    rates = get_rates_range(symbol, timeframe, start, end)
+    return {
+        'candles': downsample_ohlc(rates, bucket_bars, TIMEFRAME_SECONDS[timeframe]),
+        'markers': get_trade_markers(symbol, start, end),
+    }
+
+
+def restore_dashboard_state():
+    """Publish the last saved dashboard view so a restart doesn't show zeros."""
+    config = get_config()
+    saved = load_state(state_path(config, 'dashboard'), config.data.state_max_age_hours * 3600)
+    if saved and saved.get('data'):
+        data = dict(DEFAULT_DASHBOARD_DATA)
+        data.update(saved['data'])
+        data['bot_status'] = 'restored'
+        publish_snapshot(data)
 
 
 def update_dashboard_data():
-    """Update dashboard data continuously."""
-    global dashboard_data
-    
+    """Update dashboard data continuously (single-process mode)."""
+    config = get_config()
+    snapshotter = Snapshotter(
+        state_path(config, 'dashboard'),
+        config.data.state_interval_seconds,
+    )
     while True:
-        try:
-            # Get current price
-            price, change, change_pct = get_current_price()
-            dashboard_data['current_price'] = price
-            dashboard_data['price_change'] = change
-            dashboard_data['price_change_pct'] = change_pct
-            
-            # Get account info
-            account_info = get_account_info()
-            dashboard_data['account_balance'] = account_info['balance']
-            dashboard_data['equity'] = account_info['equity']
-            dashboard_data['free_margin'] = account_info['free_margin']
-            dashboard_data['used_margin'] = account_info['used_margin']
-            dashboard_data['margin_level'] = account_info['margin_level']
-            
-            # Get open tickets
-            tickets = get_open_tickets()
-            dashboard_data['open_tickets'] = tickets
-            
-            # Calculate metrics
-            total_pl = sum([t['profit_loss'] for t in tickets])
-            dashboard_data['total_profit_loss'] = total_pl
-            
-            # Get active strategies
-            dashboard_data['active_strategies'] = CONFIG.get('strategies', {}).get('active', [])
-            
-            # Update timestamp
-            dashboard_data['last_updated'] = datetime.now().isoformat()
-            dashboard_data['bot_status'] = 'running'
-            
-        except Exception as e:
-            print(f"Error updating dashboard: {e}")
-            dashboard_data['bot_status'] = 'error'
+        data = collect_live_state(dict(_snapshot.data), config_manager.current)
+
+        # Publish a new immutable snapshot
+        snap = publish_snapshot(data)
+        snapshotter.maybe_save(lambda: {'data': dict(snap.data)})
         
         # Update every 2 seconds
-        import time
         time.sleep(2)
 
 
 def init_live_stream():
-    """Initialize live data streaming."""
+    """Initialize live data streaming (engine runs in this process)."""
+    config_manager.start_watching()
+    restore_dashboard_state()
+
     # Start background thread for data updates
     update_thread = threading.Thread(target=update_dashboard_data, daemon=True)
     update_thread.start()
 
 
+# Zones and signal ring published by a separate engine process (None in single-process mode)
+_engine_state = None
+
+
+def follow_engine_snapshot(poll_seconds: float = 0.25, stale_after: float = 10.0):
+    """
+    Mirror the engine's shared snapshot into dashboard snapshots (split mode).
+    Reads are lock-free copies; the engine is never blocked.
+    """
+    global _engine_state
+    reader = SnapshotReader(snapshot_file(get_config()))
+    while True:
+        try:
+            update = reader.read()
+            if update is not None:
+                _, payload = update
+                data = dict(DEFAULT_DASHBOARD_DATA)
+                data.update(payload['data'])
+                state = _engine_state or {}
+                # The signal ring is mapped once and queried in place
+                history = state.get('signals')
+                path = payload['signals_file']
+                if path is not None and (history is None or str(history.path) != path):
+                    history = SignalHistory.open(path)
+                # Zones are only unpickled when the engine's zone book changed
+                zones = state.get('zones')
+                if zones is None or state.get('zones_version') != payload['zones_version']:
+                    zones = pickle.loads(payload['zones'])
+                _engine_state = {'zones': zones, 'zones_version': payload['zones_version'], 'signals': history}
+                publish_snapshot(data)
+            elif reader.published_at and time.time() - reader.published_at > stale_after:
+                if _snapshot.data['bot_status'] != 'stale':
+                    publish_snapshot(dict(_snapshot.data, bot_status='stale'))
+        except Exception as e:
+            print(f"Error reading engine snapshot: {e}")
+        time.sleep(poll_seconds)
+
+
+def init_engine_reader():
+    """Serve state published by a separate engine process (``src.engine``)."""
+    config_manager.start_watching()
+    restore_dashboard_state()
+    publish_seconds = get_config().get('engine', {}).get('publish_seconds', 2)
+    threading.Thread(
+        target=follow_engine_snapshot,
+        kwargs={'stale_after': max(10.0, publish_seconds * 5)},
+        daemon=True,
+    ).start()
+
+
+def _signal_history():
+    state = _engine_state
+    if state is not None and state['signals'] is not None:
+        return state['signals']
+    return get_shared_signal_history()
+
+
+def _active_zones():
+    state = _engine_state
+    if state is not None:
+        return state['zones']
+    return [z.to_dict() for z in get_shared_zone_book().active()]
+
+
 @app.route('/')
 def index():
     """Main dashboard page."""
@@ -226,53 +350,205 @@ def index():
 @app.route('/api/dashboard')
 def api_dashboard():
     """API endpoint for dashboard data."""
-    return jsonify(dashboard_data)
+    return _cached_response('dashboard')
 
 
 @app.route('/api/price')
 def api_price():
     """API endpoint for current price."""
-    return jsonify({
-        'symbol': dashboard_data['symbol'],
-        'price': dashboard_data['current_price'],
-        'change': dashboard_data['price_change'],
-        'change_pct': dashboard_data['price_change_pct'],
-        'timestamp': dashboard_data['last_updated'],
-    })
+    return _cached_response('price')
 
 
 @app.route('/api/tickets')
 def api_tickets():
     """API endpoint for open tickets."""
-    return jsonify({
-        'tickets': dashboard_data['open_tickets'],
-        'count': len(dashboard_data['open_tickets']),
-        'total_pl': dashboard_data['total_profit_loss'],
-        'timestamp': dashboard_data['last_updated'],
-    })
+    return _cached_response('tickets')
 
 
 @app.route('/api/account')
 def api_account():
     """API endpoint for account info."""
-    return jsonify({
-        'balance': dashboard_data['account_balance'],
-        'equity': dashboard_data['equity'],
-        'free_margin': dashboard_data['free_margin'],
-        'used_margin': dashboard_data['used_margin'],
-        'margin_level': dashboard_data['margin_level'],
-        'timestamp': dashboard_data['last_updated'],
-    })
+    return _cached_response('account')
 
 
 @app.route('/api/status')
 def api_status():
     """API endpoint for bot status."""
+    return _cached_response('status')
+
+
+@app.route('/api/shadow')
+def api_shadow():
+    """API endpoint for shadow (paper) strategy variants."""
+    return _cached_response('shadow')
+
+
+@app.route('/api/candles')
+def api_candles():
+    """
+    API endpoint for chart candles.
+
+    Query params: symbol, timeframe (M1..D1), start/end (epoch seconds),
+    width (client pixel width; candles are bucket-merged to fit).
+    """
+    snap = _snapshot
+    symbol = request.args.get('symbol', snap.data['symbol'])
+    timeframe = request.args.get('timeframe', 'M5').upper()
+    if timeframe not in TIMEFRAME_SECONDS:
+        return jsonify({'error': f'Unknown timeframe {timeframe}'}), 400
+
+    tf_seconds = TIMEFRAME_SECONDS[timeframe]
+    now = int(datetime.now().timestamp())
+    try:
+        end = int(request.args.get('end', now))
+        start = int(request.args.get('start', end - 300 * tf_seconds))
+        width = min(max(int(request.args.get('width', 800)), 10), 4000)
+    except ValueError:
+        return jsonify({'error': 'start, end and width must be integers'}), 400
+    if start >= end:
+        return jsonify({'error': 'start must be before end'}), 400
+
+    bucket_bars = bucket_bars_for(start, end, timeframe, width)
+    start, end = align_range(start, end, timeframe, bucket_bars)
+    live = end >= now - tf_seconds * bucket_bars
+    payload = candle_cache.get_or_build(
+        (symbol, timeframe, start, end, bucket_bars),
+        live,
+        lambda: build_candle_payload(symbol, timeframe, start, end, bucket_bars),
+    )
+
+    # Live overlays are cheap and never cached
+    levels = []
+    for ticket in snap.data['open_tickets']:
+        if ticket.get('symbol') != symbol:
+            continue
+        for name in ('entry_price', 'sl', 'tp'):
+            if ticket.get(name):
+                levels.append({'ticket': ticket['ticket'], 'kind': name, 'price': ticket[name], 'side': ticket['type']})
+    zones = [z for z in _active_zones() if z['created_time'] <= end]
+    signals = [
+        {'time': sig['time'], 'price': sig['entry_price'], 'kind': 'signal', 'side': sig['signal'],
+         'strength': sig['strength']}
+        for sig in _signal_history().query(since=start, until=end, limit=500)
+    ]
+
+    return jsonify({
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'start': start,
+        'end': end,
+        'bucket_bars': bucket_bars,
+        'candles': payload['candles'],
+        'markers': payload['markers'] + signals,
+        'levels': levels,
+        'zones': zones,
+    })
+
+
+def _int_arg(name, default=None):
+    value = request.args.get(name)
+    return default if value in (None, '') else int(value)
+
+
+@app.route('/api/trades')
+def api_trades():
+    """
+    API endpoint for closed-trade history, newest first.
+
+    Query params: limit (<= 500), cursor (next_cursor of the previous page),
+    strategy, symbol, since/until (close time, epoch seconds).
+    """
+    try:
+        page = get_trade_journal(get_config()).page(
+            limit=_int_arg('limit', 50),
+            cursor=request.args.get('cursor') or None,
+            strategy=request.args.get('strategy') or None,
+            symbol=request.args.get('symbol') or None,
+            since=_int_arg('since'),
+            until=_int_arg('until'),
+        )
+    except ValueError:
+        return jsonify({'error': 'limit, since, until must be integers and cursor must come from next_cursor'}), 400
+    return jsonify(page)
+
+
+@app.route('/api/trades/summary')
+def api_trades_summary():
+    """
+    API endpoint for trade analytics.
+
+    Query params: group (day|hour|session), strategy, symbol, since/until.
+    """
+    group = request.args.get('group', 'day')
+    if group not in ('day', 'hour', 'session'):
+        return jsonify({'error': f'Unknown group {group}'}), 400
+    try:
+        summary = get_trade_journal(get_config()).summary(
+            group=group,
+            strategy=request.args.get('strategy') or None,
+            symbol=request.args.get('symbol') or None,
+            since=_int_arg('since'),
+            until=_int_arg('until'),
+        )
+    except ValueError:
+        return jsonify({'error': 'since and until must be integers'}), 400
+    return jsonify(summary)
+
+
+@app.route('/api/execution')
+def api_execution():
+    """
+    API endpoint for execution quality: rolling latency and slippage
+    distributions (overall, per session, per UTC hour) and recent orders.
+
+    Query params: recent (number of recent orders, <= 200).
+    """
+    try:
+        recent = max(0, min(_int_arg('recent', 20), 200))
+    except ValueError:
+        return jsonify({'error': 'recent must be an integer'}), 400
+    return jsonify(get_execution_quality(get_config()).summary(recent=recent))
+
+
+@app.route('/api/signals')
+def api_signals():
+    """
+    API endpoint for recent strategy evaluations, newest first.
+
+    Query params: type (BUY|SELL|NONE), min_strength, since/until (bar time,
+    epoch seconds), include_none (1 to include no-signal evaluations), limit (<= 1000).
+    """
+    signal_type = (request.args.get('type') or '').upper() or None
+    try:
+        min_strength = request.args.get('min_strength')
+        history = _signal_history()
+        signals = history.query(
+            signal=signal_type,
+            min_strength=float(min_strength) if min_strength else None,
+            since=_int_arg('since'),
+            until=_int_arg('until'),
+            include_none=request.args.get('include_none') in ('1', 'true'),
+            limit=_int_arg('limit', 100),
+        )
+    except ValueError:
+        return jsonify({'error': 'type must be BUY, SELL or NONE; min_strength, since, until, limit must be numbers'}), 400
+    return jsonify({
+        'signals': signals,
+        'count': len(signals),
+        'stored': len(history),
+        'capacity': history.capacity,
+        'total_signals': history.total_signals,
+    })
+
+
+@app.route('/api/zones')
+def api_zones():
+    """API endpoint for live OB/FVG zones (chart overlay)."""
+    zones = _active_zones()
     return jsonify({
-        'status': dashboard_data['bot_status'],
-        'active_strategies': dashboard_data['active_strategies'],
-        'symbol': dashboard_data['symbol'],
-        'timestamp': dashboard_data['last_updated'],
+        'zones': zones,
+        'count': len(zones),
+        'timestamp': _snapshot.data['last_updated'],
     })
 
 
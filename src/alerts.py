@@ -0,0 +1,354 @@
+"""
+Alert Dispatcher (Telegram / Email)
+===================================
+
+Queues signal, fill, error and risk events from the trading thread and
+delivers them from a background worker, so a slow notification provider
+never adds latency to order placement.
+
+- Bursts are coalesced: events arriving within ``coalesce_seconds`` of the
+  first pending one go out as a single digest, split into several messages
+  when it exceeds the channel's ``max_length``
+- Each channel has its own worker thread and token-bucket rate limit, so a
+  slow or failing provider does not hold up the others
+- Failed sends are retried with exponential backoff, then dropped
+
+Endpoints are configurable (``monitoring.telegram.api_url``,
+``monitoring.email.smtp_server``/``smtp_port``/``use_tls``), so the whole
+path can be exercised against a local HTTP/SMTP stub.
+"""
+
+import json
+import logging
+import queue
+import smtplib
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from email.message import EmailMessage
+from typing import List, Optional
+
+
+EVENT_KINDS = ('signal', 'fill', 'error', 'risk')
+
+# Characters kept free for the subject when a channel caps message length
+SUBJECT_RESERVE = 200
+
+
+class AlertEvent:
+    """A single alert."""
+
+    __slots__ = ('kind', 'title', 'message', 'created_at')
+
+    def __init__(self, kind: str, title: str, message: str = ''):
+        self.kind = kind
+        self.title = title
+        self.message = message
+        self.created_at = time.time()
+
+    def format(self) -> str:
+        stamp = datetime.fromtimestamp(self.created_at).strftime('%H:%M:%S')
+        text = f"[{stamp}] {self.kind.upper()}: {self.title}"
+        return f"{text}\n{self.message}" if self.message else text
+
+
+class TelegramChannel:
+    """Telegram Bot API ``sendMessage``."""
+
+    name = 'telegram'
+    # sendMessage rejects texts longer than this
+    max_length = 4096
+
+    def __init__(self, bot_token: str, chat_id, api_url: str = 'https://api.telegram.org', timeout: float = 10.0):
+        self.url = f"{api_url.rstrip('/')}/bot{bot_token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+
+    def send(self, subject: str, body: str):
+        payload = json.dumps({'chat_id': self.chat_id, 'text': f"{subject}\n\n{body}"}).encode('utf-8')
+        req = urllib.request.Request(self.url, data=payload, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"Telegram returned HTTP {response.status}")
+
+
+class EmailChannel:
+    """Plain-text email over SMTP (STARTTLS when ``use_tls``)."""
+
+    name = 'email'
+    max_length = 100_000
+
+    def __init__(self, smtp_server: str, smtp_port: int, from_email: str, to_email: str,
+                 password: Optional[str] = None, use_tls: bool = True, timeout: float = 15.0):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.from_email = from_email
+        self.to_email = to_email
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send(self, subject: str, body: str):
+        msg = EmailMessage()
+        msg['Subject'] = subject
+        msg['From'] = self.from_email
+        msg['To'] = self.to_email
+        msg.set_content(body)
+        with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.password:
+                smtp.login(self.from_email, self.password)
+            smtp.send_message(msg)
+
+
+class RateLimiter:
+    """Token bucket: ``per_minute`` sends with bursts up to ``burst``."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def take(self):
+        self.tokens -= 1
+
+
+class _ChannelState:
+    """Queue, worker thread, pending digest and retry state of one channel."""
+
+    __slots__ = ('channel', 'limiter', 'queue', 'thread', 'pending', 'due', 'attempts')
+
+    def __init__(self, channel, limiter: RateLimiter):
+        self.channel = channel
+        self.limiter = limiter
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.pending: List[AlertEvent] = []
+        self.due = None
+        self.attempts = 0
+
+
+class AlertDispatcher:
+    """
+    Background, coalescing, rate-limited alert delivery.
+    """
+
+    def __init__(self, channels: List, prefix: str = 'US30_BOT', coalesce_seconds: float = 5.0,
+                 rate_limit_per_minute: float = 20, burst: int = 5, max_retries: int = 5,
+                 backoff_seconds: float = 2.0, max_pending: int = 1000,
+                 kinds: Optional[List[str]] = None):
+        """
+        Args:
+            channels: Objects with ``name``, ``send(subject, body)`` and
+                optionally ``max_length`` (characters per message)
+            prefix: Subject prefix
+            coalesce_seconds: Window for merging bursts into one digest
+            rate_limit_per_minute / burst: Token bucket per channel
+            max_retries: Send attempts before a digest is dropped
+            backoff_seconds: First retry delay (doubles each attempt)
+            max_pending: Events kept per channel before the oldest are dropped
+            kinds: Event kinds to deliver (default: all)
+        """
+        self.prefix = prefix
+        self.coalesce_seconds = coalesce_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_pending = max_pending
+        self.kinds = set(kinds or EVENT_KINDS)
+
+        self._channels = [_ChannelState(c, RateLimiter(rate_limit_per_minute, burst)) for c in channels]
+        self._stats_lock = threading.Lock()
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'dropped': 0}
+
+        # One worker per channel: a slow SMTP server never delays Telegram
+        for state in self._channels:
+            state.thread = threading.Thread(target=self._run, args=(state,), daemon=True,
+                                            name=f'alerts-{state.channel.name}')
+            state.thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._channels)
+
+    def notify(self, kind: str, title: str, message: str = ''):
+        """Queue an alert. Never blocks and never raises."""
+        if not self._channels or kind not in self.kinds:
+            return
+        event = AlertEvent(kind, title, message)
+        for state in self._channels:
+            state.queue.put(event)
+        self._count('queued', 1)
+
+    def stop(self, timeout: float = 5.0):
+        """Flush pending alerts (best effort) and stop the workers."""
+        for state in self._channels:
+            state.queue.put(None)
+        deadline = time.monotonic() + timeout
+        for state in self._channels:
+            state.thread.join(max(0.0, deadline - time.monotonic()))
+
+    def _count(self, key: str, n: int):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # ----------------------------------------------------------------- worker
+
+    def _run(self, state: _ChannelState):
+        while True:
+            timeout = None if state.due is None else max(0.05, state.due - time.monotonic())
+            try:
+                event = state.queue.get(timeout=timeout)
+            except queue.Empty:
+                event = False
+
+            if event is None:
+                self._flush(state, force=True)
+                return
+            if event:
+                self._enqueue(state, event)
+                # Drain whatever else is already waiting before deciding to send
+                while True:
+                    try:
+                        event = state.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if event is None:
+                        self._flush(state, force=True)
+                        return
+                    self._enqueue(state, event)
+            self._flush(state)
+
+    def _enqueue(self, state: _ChannelState, event: AlertEvent):
+        state.pending.append(event)
+        if len(state.pending) > self.max_pending:
+            del state.pending[0]
+            self._count('dropped', 1)
+        if state.due is None:
+            state.due = time.monotonic() + self.coalesce_seconds
+
+    def _flush(self, state: _ChannelState, force: bool = False):
+        now = time.monotonic()
+        if not state.pending or (not force and state.due > now):
+            return
+        if force:
+            # Shutdown: send every remaining part once, ignoring the rate limit
+            while state.pending and self._deliver(state, now, retry=False):
+                pass
+            return
+        wait = state.limiter.wait_time()
+        if wait > 0:
+            state.due = now + wait
+            return
+        self._deliver(state, now)
+
+    def _digest(self, state: _ChannelState):
+        """
+        Oldest pending events that fit in one message of the channel.
+
+        Returns:
+            (events, subject, body)
+        """
+        limit = getattr(state.channel, 'max_length', None)
+        body_limit = None if limit is None else limit - SUBJECT_RESERVE
+        parts = []
+        size = 0
+        for event in state.pending:
+            text = event.format()
+            if body_limit is not None:
+                if len(text) > body_limit:
+                    text = text[:body_limit - 3] + '...'
+                separator = 2 if parts else 0
+                if parts and size + separator + len(text) > body_limit:
+                    break
+                size += separator + len(text)
+            parts.append(text)
+
+        events = state.pending[:len(parts)]
+        if len(events) == 1:
+            subject = f"{self.prefix}: {events[0].title}"
+        else:
+            counts = {}
+            for e in events:
+                counts[e.kind] = counts.get(e.kind, 0) + 1
+            summary = ', '.join(f"{n} {k}" for k, n in counts.items())
+            subject = f"{self.prefix}: {len(events)} alerts ({summary})"
+        rest = len(state.pending) - len(events)
+        if rest:
+            subject += f" +{rest} to follow"
+        if limit is not None and len(subject) > SUBJECT_RESERVE - 2:
+            subject = subject[:SUBJECT_RESERVE - 5] + '...'
+        return events, subject, '\n\n'.join(parts)
+
+    def _deliver(self, state: _ChannelState, now: float, retry: bool = True) -> bool:
+        """Send one digest; returns True if it went out."""
+        events, subject, body = self._digest(state)
+
+        state.limiter.take()
+        try:
+            state.channel.send(subject, body)
+        except Exception as e:
+            state.attempts += 1
+            if not retry or state.attempts >= self.max_retries:
+                logging.error(f"Dropping {len(events)} alert(s) after {state.attempts} failed "
+                              f"{state.channel.name} sends: {e}")
+                self._count('failed', len(events))
+                self._sent(state, len(events), now)
+            else:
+                delay = self.backoff_seconds * (2 ** (state.attempts - 1))
+                logging.warning(f"{state.channel.name} alert send failed ({e}); retrying in {delay:.1f}s")
+                state.due = now + delay
+            return False
+
+        self._count('sent', len(events))
+        self._sent(state, len(events), now)
+        return True
+
+    @staticmethod
+    def _sent(state: _ChannelState, n: int, now: float):
+        # Any remainder of a split digest goes out as soon as the rate limit allows
+        del state.pending[:n]
+        state.due = now if state.pending else None
+        state.attempts = 0
+
+    # ----------------------------------------------------------------- config
+
+    @classmethod
+    def from_config(cls, config) -> 'AlertDispatcher':
+        """
+        Build from a ``BotConfig`` (its ``monitoring`` section). Disabled or
+        incomplete channels are skipped; with no channels ``notify`` is a no-op.
+        """
+        monitoring = config.monitoring
+        channels = []
+
+        if monitoring.telegram_enabled and monitoring.telegram_bot_token and monitoring.telegram_chat_id:
+            channels.append(TelegramChannel(monitoring.telegram_bot_token, monitoring.telegram_chat_id,
+                                            monitoring.telegram_api_url))
+
+        if monitoring.email_enabled and monitoring.email_smtp_server and monitoring.email_from and monitoring.email_to:
+            channels.append(EmailChannel(monitoring.email_smtp_server, monitoring.email_smtp_port,
+                                         monitoring.email_from, monitoring.email_to,
+                                         monitoring.email_password, monitoring.email_use_tls))
+
+        return cls(
+            channels,
+            prefix=config.execution.comment,
+            coalesce_seconds=monitoring.alert_coalesce_seconds,
+            rate_limit_per_minute=monitoring.alert_rate_limit_per_minute,
+            burst=monitoring.alert_burst,
+            max_retries=monitoring.alert_max_retries,
+            backoff_seconds=monitoring.alert_backoff_seconds,
+            kinds=monitoring.alert_events,
+        )
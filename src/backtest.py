@@ -0,0 +1,178 @@
+"""
+Bar-Replay Backtester for SMCStrategy
+=====================================
+
+Replays base-timeframe candles (M5) through ``SMCStrategy.analyze()`` bar
+by bar and simulates one position at a time against the signal's SL/TP.
+
+Input data needs ``time`` (epoch seconds, as returned by MT5) plus
+``open``/``high``/``low``/``close`` columns. The bias timeframe is built
+from the same candles using completed buckets only, so there is no
+look-ahead.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.confluence import TIMEFRAME_SECONDS
+from src.strategies import SMCStrategy
+from src.strategies.smc_strategy import SMCParams
+from src.strategies.bars import as_bars
+from src.zones import ZoneBook
+
+
+def resample_bias(entry_data: pd.DataFrame, bias_tf: str = 'H1') -> pd.DataFrame:
+    """Aggregate base candles into bias-timeframe candles keyed by bucket start time."""
+    seconds = TIMEFRAME_SECONDS[bias_tf]
+    bucket = entry_data['time'].to_numpy().astype(np.int64) // seconds
+    grouped = entry_data.groupby(bucket, sort=True).agg(
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+    )
+    grouped.insert(0, 'time', grouped.index.to_numpy() * seconds)
+    return grouped.reset_index(drop=True)
+
+
+def warmup_bars(strategy_config: Dict, bias_bars: int = 20) -> int:
+    """
+    Base bars of history a replay needs before its first trade matches a
+    continuous run: the strategy's entry window (``min_candles`` and any
+    confluence timeframes) and enough completed bias bars for the EMA.
+    """
+    params = SMCParams.from_config(strategy_config)
+    ratio = -(-TIMEFRAME_SECONDS[params.bias_tf] // TIMEFRAME_SECONDS[params.entry_tf])
+    return max(params.required_bars, (max(params.ema_period, bias_bars) + 1) * ratio)
+
+
+def run_backtest(entry_data: pd.DataFrame, strategy_config: Dict, start_index: int = 0,
+                 bias_bars: int = 20, zone_book: Optional[ZoneBook] = None) -> List[Dict]:
+    """
+    Backtest SMCStrategy on a candle frame.
+
+    Args:
+        entry_data: Base-timeframe OHLC with epoch-second 'time' column
+        strategy_config: SMC config (same keys as config_us30.json 'strategies.smc')
+        start_index: First bar allowed to open a trade (earlier bars are warm-up only)
+        bias_bars: Completed bias bars passed to the strategy (executor uses 20)
+        zone_book: Zone book to share with the strategy (private one if omitted)
+
+    Returns:
+        List of closed trades:
+        {'entry_time', 'exit_time', 'side', 'entry_price', 'stop_loss', 'take_profit',
+         'exit_price', 'exit_reason', 'pnl_points', 'r_multiple', 'strength', 'bars_held'}
+    """
+    entry_data = entry_data.reset_index(drop=True)
+    strategy = SMCStrategy(strategy_config, zone_book=zone_book)
+    window = strategy.required_bars
+
+    bias_tf = strategy.bias_tf
+    bias = resample_bias(entry_data, bias_tf)
+    # Number of completed bias bars before each base bar's bucket
+    bias_seconds = TIMEFRAME_SECONDS[bias_tf]
+    times = entry_data['time'].to_numpy().astype(np.int64)
+    completed = np.searchsorted(bias['time'].to_numpy(), (times // bias_seconds) * bias_seconds)
+
+    highs = entry_data['high'].to_numpy()
+    lows = entry_data['low'].to_numpy()
+    closes = entry_data['close'].to_numpy()
+    # Column views, sliced per bar without copying
+    entry_bars = as_bars(entry_data)
+    bias_bars_view = as_bars(bias)
+
+    trades = []
+    position = None
+    first = max(start_index, window - 1)
+
+    for i in range(first, len(entry_data)):
+        if position is not None:
+            exit_price, reason = check_exit(position, highs[i], lows[i])
+            if exit_price is None:
+                continue
+            trades.append(_close(position, i, times[i], exit_price, reason))
+            position = None
+            continue
+
+        k = completed[i]
+        if k < 2:
+            continue
+        signal = strategy.analyze(
+            entry_bars.slice(i - window + 1, i + 1),
+            bias_bars_view.slice(max(0, k - bias_bars), k),
+        )
+        if signal['signal'] == 'NONE' or not signal.get('sl_distance') or signal['sl_distance'] <= 0:
+            continue
+
+        position = {
+            'side': signal['signal'],
+            'entry_index': i,
+            'entry_time': int(times[i]),
+            'entry_price': float(signal['entry_price']),
+            'stop_loss': float(signal['stop_loss']),
+            'take_profit': float(signal['take_profit']),
+            'risk': float(signal['sl_distance']),
+            'strength': signal['strength'],
+        }
+
+    if position is not None:
+        last = len(entry_data) - 1
+        trades.append(_close(position, last, times[last], float(closes[last]), 'end'))
+
+    return trades
+
+
+def check_exit(position: Dict, high: float, low: float):
+    """SL is assumed to fill first when a bar spans both levels."""
+    if position['side'] == 'BUY':
+        if low <= position['stop_loss']:
+            return position['stop_loss'], 'sl'
+        if high >= position['take_profit']:
+            return position['take_profit'], 'tp'
+    else:
+        if high >= position['stop_loss']:
+            return position['stop_loss'], 'sl'
+        if low <= position['take_profit']:
+            return position['take_profit'], 'tp'
+    return None, None
+
+
+def _close(position: Dict, index: int, time: int, exit_price: float, reason: str) -> Dict:
+    direction = 1 if position['side'] == 'BUY' else -1
+    pnl = (exit_price - position['entry_price']) * direction
+    return {
+        'entry_time': position['entry_time'],
+        'exit_time': int(time),
+        'side': position['side'],
+        'entry_price': position['entry_price'],
+        'stop_loss': position['stop_loss'],
+        'take_profit': position['take_profit'],
+        'exit_price': float(exit_price),
+        'exit_reason': reason,
+        'pnl_points': float(pnl),
+        'r_multiple': float(pnl / position['risk']),
+        'strength': position['strength'],
+        'bars_held': index - position['entry_index'],
+    }
+
+
+def summarize(trades: List[Dict]) -> Dict:
+    """Headline statistics in R multiples."""
+    r = np.array([t['r_multiple'] for t in trades], dtype=float)
+    if len(r) == 0:
+        return {'trades': 0, 'win_rate': 0.0, 'expectancy_r': 0.0, 'total_r': 0.0,
+                'profit_factor': 0.0, 'max_drawdown_r': 0.0}
+
+    equity = np.concatenate([[0.0], np.cumsum(r)])
+    gains = r[r > 0].sum()
+    losses = -r[r < 0].sum()
+    return {
+        'trades': int(len(r)),
+        'win_rate': float((r > 0).mean() * 100),
+        'expectancy_r': float(r.mean()),
+        'total_r': float(r.sum()),
+        'profit_factor': float(gains / losses) if losses > 0 else float('inf'),
+        'max_drawdown_r': float((np.maximum.accumulate(equity) - equity).max()),
+    }
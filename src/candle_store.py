@@ -0,0 +1,286 @@
+"""
+Local Candle Store
+==================
+
+Normalized on-disk OHLC history per symbol and timeframe, filled by
+``src.importer`` (broker CSVs, MT5 HST dumps, cached yfinance downloads)
+and read by the backtester and the dashboard chart.
+
+File layout (per symbol directory):
+- ``<TF>.bars`` sorted, de-duplicated ``BAR_DTYPE`` records (the same
+  60-byte layout MT5 ``copy_rates_*`` returns), directly memory-mappable
+- ``<TF>.idx``  one ``DAY_INDEX_DTYPE`` entry per calendar day (UTC day
+  number, first row, row count), so a time range maps to a row slice
+  without scanning the file
+
+Both files are replaced atomically on every write.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.confluence import TIMEFRAME_SECONDS
+
+
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8'),
+])
+
+DAY_INDEX_DTYPE = np.dtype([
+    ('day', '<i8'),
+    ('first', '<i8'),
+    ('count', '<i8'),
+])
+
+SECONDS_PER_DAY = 86_400
+
+
+def to_bars(frame: pd.DataFrame) -> np.ndarray:
+    """Convert a frame with time/open/high/low/close (+ optional volume/spread) columns to ``BAR_DTYPE``."""
+    bars = np.zeros(len(frame), dtype=BAR_DTYPE)
+    for name in BAR_DTYPE.names:
+        if name in frame:
+            column = frame[name]
+            if name in ('tick_volume', 'spread', 'real_volume'):
+                # Missing prices stay NaN so clean() drops the bar; missing volume is just 0
+                column = column.fillna(0)
+            bars[name] = column.to_numpy()
+    return bars
+
+
+def to_frame(bars: np.ndarray) -> pd.DataFrame:
+    """Bars as a DataFrame in the shape ``run_backtest`` and the strategy expect."""
+    return pd.DataFrame({name: np.asarray(bars[name]) for name in
+                         ('time', 'open', 'high', 'low', 'close', 'tick_volume')})
+
+
+def clean(bars: np.ndarray) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Drop invalid bars, sort by time and de-duplicate (the last occurrence
+    of a timestamp wins, so later sources override earlier ones).
+
+    Returns:
+        (clean bars, {'invalid': n, 'duplicates': n})
+    """
+    prices = np.stack([bars['open'], bars['high'], bars['low'], bars['close']])
+    valid = (np.isfinite(prices).all(axis=0) & (prices > 0).all(axis=0)
+             & (bars['high'] >= bars['low']))
+    invalid = int(len(bars) - valid.sum())
+    if invalid:
+        bars = bars[valid]
+
+    order = np.argsort(bars['time'], kind='stable')
+    bars = bars[order]
+    times = bars['time']
+    keep = np.r_[times[1:] != times[:-1], True] if len(bars) else np.zeros(0, dtype=bool)
+    duplicates = int(len(bars) - keep.sum())
+    if duplicates:
+        bars = bars[keep]
+    return bars, {'invalid': invalid, 'duplicates': duplicates}
+
+
+def find_gaps(times: np.ndarray, bar_seconds: int, skip_weekends: bool = True) -> np.ndarray:
+    """
+    Missing-bar gaps in a sorted time column.
+
+    Args:
+        times: Sorted epoch seconds
+        bar_seconds: Timeframe in seconds
+        skip_weekends: Ignore gaps that only span the Friday-Sunday market close
+
+    Returns:
+        (n, 3) int64 array of (last bar before gap, first bar after gap, missing bars)
+    """
+    times = np.asarray(times, dtype=np.int64)
+    if len(times) < 2:
+        return np.empty((0, 3), dtype=np.int64)
+    diffs = np.diff(times)
+    at = np.flatnonzero(diffs > bar_seconds)
+    before, after = times[at], times[at + 1]
+
+    if skip_weekends and len(at):
+        # 1970-01-01 was a Thursday: weekday 0 = Monday
+        weekday = (before // SECONDS_PER_DAY + 3) % 7
+        weekend = (weekday >= 4) & (after - before <= 3 * SECONDS_PER_DAY)
+        before, after = before[~weekend], after[~weekend]
+
+    missing = (after - before) // bar_seconds - 1
+    return np.column_stack([before, after, missing]).astype(np.int64)
+
+
+def build_day_index(times: np.ndarray) -> np.ndarray:
+    """One ``DAY_INDEX_DTYPE`` entry per UTC day present in a sorted time column."""
+    days = np.asarray(times, dtype=np.int64) // SECONDS_PER_DAY
+    if len(days) == 0:
+        return np.empty(0, dtype=DAY_INDEX_DTYPE)
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    index = np.empty(len(starts), dtype=DAY_INDEX_DTYPE)
+    index['day'] = days[starts]
+    index['first'] = starts
+    index['count'] = np.diff(np.r_[starts, len(days)])
+    return index
+
+
+class CandleStore:
+    """
+    Reader/writer for the local candle files.
+    """
+
+    def __init__(self, directory: str = 'data/candles'):
+        self.root = Path(directory)
+
+    def symbols(self) -> List[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir()) if self.root.exists() else []
+
+    def timeframes(self, symbol: str) -> List[str]:
+        names = [p.stem for p in (self.root / symbol).glob('*.bars')]
+        return sorted(names, key=lambda tf: TIMEFRAME_SECONDS.get(tf, 0))
+
+    def _paths(self, symbol: str, timeframe: str) -> Tuple[Path, Path]:
+        base = self.root / symbol
+        return base / f'{timeframe}.bars', base / f'{timeframe}.idx'
+
+    def load(self, symbol: str, timeframe: str) -> np.ndarray:
+        """All stored bars as a read-only memmap (empty array if none)."""
+        bars_path, _ = self._paths(symbol, timeframe)
+        if not bars_path.exists() or bars_path.stat().st_size == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.memmap(bars_path, dtype=BAR_DTYPE, mode='r')
+
+    def index(self, symbol: str, timeframe: str) -> np.ndarray:
+        _, idx_path = self._paths(symbol, timeframe)
+        if not idx_path.exists():
+            return np.empty(0, dtype=DAY_INDEX_DTYPE)
+        return np.fromfile(idx_path, dtype=DAY_INDEX_DTYPE)
+
+    def range(self, symbol: str, timeframe: str, start: Optional[int] = None,
+              end: Optional[int] = None) -> np.ndarray:
+        """
+        Bars with ``start <= time <= end`` as a zero-copy slice of the memmap.
+        The day index narrows the slice before the final binary search.
+        """
+        bars = self.load(symbol, timeframe)
+        index = self.index(symbol, timeframe)
+        if len(bars) == 0 or len(index) == 0:
+            return bars
+
+        lo, hi = 0, len(bars)
+        if start is not None:
+            pos = np.searchsorted(index['day'], start // SECONDS_PER_DAY, 'left')
+            lo = int(index['first'][pos]) if pos < len(index) else len(bars)
+        if end is not None:
+            pos = np.searchsorted(index['day'], end // SECONDS_PER_DAY, 'right')
+            hi = int(index['first'][pos - 1] + index['count'][pos - 1]) if pos > 0 else 0
+        window = bars[lo:max(lo, hi)]
+
+        first = 0 if start is None else np.searchsorted(window['time'], start, 'left')
+        last = len(window) if end is None else np.searchsorted(window['time'], end, 'right')
+        return window[first:last]
+
+    def write(self, symbol: str, timeframe: str, bars: np.ndarray):
+        """Replace the stored series with ``bars`` (must already be clean)."""
+        bars_path, idx_path = self._paths(symbol, timeframe)
+        bars_path.parent.mkdir(parents=True, exist_ok=True)
+        bars = np.ascontiguousarray(bars, dtype=BAR_DTYPE)
+        for path, payload in ((bars_path, bars), (idx_path, build_day_index(bars['time']))):
+            tmp = path.with_suffix(path.suffix + '.tmp')
+            payload.tofile(tmp)
+            os.replace(tmp, path)
+
+    def merge(self, symbol: str, timeframe: str, bars: np.ndarray) -> Dict[str, int]:
+        """
+        Merge new bars into the stored series (new bars win on equal
+        timestamps) and rewrite it.
+
+        Works through the day index: stored days without new bars are
+        copied straight from the memmap, and only days that receive new
+        bars are merged in memory. Memory is bounded by ``bars`` plus one
+        stored day, not by the size of the stored series.
+
+        Returns:
+            {'added', 'invalid', 'duplicates', 'total'}
+        """
+        new, stats = clean(bars.astype(BAR_DTYPE, copy=False))
+        existing = self.load(symbol, timeframe)
+        index = self.index(symbol, timeframe)
+        if len(existing) and len(index) == 0:
+            # Series written without an index file
+            index = build_day_index(existing['time'])
+        before = len(existing)
+
+        bars_path, idx_path = self._paths(symbol, timeframe)
+        bars_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_bars = bars_path.with_suffix(bars_path.suffix + '.tmp')
+        index_parts = []
+        written = 0
+
+        with open(tmp_bars, 'wb') as out:
+            def copy_days(lo: int, hi: int):
+                # Stored days [lo, hi) unchanged; their index entries only shift
+                nonlocal written
+                if hi <= lo:
+                    return
+                first, last = int(index['first'][lo]), int(index['first'][hi - 1] + index['count'][hi - 1])
+                existing[first:last].tofile(out)
+                part = index[lo:hi].copy()
+                part['first'] += written - first
+                index_parts.append(part)
+                written += last - first
+
+            def write_day(day_bars: np.ndarray):
+                nonlocal written
+                day_bars.tofile(out)
+                part = build_day_index(day_bars['time'])
+                part['first'] += written
+                index_parts.append(part)
+                written += len(day_bars)
+
+            days = new['time'] // SECONDS_PER_DAY
+            starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if len(new) else np.zeros(0, dtype=np.int64)
+            ends = np.r_[starts[1:], len(new)]
+            pos = 0
+            for start, end in zip(starts, ends):
+                day = days[start]
+                at = int(np.searchsorted(index['day'], day, 'left'))
+                copy_days(pos, at)
+                if at < len(index) and index['day'][at] == day:
+                    first = int(index['first'][at])
+                    stored = existing[first:first + int(index['count'][at])]
+                    merged, day_stats = clean(np.concatenate([stored, new[start:end]]))
+                    # Views keep the mapping open as much as the memmap itself
+                    del stored
+                    stats['duplicates'] += day_stats['duplicates']
+                    write_day(merged)
+                    pos = at + 1
+                else:
+                    write_day(new[start:end])
+                    pos = at
+            copy_days(pos, len(index))
+
+        day_index = np.concatenate(index_parts) if index_parts else np.empty(0, dtype=DAY_INDEX_DTYPE)
+        tmp_idx = idx_path.with_suffix(idx_path.suffix + '.tmp')
+        day_index.tofile(tmp_idx)
+        # Release the old mapping (no views of it are left) before replacing the file under it
+        del existing
+        os.replace(tmp_bars, bars_path)
+        os.replace(tmp_idx, idx_path)
+
+        stats['total'] = written
+        stats['added'] = written - before
+        return stats
+
+
+def get_candle_store(config) -> CandleStore:
+    """Store at ``data.candles.directory`` (default data/candles)."""
+    return CandleStore(config.data.candles_directory)
@@ -0,0 +1,102 @@
+"""
+Candle Downsampling and Range Cache
+===================================
+
+Server-side helpers for the dashboard chart: merge OHLC bars into buckets
+sized to the client's pixel width, and cache the result per
+(symbol, timeframe, range, bucket) so zooming across months of M5 history
+only ships a few hundred candles per request.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.confluence import TIMEFRAME_SECONDS
+
+
+def bucket_bars_for(start: int, end: int, timeframe: str, width: int) -> int:
+    """Bars merged per output candle so at most ``width`` candles are returned."""
+    n_bars = max(1, (end - start) // TIMEFRAME_SECONDS[timeframe])
+    return max(1, math.ceil(n_bars / max(1, width)))
+
+
+def align_range(start: int, end: int, timeframe: str, bucket_bars: int) -> Tuple[int, int]:
+    """Snap a range to bucket boundaries so nearby requests share cache entries."""
+    step = TIMEFRAME_SECONDS[timeframe] * bucket_bars
+    return (start // step) * step, -(-end // step) * step
+
+
+def downsample_ohlc(rates: np.ndarray, bucket_bars: int, bar_seconds: int) -> Dict[str, list]:
+    """
+    Merge consecutive bars into buckets aligned on ``time``.
+
+    Args:
+        rates: Structured array with time/open/high/low/close/tick_volume fields
+            (MT5 ``copy_rates_*`` layout)
+        bucket_bars: Bars per output candle
+        bar_seconds: Source timeframe in seconds
+
+    Returns:
+        Columnar dict {'time', 'open', 'high', 'low', 'close', 'volume'} of lists
+    """
+    if rates is None or len(rates) == 0:
+        return {'time': [], 'open': [], 'high': [], 'low': [], 'close': [], 'volume': []}
+
+    times = rates['time'].astype(np.int64)
+    if bucket_bars <= 1:
+        starts = np.arange(len(rates))
+    else:
+        bucket = times // (bar_seconds * bucket_bars)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(rates)] - 1
+
+    volume = rates['tick_volume'] if 'tick_volume' in rates.dtype.names else np.zeros(len(rates))
+    return {
+        'time': times[starts].tolist(),
+        'open': rates['open'][starts].tolist(),
+        'high': np.maximum.reduceat(rates['high'], starts).tolist(),
+        'low': np.minimum.reduceat(rates['low'], starts).tolist(),
+        'close': rates['close'][ends].tolist(),
+        'volume': np.add.reduceat(volume.astype(np.int64), starts).tolist(),
+    }
+
+
+class CandleCache:
+    """
+    Small LRU cache of downsampled candle payloads.
+
+    Ranges that reach the live edge expire after ``live_ttl`` seconds;
+    fully historical ranges live until evicted.
+    """
+
+    def __init__(self, max_entries: int = 256, live_ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.live_ttl = live_ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Tuple, live: bool, build: Callable[[], Dict]) -> Dict:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        value = build()
+        expires: Optional[float] = now + self.live_ttl if live else None
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,461 @@
+"""
+Typed, Validated, Hot-Reloadable Bot Configuration
+==================================================
+
+Single source of ``config_us30.json`` for the executor and the dashboard.
+
+- Parsed once into immutable, slotted dataclasses, so hot loops read plain
+  attributes (``cfg.broker.max_spread_points``) instead of nested ``.get()``
+  chains
+- Validated on load; an invalid edit is logged and the previous version
+  stays active
+- A watcher thread polls the file's mtime and atomically swaps in new
+  versions; subscribers (strategy params, risk caps, order gateway) are
+  told about each change
+
+Sections without a typed model yet stay available as read-only mappings
+through ``BotConfig.raw``.
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, List, Mapping, Optional, Tuple
+
+from src.confluence import TIMEFRAME_SECONDS
+
+
+REGIMES = ('LOW', 'MEDIUM', 'HIGH')
+
+
+class ConfigError(ValueError):
+    """Raised when config_us30.json fails validation."""
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts/lists into read-only mappings/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Inverse of ``_freeze`` (plain dicts/lists), e.g. for JSON or mutation."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def _number(section: Mapping, key: str, default, path: str, minimum=None, maximum=None, cast=float):
+    value = section.get(key, default)
+    if value is None:
+        return None
+    try:
+        value = cast(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f"{path}.{key} must be a number, got {value!r}")
+    if minimum is not None and value < minimum:
+        raise ConfigError(f"{path}.{key} must be >= {minimum}, got {value}")
+    if maximum is not None and value > maximum:
+        raise ConfigError(f"{path}.{key} must be <= {maximum}, got {value}")
+    return value
+
+
+def _section(raw: Mapping, key: str) -> Mapping:
+    value = raw.get(key, MappingProxyType({}))
+    if not isinstance(value, Mapping):
+        raise ConfigError(f"{key} must be a JSON object, got {type(value).__name__}")
+    return value
+
+
+def _regime_map(section: Mapping, key: str, path: str) -> Mapping:
+    values = section.get(key, {})
+    unknown = set(values) - set(REGIMES)
+    if unknown:
+        raise ConfigError(f"{path}.{key} has unknown regimes {sorted(unknown)} (expected {REGIMES})")
+    return MappingProxyType({k: _number(values, k, None, f"{path}.{key}", minimum=0, cast=int) for k in values})
+
+
+@dataclass(frozen=True, slots=True)
+class BrokerConfig:
+    name: str
+    server: str
+    login: Optional[int]
+    symbol: str
+    timeframe: str
+    max_spread_points: Optional[float]
+
+    @classmethod
+    def parse(cls, section: Mapping) -> 'BrokerConfig':
+        symbol = section.get('symbol', 'US30m')
+        if not symbol:
+            raise ConfigError("broker.symbol must not be empty")
+        return cls(
+            name=section.get('name', ''),
+            server=section.get('server', ''),
+            login=section.get('login'),
+            symbol=symbol,
+            timeframe=section.get('timeframe', 'M15'),
+            max_spread_points=_number(section, 'max_spread_points', None, 'broker', minimum=0),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RiskConfig:
+    # Only what the executor enforces; other risk keys stay in ``raw``
+    max_concurrent_trades: int
+
+    @classmethod
+    def parse(cls, section: Mapping) -> 'RiskConfig':
+        return cls(
+            max_concurrent_trades=_number(section, 'max_concurrent_trades', 5, 'risk', minimum=0, cast=int),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutionConfig:
+    enabled: bool
+    demo_only: bool
+    slippage_points: float
+    deviation_points: int
+    magic_number: int
+    comment: str
+    campaign_window_minutes: float
+    min_seconds_between_entries: float
+    campaign_max_trades: Mapping
+    max_position_minutes: Mapping
+    quality_window: int
+
+    @classmethod
+    def parse(cls, section: Mapping) -> 'ExecutionConfig':
+        return cls(
+            enabled=bool(section.get('enabled', False)),
+            demo_only=bool(section.get('demo_only', True)),
+            slippage_points=_number(section, 'slippage_points', 20, 'execution', minimum=0),
+            deviation_points=_number(section, 'deviation_points', 50, 'execution', minimum=0, cast=int),
+            magic_number=_number(section, 'magic_number', 0, 'execution', minimum=0, cast=int),
+            comment=section.get('comment', 'US30_BOT'),
+            campaign_window_minutes=_number(section, 'campaign_window_minutes', 10, 'execution', minimum=0),
+            min_seconds_between_entries=_number(section, 'min_seconds_between_entries', 0, 'execution', minimum=0),
+            campaign_max_trades=_regime_map(section, 'campaign_max_trades', 'execution'),
+            max_position_minutes=_regime_map(section, 'max_position_minutes', 'execution'),
+            quality_window=_number(section, 'quality_window', 1000, 'execution', minimum=1, cast=int),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class DataConfig:
+    db_path: str
+    candles_directory: str
+    import_chunk_mb: int
+    state_enabled: bool
+    state_directory: str
+    state_interval_seconds: float
+    state_max_age_hours: float
+    ticks_enabled: bool
+    ticks_directory: str
+    ticks_compress: bool
+    ticks_max_queue: int
+    ticks_flush_seconds: float
+    ticks_poll_seconds: float
+
+    @classmethod
+    def parse(cls, section: Mapping) -> 'DataConfig':
+        candles = _section(section, 'candles')
+        state = _section(section, 'state')
+        ticks = _section(section, 'tick_recorder')
+        return cls(
+            db_path=section.get('db_path', 'data/us30_trades.sqlite'),
+            candles_directory=candles.get('directory', 'data/candles'),
+            import_chunk_mb=_number(candles, 'import_chunk_mb', 32, 'data.candles', minimum=1, cast=int),
+            state_enabled=bool(state.get('enabled', False)),
+            state_directory=state.get('directory', 'data/state'),
+            state_interval_seconds=_number(state, 'interval_seconds', 60, 'data.state', minimum=0),
+            state_max_age_hours=_number(state, 'max_age_hours', 24, 'data.state', minimum=0),
+            ticks_enabled=bool(ticks.get('enabled', False)),
+            ticks_directory=ticks.get('directory', 'data/ticks'),
+            ticks_compress=bool(ticks.get('compress', False)),
+            ticks_max_queue=_number(ticks, 'max_queue', 1_000_000, 'data.tick_recorder', minimum=1, cast=int),
+            ticks_flush_seconds=_number(ticks, 'flush_seconds', 1.0, 'data.tick_recorder', minimum=0.01),
+            ticks_poll_seconds=_number(ticks, 'poll_seconds', 0.5, 'data.tick_recorder', minimum=0.01),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RegimeConfig:
+    # ``regime`` thresholds plus the ``us30_specific`` baselines they scale
+    typical_daily_range: float
+    typical_spread: Optional[float]
+    atr_period: int
+    volatility_bars: int
+    spread_ticks: int
+    session_hours: float
+    low_below: float
+    high_above: float
+    hysteresis: float
+    wide_spread_ratio: float
+
+    @classmethod
+    def parse(cls, section: Mapping, us30: Mapping) -> 'RegimeConfig':
+        low_below = _number(section, 'low_below', 0.7, 'regime', minimum=0)
+        high_above = _number(section, 'high_above', 1.3, 'regime', minimum=0)
+        if low_below >= high_above:
+            raise ConfigError(f"regime.low_below ({low_below}) must be below regime.high_above ({high_above})")
+        return cls(
+            typical_daily_range=_number(us30, 'typical_daily_range', 400, 'us30_specific', minimum=0),
+            typical_spread=_number(us30, 'typical_spread', None, 'us30_specific', minimum=0),
+            atr_period=_number(section, 'atr_period', 14, 'regime', minimum=1, cast=int),
+            volatility_bars=_number(section, 'volatility_bars', 48, 'regime', minimum=1, cast=int),
+            spread_ticks=_number(section, 'spread_ticks', 200, 'regime', minimum=1, cast=int),
+            session_hours=_number(section, 'session_hours', 23, 'regime', minimum=1, maximum=24),
+            low_below=low_below,
+            high_above=high_above,
+            hysteresis=_number(section, 'hysteresis', 0.05, 'regime', minimum=0),
+            wide_spread_ratio=_number(section, 'wide_spread_ratio', 3.0, 'regime', minimum=1),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MonitoringConfig:
+    telegram_enabled: bool
+    telegram_bot_token: Optional[str]
+    telegram_chat_id: Any
+    telegram_api_url: str
+    email_enabled: bool
+    email_smtp_server: Optional[str]
+    email_smtp_port: int
+    email_from: Optional[str]
+    email_to: Optional[str]
+    email_password: Optional[str]
+    email_use_tls: bool
+    alert_events: Optional[Tuple[str, ...]]
+    alert_coalesce_seconds: float
+    alert_rate_limit_per_minute: float
+    alert_burst: int
+    alert_max_retries: int
+    alert_backoff_seconds: float
+
+    @classmethod
+    def parse(cls, section: Mapping) -> 'MonitoringConfig':
+        telegram = _section(section, 'telegram')
+        email = _section(section, 'email')
+        alerts = _section(section, 'alerts')
+        events = alerts.get('events')
+        if events is not None and (isinstance(events, str) or not all(isinstance(e, str) for e in events)):
+            raise ConfigError("monitoring.alerts.events must be a list of event kinds")
+        path = 'monitoring.alerts'
+        return cls(
+            telegram_enabled=bool(telegram.get('enabled', False)),
+            telegram_bot_token=telegram.get('bot_token'),
+            telegram_chat_id=telegram.get('chat_id'),
+            telegram_api_url=telegram.get('api_url', 'https://api.telegram.org'),
+            email_enabled=bool(email.get('enabled', False)),
+            email_smtp_server=email.get('smtp_server'),
+            email_smtp_port=_number(email, 'smtp_port', 587, 'monitoring.email', minimum=1, cast=int),
+            email_from=email.get('from_email'),
+            email_to=email.get('to_email'),
+            email_password=email.get('password'),
+            email_use_tls=bool(email.get('use_tls', True)),
+            alert_events=None if events is None else tuple(events),
+            alert_coalesce_seconds=_number(alerts, 'coalesce_seconds', 5.0, path, minimum=0),
+            alert_rate_limit_per_minute=_number(alerts, 'rate_limit_per_minute', 20, path, minimum=0.01),
+            alert_burst=_number(alerts, 'burst', 5, path, minimum=1, cast=int),
+            alert_max_retries=_number(alerts, 'max_retries', 5, path, minimum=0, cast=int),
+            alert_backoff_seconds=_number(alerts, 'backoff_seconds', 2.0, path, minimum=0),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class StrategiesConfig:
+    active: Tuple[str, ...]
+    smc: Mapping
+    smc_enabled: bool
+
+    @classmethod
+    def parse(cls, section: Mapping) -> 'StrategiesConfig':
+        active = section.get('active', ())
+        if isinstance(active, str) or not all(isinstance(a, str) for a in active):
+            raise ConfigError("strategies.active must be a list of strategy names")
+        smc = section.get('smc', MappingProxyType({}))
+        path = 'strategies.smc'
+        _number(smc, 'ema_period', 50, path, minimum=1, cast=int)
+        _number(smc, 'rr_ratio', 3, path, minimum=0.1)
+        _number(smc, 'min_candles', 100, path, minimum=4, cast=int)
+        weights = smc.get('confluence_timeframes') or {}
+        if not isinstance(weights, Mapping):
+            raise ConfigError(f"{path}.confluence_timeframes must be a JSON object, got {type(weights).__name__}")
+        for tf, weight in weights.items():
+            if tf not in TIMEFRAME_SECONDS:
+                raise ConfigError(f"{path}.confluence_timeframes has unknown timeframe {tf!r}")
+            _number({tf: weight}, tf, None, f'{path}.confluence_timeframes', minimum=0)
+        return cls(active=tuple(active), smc=smc, smc_enabled=bool(smc.get('enabled', False)))
+
+
+@dataclass(frozen=True, slots=True)
+class BotConfig:
+    """One immutable, validated version of the bot configuration."""
+    version: int
+    path: str
+    mtime: float
+    broker: BrokerConfig
+    risk: RiskConfig
+    execution: ExecutionConfig
+    regime: RegimeConfig
+    monitoring: MonitoringConfig
+    strategies: StrategiesConfig
+    data: DataConfig
+    raw: Mapping
+
+    @classmethod
+    def parse(cls, raw: dict, version: int = 0, path: str = '', mtime: float = 0.0) -> 'BotConfig':
+        """
+        Validate and freeze a parsed config_us30.json.
+
+        Raises:
+            ConfigError: On any invalid value or structure (e.g. a section
+                that is not an object)
+        """
+        if not isinstance(raw, dict):
+            raise ConfigError("config root must be a JSON object")
+        frozen = _freeze(raw)
+        try:
+            broker = BrokerConfig.parse(_section(frozen, 'broker'))
+            return cls(
+                version=version,
+                path=path,
+                mtime=mtime,
+                broker=broker,
+                risk=RiskConfig.parse(_section(frozen, 'risk')),
+                execution=ExecutionConfig.parse(_section(frozen, 'execution')),
+                regime=RegimeConfig.parse(_section(frozen, 'regime'), _section(frozen, 'us30_specific')),
+                monitoring=MonitoringConfig.parse(_section(frozen, 'monitoring')),
+                strategies=StrategiesConfig.parse(_section(frozen, 'strategies')),
+                data=DataConfig.parse(_section(frozen, 'data')),
+                raw=frozen,
+            )
+        except ConfigError:
+            raise
+        except (AttributeError, TypeError, KeyError) as e:
+            # Wrong nesting below the section level, e.g. "smc": 5
+            raise ConfigError(f"invalid config structure: {e}") from e
+
+    def get(self, key: str, default=None):
+        """Raw section lookup (``cfg.get('monitoring', {})``) for untyped sections."""
+        return self.raw.get(key, default)
+
+
+def load_config(path: str, version: int = 0) -> BotConfig:
+    """
+    Read and validate a config file, e.g. for the command-line tools.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: On invalid JSON; ``ConfigError`` on invalid contents
+    """
+    mtime = os.path.getmtime(path)
+    with open(path, 'r') as f:
+        raw = json.load(f)
+    return BotConfig.parse(raw, version=version, path=path, mtime=mtime)
+
+
+class ConfigManager:
+    """
+    Holds the current ``BotConfig`` and hot-swaps it when the file changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[BotConfig, BotConfig], None]] = []
+        self._watcher = None
+        self._stop = threading.Event()
+        self.current = self._load(version=1, fallback=None)
+        self._seen_mtime = self.current.mtime
+
+    def _load(self, version: int, fallback: Optional[BotConfig]) -> BotConfig:
+        try:
+            return load_config(self.path, version)
+        except (OSError, ValueError) as e:
+            if fallback is not None:
+                raise
+            logging.error(f"Failed to load config {self.path}: {e}")
+            return BotConfig.parse({}, version=version, path=self.path)
+
+    def subscribe(self, callback: Callable[[BotConfig, BotConfig], None]):
+        """Call ``callback(old, new)`` after every successful reload."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def reload(self) -> bool:
+        """
+        Reload if the file changed. Returns True when a new version was swapped in.
+        Never raises: any failure keeps the current version.
+        """
+        with self._lock:
+            old = self.current
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime == self._seen_mtime:
+                    return False
+                # Remember the attempt so a broken file isn't re-parsed every poll
+                self._seen_mtime = mtime
+                new = self._load(old.version + 1, fallback=old)
+            except (OSError, ValueError) as e:
+                logging.error(f"Config reload rejected, keeping version {old.version}: {e}")
+                return False
+            except Exception as e:
+                logging.exception(f"Unexpected error reloading config, keeping version {old.version}: {e}")
+                return False
+            self.current = new
+            subscribers = list(self._subscribers)
+
+        logging.info(f"Config reloaded from {self.path} (version {new.version})")
+        for callback in subscribers:
+            try:
+                callback(old, new)
+            except Exception as e:
+                logging.error(f"Config subscriber failed: {e}")
+        return True
+
+    def start_watching(self, interval: float = 2.0):
+        """Poll the file for changes in a background thread (idempotent)."""
+        if self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self, interval: float):
+        # The watcher must outlive any single bad edit or failing reload
+        while not self._stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logging.exception(f"Config watcher error: {e}")
+
+
+_manager: Optional[ConfigManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_config_manager() -> ConfigManager:
+    """Process-wide manager for ``$CONFIG_PATH`` (default ./config_us30.json)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ConfigManager(os.getenv('CONFIG_PATH', './config_us30.json'))
+        return _manager
+
+
+def get_config() -> BotConfig:
+    """Current config version (a single attribute read)."""
+    return get_config_manager().current
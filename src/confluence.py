@@ -0,0 +1,224 @@
+"""
+Multi-Timeframe Confluence Engine
+=================================
+
+Evaluates the SMC detectors (BOS, MSS, OB, FVG, Liquidity Sweep) on several
+timeframes at once from a single base-timeframe buffer (M5 by default).
+
+Higher timeframes are built from the base bars with aligned bucket indexes
+(``time // tf_seconds``), then the last few bars of every timeframe are
+stacked into ``(n_timeframes, lookback)`` arrays so each detector runs once
+for all timeframes as a vectorized NumPy expression.
+
+The ``detect_*`` functions are the single definition of each SMC pattern.
+They read the last bars along the final axis, so ``SMCStrategy`` calls them
+on 1-D entry-timeframe columns and the engine on the stacked 2-D arrays,
+and the multi-timeframe score cannot disagree with the entry signal.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+TIMEFRAME_SECONDS = {
+    'M1': 60,
+    'M5': 300,
+    'M15': 900,
+    'M30': 1800,
+    'H1': 3600,
+    'H4': 14400,
+    'D1': 86400,
+}
+
+DEFAULT_WEIGHTS = {'M5': 1.0, 'M15': 1.5, 'H1': 2.0, 'H4': 2.5}
+
+COMPONENTS = ('bos', 'mss', 'ob', 'fvg', 'liquidity_sweep')
+
+
+# ----------------------------------------------------------------- detectors
+#
+# Each returns (bullish, bearish) booleans (arrays for 2-D input). Index -1 is
+# the current bar, -2 the previous, -3 the one before. NaN padding compares
+# False.
+
+def detect_bos(high: np.ndarray, low: np.ndarray) -> Tuple:
+    """Break of Structure: a third higher high (bullish) or lower low (bearish)."""
+    with np.errstate(invalid='ignore'):
+        bullish = (high[..., -1] > high[..., -2]) & (high[..., -2] > high[..., -3])
+        bearish = (low[..., -1] < low[..., -2]) & (low[..., -2] < low[..., -3]) & ~bullish
+    return bullish, bearish
+
+
+def detect_mss(close: np.ndarray) -> Tuple:
+    """Market Structure Shift: two higher (bullish) or lower (bearish) closes in a row."""
+    with np.errstate(invalid='ignore'):
+        bullish = (close[..., -1] > close[..., -2]) & (close[..., -2] > close[..., -3])
+        bearish = (close[..., -1] < close[..., -2]) & (close[..., -2] < close[..., -3])
+    return bullish, bearish
+
+
+def detect_ob(open_: np.ndarray, close: np.ndarray) -> Tuple:
+    """Order Block: an up (bullish) or down (bearish) candle followed by a reversal close."""
+    with np.errstate(invalid='ignore'):
+        bullish = (close[..., -2] > open_[..., -2]) & (close[..., -1] < close[..., -2])
+        bearish = (close[..., -2] < open_[..., -2]) & (close[..., -1] > close[..., -2])
+    return bullish, bearish
+
+
+def detect_fvg(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Tuple:
+    """Fair Value Gap: three-candle imbalance up (bullish) or down (bearish)."""
+    with np.errstate(invalid='ignore'):
+        bullish = (high[..., -3] < close[..., -2]) & (open_[..., -2] < low[..., -1])
+        bearish = (low[..., -3] > close[..., -2]) & (open_[..., -2] > high[..., -1])
+    return bullish, bearish
+
+
+def detect_sweep(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Tuple:
+    """Liquidity Sweep: wick beyond the previous high (bullish flag) or low, close back inside."""
+    with np.errstate(invalid='ignore'):
+        above = (high[..., -1] > high[..., -2]) & (close[..., -1] < high[..., -2])
+        below = (low[..., -1] < low[..., -2]) & (close[..., -1] > low[..., -2])
+    return above, below
+
+
+class ConfluenceEngine:
+    """
+    Weighted multi-timeframe SMC confluence scoring.
+
+    Each timeframe scores ``components_present / 5`` when its structure
+    (BOS/MSS direction) agrees with the trade direction, 0 otherwise. The
+    final score is the weight-averaged timeframe score scaled to 0-100,
+    using only timeframes with at least ``min_bars`` bars of history.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, base_tf: str = 'M5', lookback: int = 4,
+                 min_bars: int = 4):
+        """
+        Args:
+            weights: Timeframe -> weight, e.g. {'M5': 1, 'H1': 2}
+            base_tf: Timeframe of the input buffer
+            lookback: Bars per timeframe fed to the detectors (FVG needs 4)
+            min_bars: Bars a timeframe needs to count, like the strategy's
+                ``min_candles`` on the entry timeframe
+        """
+        weights = weights or DEFAULT_WEIGHTS
+        unknown = [tf for tf in list(weights) + [base_tf] if tf not in TIMEFRAME_SECONDS]
+        if unknown:
+            raise ValueError(f"Unknown timeframe(s): {unknown}")
+
+        base_seconds = TIMEFRAME_SECONDS[base_tf]
+        # Keep timeframes ordered from fastest to slowest; drop ones below the base
+        self.timeframes = sorted(
+            (tf for tf in weights if TIMEFRAME_SECONDS[tf] >= base_seconds),
+            key=lambda tf: TIMEFRAME_SECONDS[tf],
+        )
+        self.base_tf = base_tf
+        self.lookback = lookback
+        self.min_bars = max(int(min_bars), lookback)
+        self._seconds = np.array([TIMEFRAME_SECONDS[tf] for tf in self.timeframes], dtype=np.int64)
+        self._weights = np.array([float(weights[tf]) for tf in self.timeframes])
+        self._ratios = self._seconds // base_seconds
+
+        # Base bars needed so every timeframe has `min_bars` bars (+1 for a partial bucket)
+        self.required_base_bars = int(((self.min_bars + 1) * self._ratios).max()) if self.timeframes else 0
+
+    def stack(self, time: np.ndarray, open_: np.ndarray, high: np.ndarray,
+              low: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Aggregate the base buffer into stacked OHLC arrays.
+
+        Returns:
+            {'open'|'high'|'low'|'close': (n_timeframes, lookback) arrays, NaN-padded
+             on the left where a timeframe has fewer bars, 'bars': bars per
+             timeframe in the whole buffer}
+        """
+        n_tf, k = len(self.timeframes), self.lookback
+        out = {name: np.full((n_tf, k), np.nan) for name in ('open', 'high', 'low', 'close')}
+        bars = np.zeros(n_tf, dtype=np.int64)
+
+        n = len(time)
+        time = np.asarray(time).astype(np.int64, copy=False)
+        for row in range(n_tf):
+            # Only the tail of the buffer can contribute to the last `k` buckets
+            tail = max(0, n - int((k + 1) * self._ratios[row]))
+            bucket = time[tail:] // self._seconds[row]
+            starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+            # Skip a leading bucket that may be cut off by the tail slice
+            if tail > 0 and len(starts) > k:
+                starts = starts[1:]
+            starts = starts[-k:]
+            if len(starts) == 0:
+                continue
+
+            first = tail + starts[0]
+            offsets = starts - starts[0]
+            ends = np.r_[starts[1:], n - tail] + tail - 1
+            m = len(starts)
+            out['open'][row, k - m:] = open_[tail + starts]
+            out['close'][row, k - m:] = close[ends]
+            out['high'][row, k - m:] = np.maximum.reduceat(high[first:], offsets)
+            out['low'][row, k - m:] = np.minimum.reduceat(low[first:], offsets)
+            if m < k:
+                bars[row] = m
+            else:
+                # Full history depth, for the min_bars gate
+                every = time // self._seconds[row]
+                bars[row] = 1 + np.count_nonzero(every[1:] != every[:-1])
+
+        out['bars'] = bars
+        return out
+
+    def detect(self, stacked: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Run all SMC detectors across the timeframe axis in one pass."""
+        o, h, l, c = stacked['open'], stacked['high'], stacked['low'], stacked['close']
+
+        bos_bull, bos_bear = detect_bos(h, l)
+        mss_bull, mss_bear = detect_mss(c)
+        ob = np.logical_or(*detect_ob(o, c))
+        fvg = np.logical_or(*detect_fvg(o, h, l, c))
+        sweep = np.logical_or(*detect_sweep(h, l, c))
+
+        flags = np.stack([bos_bull | bos_bear, mss_bull | mss_bear, ob, fvg, sweep])
+        direction = np.sign(
+            (bos_bull.astype(np.int8) + mss_bull) - (bos_bear.astype(np.int8) + mss_bear)
+        ).astype(np.int8)
+        return {'flags': flags, 'count': flags.sum(axis=0), 'direction': direction}
+
+    def evaluate(self, time: np.ndarray, open_: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, trade_type: str) -> Dict:
+        """
+        Score confluence for a trade direction.
+
+        Args:
+            time..close: Base-timeframe columns (epoch seconds + OHLC)
+            trade_type: 'BULLISH' or 'BEARISH'
+
+        Returns:
+            {'score': 0-100, 'timeframes': {tf: {'direction', 'count', 'score', 'weight', components...}}}
+        """
+        stacked = self.stack(time, open_, high, low, close)
+        detected = self.detect(stacked)
+
+        want = 1 if trade_type == 'BULLISH' else -1
+        available = stacked['bars'] >= self.min_bars
+        tf_scores = np.where(detected['direction'] == want, detected['count'] / len(COMPONENTS), 0.0)
+        tf_scores = np.where(available, tf_scores, 0.0)
+
+        weight_total = self._weights[available].sum()
+        score = float((tf_scores * self._weights).sum() / weight_total * 100) if weight_total > 0 else 0.0
+
+        breakdown = {}
+        for row, tf in enumerate(self.timeframes):
+            entry = {
+                'available': bool(available[row]),
+                'direction': {1: 'bullish', -1: 'bearish'}.get(int(detected['direction'][row]), 'neutral'),
+                'count': int(detected['count'][row]),
+                'score': round(float(tf_scores[row]) * 100, 1),
+                'weight': float(self._weights[row]),
+            }
+            for i, name in enumerate(COMPONENTS):
+                entry[name] = bool(detected['flags'][i, row])
+            breakdown[tf] = entry
+
+        return {'score': int(round(score)), 'timeframes': breakdown}
@@ -0,0 +1,285 @@
+"""
+Trading Engine Process
+======================
+
+Everything on the trading path runs in this process, separate from the web
+dashboard:
+
+- The strategy executor: signals, orders, journal sync, regime and shadow
+  variants
+- The live-state collector: price, account, open positions, regime and
+  shadow metrics, plus OB/FVG zones and the signal history. It publishes
+  them every ``engine.publish_seconds`` to the shared snapshot
+  (``src.shared_snapshot``)
+
+The signal history is not copied into the snapshot: the executor writes
+its ring to a memory-mapped file (``signals_file``) that the dashboard
+queries in place. Zones are pickled once per change of the zone book, not
+on every publish.
+
+The dashboard maps that snapshot read-only. HTTP handling and JSON
+serialization therefore run in a different interpreter and do not compete
+with ``SMCStrategy.analyze`` or order sending for this process's GIL.
+
+Run standalone with ``python -m src.engine``, or let start_us30_bot.py
+spawn it (``engine.separate_process``).
+"""
+
+import logging
+import pickle
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+from src.config import get_config, get_config_manager
+from src.regime import get_regime_monitor
+from src.shadow import get_shadow_runner
+from src.shared_snapshot import SnapshotWriter
+from src.signal_history import get_shared_signal_history
+from src.state_store import Snapshotter, state_path
+from src.zones import get_shared_zone_book
+
+
+EMPTY_ACCOUNT = {
+    'balance': 0,
+    'equity': 0,
+    'free_margin': 0,
+    'used_margin': 0,
+    'margin_level': 0,
+}
+
+
+def snapshot_file(config) -> Path:
+    """Shared snapshot path (``engine.snapshot_file``)."""
+    return Path(config.get('engine', {}).get('snapshot_file', 'data/state/engine.snapshot'))
+
+
+def signals_file(config) -> Path:
+    """
+    Shared signal ring next to the snapshot. The capacity is part of the
+    name, so a resized ring is a new file rather than a resize under readers.
+    """
+    capacity = config.strategies.smc.get('signal_history_size', 8192)
+    return snapshot_file(config).with_suffix(f'.signals{capacity}')
+
+
+# ----------------------------------------------------------------- MT5 collectors
+
+def get_open_tickets():
+    """Fetch open tickets from MT5."""
+    try:
+        import MetaTrader5 as mt5
+
+        if not mt5.initialize():
+            return []
+
+        symbol = get_config().broker.symbol
+        positions = mt5.positions_get(symbol=symbol)
+
+        if positions is None:
+            return []
+
+        tickets = []
+        for pos in positions:
+            ticket = {
+                'ticket': pos.ticket,
+                'symbol': pos.symbol,
+                'type': 'BUY' if pos.type == 0 else 'SELL',
+                'volume': pos.volume,
+                'entry_price': pos.price_open,
+                'current_price': pos.price_current,
+                'profit_loss': pos.profit,
+                'profit_loss_pct': (pos.profit / (pos.volume * pos.price_open) * 100) if pos.price_open > 0 else 0,
+                'open_time': datetime.fromtimestamp(pos.time).isoformat() if pos.time > 0 else '',
+                'comment': pos.comment if pos.comment else '',
+                'sl': pos.sl,
+                'tp': pos.tp,
+            }
+            tickets.append(ticket)
+
+        return tickets
+    except Exception as e:
+        logging.error(f"Error fetching tickets: {e}")
+        return []
+
+
+def get_account_info():
+    """Get account information from MT5."""
+    try:
+        import MetaTrader5 as mt5
+
+        if not mt5.initialize():
+            return dict(EMPTY_ACCOUNT)
+
+        account_info = mt5.account_info()
+        if account_info is None:
+            return dict(EMPTY_ACCOUNT)
+
+        return {
+            'balance': account_info.balance,
+            'equity': account_info.equity,
+            'free_margin': account_info.margin_free,
+            'used_margin': account_info.margin,
+            'margin_level': account_info.margin_level if account_info.margin > 0 else 0,
+        }
+    except Exception as e:
+        logging.error(f"Error fetching account info: {e}")
+        return dict(EMPTY_ACCOUNT)
+
+
+def get_current_price():
+    """Get current US30 price (bid) and change vs the previous daily close from MT5."""
+    try:
+        import MetaTrader5 as mt5
+
+        if not mt5.initialize():
+            return 0.0, 0.0, 0.0
+
+        symbol = get_config().broker.symbol
+        tick = mt5.symbol_info_tick(symbol)
+
+        if tick is None:
+            return 0.0, 0.0, 0.0
+
+        # Get previous close (from yesterday or 1 day ago)
+        rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_D1, 1, 2)
+        if rates is not None and len(rates) >= 2:
+            prev_close = rates[0]['close']
+            current_price = tick.bid
+            change = current_price - prev_close
+            change_pct = (change / prev_close * 100) if prev_close > 0 else 0
+        else:
+            current_price = tick.bid
+            change = 0.0
+            change_pct = 0.0
+
+        return current_price, change, change_pct
+    except Exception as e:
+        logging.error(f"Error fetching price: {e}")
+        return 0.0, 0.0, 0.0
+
+
+def collect_live_state(data: Dict, config) -> Dict:
+    """
+    Refresh the dashboard state dict from MT5 and the in-process engine
+    components (regime monitor, shadow runner).
+
+    Args:
+        data: Previous state (updated in place and returned)
+        config: Current ``BotConfig``
+    """
+    try:
+        price, change, change_pct = get_current_price()
+        data['current_price'] = price
+        data['price_change'] = change
+        data['price_change_pct'] = change_pct
+
+        account_info = get_account_info()
+        data['account_balance'] = account_info['balance']
+        data['equity'] = account_info['equity']
+        data['free_margin'] = account_info['free_margin']
+        data['used_margin'] = account_info['used_margin']
+        data['margin_level'] = account_info['margin_level']
+
+        tickets = get_open_tickets()
+        data['open_tickets'] = tickets
+        data['total_profit_loss'] = sum([t['profit_loss'] for t in tickets])
+
+        data['symbol'] = config.broker.symbol
+        data['active_strategies'] = list(config.strategies.active)
+        data['bot_status'] = 'running'
+
+        # Spread/volatility regime (state dict is replaced atomically per update)
+        monitor = get_regime_monitor()
+        if monitor is not None:
+            data['regime'] = monitor.state
+
+        # Paper-traded shadow variants (status tuple is replaced atomically per bar)
+        runner = get_shadow_runner()
+        if runner is not None:
+            data['shadow'] = {
+                'enabled': True,
+                'variants': list(runner.status),
+                'last_bar_time': runner.last_bar_time,
+                'eval_ms': round(runner.last_duration * 1000, 2),
+            }
+    except Exception as e:
+        logging.error(f"Error collecting live state: {e}")
+        data['bot_status'] = 'error'
+
+    data['last_updated'] = datetime.now().isoformat()
+    return data
+
+
+# Zone book version and its pickled zone list, reused while the book is unchanged
+_zones_blob = (None, b'')
+
+
+def build_payload(data: Dict) -> Dict:
+    """
+    Everything the dashboard process needs: the state dict, the zones
+    (pickled list of ``Zone.to_dict()``, tagged with the book version) and
+    the path of the shared signal ring.
+    """
+    global _zones_blob
+    book = get_shared_zone_book()
+    # Version first: a change while the list is built shows up next publish
+    version = book.version
+    if _zones_blob[0] != version:
+        _zones_blob = (version, pickle.dumps([z.to_dict() for z in book.active()], protocol=pickle.HIGHEST_PROTOCOL))
+    history = get_shared_signal_history()
+    return {
+        'data': data,
+        'zones_version': version,
+        'zones': _zones_blob[1],
+        'signals_file': str(history.path) if history.path is not None else None,
+    }
+
+
+# ----------------------------------------------------------------- process entry
+
+def run(poll_seconds: int = 30):
+    """Start the executor and publish live state to the shared snapshot forever."""
+    from src import executor
+
+    config = get_config()
+    engine_cfg = config.get('engine', {})
+    writer = SnapshotWriter(snapshot_file(config), int(engine_cfg.get('snapshot_mb', 4) * 1024 * 1024))
+    publish_seconds = engine_cfg.get('publish_seconds', 2)
+    snapshotter = Snapshotter(
+        state_path(config, 'dashboard'),
+        config.data.state_interval_seconds,
+    )
+    # File-backed before the executor creates the process-wide ring
+    get_shared_signal_history(config.strategies.smc.get('signal_history_size', 8192), signals_file(config))
+
+    executor.start(poll_seconds=poll_seconds)
+    logging.info(f"Engine publishing live state to {writer.path} every {publish_seconds}s")
+
+    manager = get_config_manager()
+    data: Dict = {}
+    try:
+        while True:
+            started = time.perf_counter()
+            data = collect_live_state(dict(data), manager.current)
+            try:
+                writer.publish(build_payload(data))
+            except ValueError as e:
+                logging.error(f"Live state not published: {e} (raise engine.snapshot_mb)")
+            snapshotter.maybe_save(lambda: {'data': dict(data)})
+            time.sleep(max(0.0, publish_seconds - (time.perf_counter() - started)))
+    finally:
+        executor.stop()
+        writer.close()
+
+
+def main(poll_seconds: int = 30):
+    try:
+        run(poll_seconds)
+    except KeyboardInterrupt:
+        logging.info("Engine stopped")
+
+
+if __name__ == '__main__':
+    main()
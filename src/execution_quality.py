@@ -0,0 +1,342 @@
+"""
+Execution Quality (Latency & Slippage)
+======================================
+
+Every order the executor hands to the ``OrderGateway`` is recorded with
+its timeline and price outcome:
+
+- data observed (rates fetched) -> decision -> send -> broker
+  acknowledgement (local clock), plus the broker's own deal time. The
+  reference is when the strategy's input was fetched, not a bar boundary:
+  live decisions are taken on the forming bar
+- signal price, requested price (tick at submit) and fill price;
+  slippage in points is signed so that positive = worse than requested
+- orders rejected locally (spread, stops level) are recorded too, with
+  no send time
+
+Rows go to the ``executions`` table in ``data.db_path`` for later
+analysis. The last ``execution.quality_window`` orders are also kept
+in memory, so the rolling distributions (overall, per session and per UTC hour)
+served to the dashboard need no query. A reader in another process (the
+dashboard, when the engine runs separately) tails new rows by id before
+summarizing.
+
+MT5 bar and deal times are broker server time; they are shifted to UTC
+with the offset measured from the latest tick (see ``server_time_offset``).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.trade_journal import SESSIONS, session_of
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    side TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    retcode INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    order_ticket INTEGER,
+    observed_at REAL,
+    decided_at REAL NOT NULL,
+    sent_at REAL,
+    acked_at REAL,
+    fill_time REAL,
+    signal_price REAL,
+    requested_price REAL,
+    fill_price REAL,
+    slippage_points REAL,
+    volume REAL,
+    session TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_executions_decided ON executions(decided_at);
+"""
+
+# Columns added after the first release: name -> SQL type
+MIGRATIONS = (
+    ('observed_at', 'REAL'),
+)
+
+EXECUTION_COLUMNS = ('symbol', 'strategy', 'side', 'status', 'error', 'retcode', 'attempts', 'order_ticket',
+                     'observed_at', 'decided_at', 'sent_at', 'acked_at', 'fill_time', 'signal_price',
+                     'requested_price', 'fill_price', 'slippage_points', 'volume', 'session')
+
+# Latency stages in milliseconds: (name, from field, to field)
+LATENCY_STAGES = (
+    ('signal_ms', 'observed_at', 'decided_at'),
+    ('send_ms', 'decided_at', 'sent_at'),
+    ('broker_ms', 'sent_at', 'acked_at'),
+    ('total_ms', 'observed_at', 'acked_at'),
+)
+
+
+def server_time_offset(mt5, symbol: str) -> float:
+    """
+    Broker server time minus UTC, in seconds (rounded to 30 minutes).
+
+    MT5 reports bar/tick/deal times as server wall-clock seconds, so
+    ``utc = mt5_time - offset``. Returns 0 if no tick is available.
+    """
+    tick = mt5.symbol_info_tick(symbol)
+    if tick is None or not tick.time:
+        return 0.0
+    return round((tick.time - time.time()) / 1800) * 1800.0
+
+
+def _slippage_points(side: str, requested: Optional[float], filled: Optional[float],
+                     point: Optional[float]) -> Optional[float]:
+    if requested is None or not filled or not point:
+        return None
+    direction = 1 if side == 'BUY' else -1
+    return round((filled - requested) * direction / point, 1)
+
+
+def _distribution(values: List[float]) -> Optional[Dict]:
+    if not values:
+        return None
+    arr = np.asarray(values, dtype=float)
+    p50, p90, p99 = np.percentile(arr, (50, 90, 99))
+    return {
+        'count': int(arr.size),
+        'mean': round(float(arr.mean()), 1),
+        'p50': round(float(p50), 1),
+        'p90': round(float(p90), 1),
+        'p99': round(float(p99), 1),
+        'max': round(float(arr.max()), 1),
+    }
+
+
+class ExecutionQuality:
+    """
+    Execution records (SQLite) plus rolling latency/slippage distributions.
+    """
+
+    def __init__(self, db_path: str, window: int = 1000, slippage_points: Optional[float] = None,
+                 deviation_points: Optional[float] = None):
+        """
+        Args:
+            db_path: SQLite file (shared with the trade journal)
+            window: Orders kept for the rolling distributions
+            slippage_points / deviation_points: Configured tolerances, for
+                the share of fills beyond them
+        """
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.slippage_points = slippage_points
+        self.deviation_points = deviation_points
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._last_id = 0
+        with self._lock:
+            conn = self._conn()
+            conn.executescript(SCHEMA)
+            # Tables created by older versions lack the newer columns
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(executions)')}
+            with conn:
+                for column, sql_type in MIGRATIONS:
+                    if column not in existing:
+                        conn.execute(f'ALTER TABLE executions ADD COLUMN {column} {sql_type}')
+        self._recent = deque(self._load_since(0, window), maxlen=window)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _load_since(self, last_id: int, window: int) -> List[Dict]:
+        """Up to ``window`` newest rows with id > ``last_id``, oldest first."""
+        rows = self._conn().execute(
+            f"SELECT id, {', '.join(EXECUTION_COLUMNS)} FROM executions WHERE id > ? ORDER BY id DESC LIMIT ?",
+            (last_id, window),
+        ).fetchall()
+        if rows:
+            self._last_id = max(self._last_id, rows[0][0])
+        return [dict(zip(EXECUTION_COLUMNS, row[1:])) for row in reversed(rows)]
+
+    def refresh(self) -> int:
+        """
+        Pull rows recorded by other processes into the window.
+
+        Returns:
+            Number of new rows
+        """
+        try:
+            with self._lock:
+                rows = self._load_since(self._last_id, self._recent.maxlen)
+                self._recent.extend(rows)
+        except sqlite3.Error as e:
+            logging.error(f"Failed to read execution records: {e}")
+            return 0
+        return len(rows)
+
+    # ----------------------------------------------------------------- recording
+
+    def record(self, entry: Dict, outcome: Optional[Dict] = None, reason: Optional[str] = None,
+               mt5=None) -> Dict:
+        """
+        Record one order.
+
+        Args:
+            entry: Executor entry: symbol, strategy, side, volume,
+                observed_at (when the analysed data was fetched), decided_at,
+                signal_price and optionally server_offset (seconds, for the
+                broker deal time)
+            outcome: ``OrderGateway`` outcome (None if rejected before send)
+            reason: Local rejection reason
+            mt5: MetaTrader5 module, to look up the broker deal time
+
+        Returns:
+            The stored record
+        """
+        row = {
+            'symbol': entry['symbol'],
+            'strategy': entry.get('strategy', 'smc'),
+            'side': entry['side'],
+            'status': 'rejected',
+            'error': reason,
+            'retcode': None,
+            'attempts': 0,
+            'order_ticket': None,
+            'observed_at': entry.get('observed_at'),
+            'decided_at': entry['decided_at'],
+            'sent_at': None,
+            'acked_at': None,
+            'fill_time': None,
+            'signal_price': entry.get('signal_price'),
+            'requested_price': None,
+            'fill_price': None,
+            'slippage_points': None,
+            'volume': entry.get('volume'),
+            'session': session_of(entry['decided_at']),
+        }
+        if outcome is not None:
+            result = outcome.get('result')
+            row.update({
+                'status': 'filled' if outcome['ok'] else 'failed',
+                'error': outcome.get('error'),
+                'retcode': getattr(result, 'retcode', None),
+                'attempts': outcome.get('attempts', 0),
+                'order_ticket': getattr(result, 'order', None) or None,
+                'sent_at': outcome.get('sent_at'),
+                'acked_at': outcome.get('acked_at'),
+                'requested_price': outcome.get('requested_price'),
+            })
+            if outcome['ok']:
+                row['fill_price'] = getattr(result, 'price', None) or None
+                row['volume'] = getattr(result, 'volume', None) or row['volume']
+                row['slippage_points'] = _slippage_points(
+                    row['side'], row['requested_price'], row['fill_price'], outcome.get('point'))
+                deal = getattr(result, 'deal', None)
+                if mt5 is not None and deal:
+                    row['fill_time'] = self._deal_time(mt5, deal, entry.get('server_offset', 0.0))
+
+        try:
+            with self._lock:
+                conn = self._conn()
+                with conn:
+                    cursor = conn.execute(
+                        f"INSERT INTO executions ({', '.join(EXECUTION_COLUMNS)}) "
+                        f"VALUES ({', '.join(':' + c for c in EXECUTION_COLUMNS)})",
+                        row,
+                    )
+                self._last_id = max(self._last_id, cursor.lastrowid)
+                self._recent.append(row)
+        except sqlite3.Error as e:
+            logging.error(f"Failed to store execution record: {e}")
+            self._recent.append(row)
+        return row
+
+    @staticmethod
+    def _deal_time(mt5, ticket: int, server_offset: float) -> Optional[float]:
+        try:
+            deals = mt5.history_deals_get(ticket=ticket)
+        except Exception as e:
+            logging.debug(f"history_deals_get({ticket}) failed: {e}")
+            return None
+        if not deals:
+            return None
+        return deals[0].time_msc / 1000.0 - server_offset
+
+    # ----------------------------------------------------------------- reading
+
+    def summary(self, recent: int = 20) -> Dict:
+        """
+        Rolling distributions over the in-memory window (after ``refresh``).
+
+        Returns:
+            {'window', 'orders', 'status': {filled, failed, rejected},
+             'overall': {...}, 'sessions': [...], 'hours': [...],
+             'tolerances': {...}, 'recent': [...]}. Each group holds a
+            distribution per latency stage (ms) and for slippage (points),
+            plus the share of fills beyond ``slippage_points``/``deviation_points``
+        """
+        self.refresh()
+        records = list(self._recent)
+        status = {'filled': 0, 'failed': 0, 'rejected': 0}
+        for r in records:
+            status[r['status']] = status.get(r['status'], 0) + 1
+
+        by_session: Dict[str, List[Dict]] = {}
+        by_hour: Dict[int, List[Dict]] = {}
+        for r in records:
+            by_session.setdefault(r['session'], []).append(r)
+            by_hour.setdefault(int(r['decided_at'] // 3600) % 24, []).append(r)
+
+        return {
+            'window': self._recent.maxlen,
+            'orders': len(records),
+            'status': status,
+            'overall': self._group(records),
+            'sessions': [dict(key=s, **self._group(by_session[s])) for s in SESSIONS if s in by_session],
+            'hours': [dict(key=h, **self._group(by_hour[h])) for h in sorted(by_hour)],
+            'tolerances': {'slippage_points': self.slippage_points, 'deviation_points': self.deviation_points},
+            'recent': records[-recent:][::-1] if recent else [],
+        }
+
+    def _group(self, records: List[Dict]) -> Dict:
+        group = {'orders': len(records)}
+        for name, start, end in LATENCY_STAGES:
+            group[name] = _distribution([
+                (r[end] - r[start]) * 1000 for r in records if r[start] is not None and r[end] is not None
+            ])
+        slippage = [r['slippage_points'] for r in records if r['slippage_points'] is not None]
+        group['slippage_points'] = _distribution(slippage)
+        for key in ('slippage_points', 'deviation_points'):
+            limit = getattr(self, key)
+            group[f'beyond_{key}'] = (
+                round(sum(abs(s) > limit for s in slippage) / len(slippage) * 100, 1)
+                if slippage and limit is not None else None
+            )
+        return group
+
+
+_instances: Dict[str, ExecutionQuality] = {}
+_instances_lock = threading.Lock()
+
+
+def get_execution_quality(config) -> ExecutionQuality:
+    """Process-wide recorder for ``data.db_path``; tolerances follow the current config."""
+    path = config.data.db_path
+    with _instances_lock:
+        if path not in _instances:
+            _instances[path] = ExecutionQuality(path, window=config.execution.quality_window)
+        instance = _instances[path]
+    instance.slippage_points = config.execution.slippage_points
+    instance.deviation_points = config.execution.deviation_points
+    return instance
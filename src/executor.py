@@ -6,17 +6,36 @@ Features:
 - Fetches M5/H1 candles from MetaTrader5 (if available)
 - Runs `SMCStrategy.analyze()` and logs results to console/log file
 - Will only place orders if environment variable `ALLOW_PLACE_ORDERS=1` is set
+- Tracks the spread/volatility regime and applies its per-regime campaign
+  trade cap and maximum holding time
+- Snapshots candle windows, strategy state and entry bookkeeping (right
+  after every entry) so a restart only fetches the bars it missed, and
+  reconciles the bookkeeping with open bot positions so it never re-enters
+  on the same bar
 """
 
 import os
-import json
 import time
 import threading
 import logging
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
+
+from src import shadow as shadow_mode
+from src import tick_recorder
+from src.alerts import AlertDispatcher
+from src.config import get_config_manager
+from src.confluence import TIMEFRAME_SECONDS
+from src.execution_quality import get_execution_quality, server_time_offset
+from src.order_gateway import OrderGateway
+from src.regime import get_regime_monitor
+from src.signal_history import get_shared_signal_history
+from src.state_store import Snapshotter, load_state, state_path
 from src.strategies import SMCStrategy
+from src.trade_journal import get_trade_journal, sync_mt5_deals
+from src.zones import get_shared_zone_book
 
 
 LOG_PATH = Path('./logs/us30_bot.log')
@@ -32,36 +51,83 @@ logging.basicConfig(
 )
 
 
-def load_config():
-    path = os.getenv('CONFIG_PATH', './config_us30.json')
-    try:
-        with open(path, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logging.error(f"Failed to load config {path}: {e}")
-        return {}
+# Background tick recorder (None unless data.tick_recorder.enabled)
+TICK_RECORDER = None
+
+# Alert dispatcher (no-op until monitoring.telegram/email are enabled)
+ALERTS = AlertDispatcher([])
+
+# How often closed MT5 positions are copied into the trade journal
+JOURNAL_SYNC_SECONDS = 60
+
+# Set by stop(); the loop exits at its next wait
+_STOP = threading.Event()
+_THREAD = None
 
 
 def start(poll_seconds: int = 30):
     """Start executor thread (daemon)."""
-    thread = threading.Thread(target=_run, args=(poll_seconds,), daemon=True)
-    thread.start()
+    global TICK_RECORDER, _THREAD
+    manager = get_config_manager()
+    manager.start_watching()
+    if TICK_RECORDER is None:
+        TICK_RECORDER = tick_recorder.start_from_config(manager.current)
+    _STOP.clear()
+    _THREAD = threading.Thread(target=_run, args=(poll_seconds,), daemon=True)
+    _THREAD.start()
     logging.info("Executor thread started")
 
 
-def _run(poll_seconds: int):
-    config = load_config()
-    execution_cfg = config.get('execution', {})
-    strategies_cfg = config.get('strategies', {})
+def stop(timeout: float = 10.0):
+    """Stop the executor loop and wait for it to release the shadow runner and gateway."""
+    _STOP.set()
+    if _THREAD is not None:
+        _THREAD.join(timeout)
+
 
-    active = strategies_cfg.get('active', [])
+def _run(poll_seconds: int):
+    global ALERTS
+    manager = get_config_manager()
+    config = manager.current
+    ALERTS = AlertDispatcher.from_config(config)
 
     # Only run SMC by default here
-    if 'smc' not in active or not strategies_cfg.get('smc', {}).get('enabled', False):
+    if 'smc' not in config.strategies.active or not config.strategies.smc_enabled:
         logging.info("SMC strategy not active or enabled in config; executor will remain idle.")
         return
 
-    smc = SMCStrategy(strategies_cfg.get('smc', {}))
+    smc_cfg = config.strategies.smc
+    zone_book = get_shared_zone_book(
+        max_age_seconds=smc_cfg.get('zone_max_age_hours', 48) * 3600,
+        max_zones=smc_cfg.get('zone_max_count', 500),
+    )
+    signal_history = get_shared_signal_history(smc_cfg.get('signal_history_size', 8192))
+    # Spread/volatility regime; hot-path readers use ``regime.regime`` only
+    regime = get_regime_monitor(config)
+    if TICK_RECORDER is not None:
+        TICK_RECORDER.add_listener(regime.on_ticks)
+    smc = SMCStrategy(smc_cfg, zone_book=zone_book, signal_history=signal_history, regime_monitor=regime)
+
+    # Warm state from the last run (rolling windows, strategy, bookkeeping)
+    snapshot_file = state_path(config, 'executor')
+    snapshotter = Snapshotter(snapshot_file, config.data.state_interval_seconds)
+    bookkeeping = {'last_entry_bar_time': None, 'entries': []}
+    entry_buffer = None
+    bias_buffer = None
+
+    saved = load_state(snapshot_file, config.data.state_max_age_hours * 3600)
+    if saved:
+        smc.set_state(saved.get('strategy', {}))
+        bookkeeping.update(saved.get('bookkeeping', {}))
+        entry_buffer = saved.get('entry_buffer')
+        bias_buffer = saved.get('bias_buffer')
+        # Older snapshots held DataFrames; refetch those in full
+        if not isinstance(entry_buffer, np.ndarray) or not isinstance(bias_buffer, np.ndarray):
+            entry_buffer = bias_buffer = None
+        logging.info(
+            f"Restored executor state from {snapshot_file}: "
+            f"{0 if entry_buffer is None else len(entry_buffer)} M5 bars, {len(smc.zone_book)} zones"
+        )
 
     # Try to import MT5 but fail gracefully
     try:
@@ -71,76 +137,406 @@ def _run(poll_seconds: int):
         mt5_available = False
         logging.warning("MetaTrader5 not available; executor will only run in offline/demo mode.")
 
-    symbol = config.get('broker', {}).get('symbol', 'US30m')
+    symbol = config.broker.symbol
 
     allow_place = os.getenv('ALLOW_PLACE_ORDERS', '0') == '1'
     if allow_place:
         logging.warning("ALLOW_PLACE_ORDERS=1 detected: executor MAY attempt to place orders (demo).")
 
-    while True:
-        try:
-            entry_data = None
-            bias_data = None
+    # Order gateway up front: symbol metadata and request templates are warm
+    # before the first signal instead of being loaded on its order path
+    gateway = None
+    if allow_place and mt5_available:
+        if not mt5.initialize():
+            logging.warning("MT5 initialize() failed; order gateway will load symbol metadata on its next refresh")
+        gateway = OrderGateway(
+            mt5,
+            symbol,
+            config.execution,
+            max_spread_points=config.broker.max_spread_points,
+        )
+        gateway.start()
+
+    journal = get_trade_journal(config)
+    quality = get_execution_quality(config)
+
+    # Paper-traded parameter variants on the same feed (None unless shadow.enabled)
+    shadow = shadow_mode.start_from_config(config)
+    last_journal_sync = 0.0
+    closing = set()
+    # Restored bookkeeping is checked against live positions before any entry
+    reconciled = False
+    # Bar of the last signal alert
+    alerted_bar_time = None
+    # Entries sent to the gateway whose broker answer has not arrived yet
+    in_flight = set()
+
+    def on_entry_result(outcome, entry):
+        # Runs on the gateway's confirmation thread
+        in_flight.discard(id(entry))
+        _on_order_result(outcome, entry, quality, mt5)
+
+    def build_state():
+        return {
+            'strategy': smc.get_state(),
+            'bookkeeping': bookkeeping,
+            'entry_buffer': entry_buffer,
+            'bias_buffer': bias_buffer,
+        }
 
-            if mt5_available:
-                if not mt5.initialize():
-                    logging.debug("MT5 initialize() returned False")
+    def on_config_change(old, new):
+        # Runs on the watcher thread. The strategy swaps in one immutable
+        # SMCParams (analyze() reads it once per call); gateway fields are
+        # single attributes read per order
+        if new.strategies.smc != old.strategies.smc:
+            smc.update_params(new.strategies.smc)
+            logging.info(f"SMC parameters updated from config version {new.version}")
+        regime.configure(new)
+        if gateway is not None:
+            gateway.max_spread_points = new.broker.max_spread_points
+            gateway.execution = new.execution
+            gateway.refresh()
+
+    manager.subscribe(on_config_change)
+
+    try:
+        while not _STOP.is_set():
+            try:
+                config = manager.current
+                entry_data = None
+                bias_data = None
+                connected = False
+
+                if mt5_available:
+                    if not mt5.initialize():
+                        logging.debug("MT5 initialize() returned False")
+                    else:
+                        connected = True
+                        # Fetch M5 and H1 (only bars newer than the rolling windows)
+                        try:
+                            entry_bars = smc.required_bars
+                            if shadow is not None:
+                                # Shadow variants see closed bars only: one extra for the forming bar
+                                entry_bars = max(entry_bars, shadow.required_bars + 1)
+                            entry_buffer = _fetch_incremental(mt5, symbol, mt5.TIMEFRAME_M5, entry_buffer, entry_bars)
+                            bias_buffer = _fetch_incremental(mt5, symbol, mt5.TIMEFRAME_H1, bias_buffer, 20)
+                            # The forming bar is analysed as of this fetch
+                            observed_at = time.time()
+                            entry_data = entry_buffer
+                            bias_data = bias_buffer
+
+                            # Regime statistics: closed bars, plus the current quote without a tick recorder
+                            if regime.point is None:
+                                info = mt5.symbol_info(symbol)
+                                regime.point = info.point if info is not None else None
+                            if TICK_RECORDER is None:
+                                tick = mt5.symbol_info_tick(symbol)
+                                if tick is not None:
+                                    regime.on_tick(tick.bid, tick.ask)
+                            if entry_buffer is not None:
+                                regime.on_bars(entry_buffer[:-1])
+                        except Exception as e:
+                            logging.error(f"Error fetching rates from MT5: {e}")
+                            entry_data = None
+                            bias_data = None
                 else:
-                    # Fetch M5 and H1
+                    # No MT5: do nothing but log that executor is idle
+                    logging.debug("MT5 not available; skipping data fetch")
+
+                if gateway is not None and connected and not reconciled:
+                    added = _reconcile_entries(
+                        mt5, symbol, config.execution.magic_number, bookkeeping, TIMEFRAME_SECONDS['M5'])
+                    if added is not None:
+                        reconciled = True
+                        if added:
+                            logging.info(f"Reconciled {added} open bot position(s) into entry bookkeeping")
+                            snapshotter.maybe_save(build_state, force=True)
+
+                # Close bot positions held longer than the regime allows. Runs every
+                # loop, before (and independent of) signal evaluation, so positions
+                # left open across a restart are closed on time too
+                if gateway is not None and connected:
                     try:
-                        rates_m5 = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M5, 0, smc.min_candles)
-                        rates_h1 = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_H1, 0, 20)
-                        import pandas as pd
-                        if rates_m5 is not None and len(rates_m5) > 0:
-                            entry_data = pd.DataFrame(rates_m5)[['open', 'high', 'low', 'close', 'tick_volume']]
-                        if rates_h1 is not None and len(rates_h1) > 0:
-                            bias_data = pd.DataFrame(rates_h1)[['open', 'high', 'low', 'close', 'tick_volume']]
+                        _close_expired_positions(mt5, gateway, symbol, config, regime.regime, closing)
                     except Exception as e:
-                        logging.error(f"Error fetching rates from MT5: {e}")
-                        entry_data = None
-                        bias_data = None
-            else:
-                # No MT5: do nothing but log that executor is idle
-                logging.debug("MT5 not available; skipping data fetch")
-
-            if entry_data is None or bias_data is None:
-                logging.info("Insufficient live data for analysis (MT5 missing or not enough candles).")
-            else:
-                signal = smc.analyze(entry_data, bias_data)
-                now = datetime.utcnow().isoformat()
-                logging.info(f"SMC analyze result at {now}: signal={signal['signal']} strength={signal['strength']} details={signal.get('details')} ")
-
-                if signal['signal'] != 'NONE' and execution_cfg.get('enabled', False):
-                    logging.info(f"Valid signal detected: {signal['signal']} — entry {signal['entry_price']} SL {signal['stop_loss']} TP {signal['take_profit']}")
-
-                    if allow_place and mt5_available:
-                        # Attempt to place a market order (demo). Use small volume and the mt5 API.
-                        try:
-                            tick = mt5.symbol_info_tick(symbol)
-                            price = tick.ask if signal['signal'] == 'BUY' else tick.bid
-                            volume = 0.01
-                            order_type = mt5.ORDER_TYPE_BUY if signal['signal'] == 'BUY' else mt5.ORDER_TYPE_SELL
-                            request = {
-                                "action": mt5.TRADE_ACTION_DEAL,
-                                "symbol": symbol,
-                                "volume": volume,
-                                "type": order_type,
-                                "price": price,
-                                "sl": float(signal['stop_loss']) if signal.get('stop_loss') else 0.0,
-                                "tp": float(signal['take_profit']) if signal.get('take_profit') else 0.0,
-                                "deviation": execution_cfg.get('deviation_points', 50),
-                                "magic": execution_cfg.get('magic_number', 0),
-                                "comment": execution_cfg.get('comment', 'US30_BOT'),
-                            }
-                            result = mt5.order_send(request)
-                            logging.info(f"Order send result: {result}")
-                        except Exception as e:
-                            logging.error(f"Failed to place order: {e}")
-                    else:
-                        logging.info("Order placement skipped (ALLOW_PLACE_ORDERS not set or MT5 not available).")
+                        logging.error(f"Position age check failed: {e}")
+
+                if entry_data is None or bias_data is None:
+                    logging.info("Insufficient live data for analysis (MT5 missing or not enough candles).")
+                else:
+                    # The last M5 bar is still forming
+                    signal = smc.analyze(entry_data, bias_data, forming=True)
+                    decided_at = time.time()
+                    now = datetime.utcnow().isoformat()
+                    logging.info(f"SMC analyze result at {now}: signal={signal['signal']} strength={signal['strength']} details={signal.get('details')} ")
+
+                    if signal['signal'] != 'NONE' and config.execution.enabled:
+                        logging.info(f"Valid signal detected: {signal['signal']} — entry {signal['entry_price']} SL {signal['stop_loss']} TP {signal['take_profit']}")
+                        bar_time = int(entry_data['time'][-1])
+                        current_regime = regime.regime
+                        campaign_limit = config.execution.campaign_max_trades.get(current_regime)
+                        campaign_start = time.time() - config.execution.campaign_window_minutes * 60
+                        campaign_trades = sum(1 for e in bookkeeping['entries'] if e['submitted_at'] >= campaign_start)
+                        last_submitted = max((e['submitted_at'] for e in bookkeeping['entries']), default=None)
+                        min_gap = config.execution.min_seconds_between_entries
+                        if bookkeeping['last_entry_bar_time'] == bar_time:
+                            logging.info("Already entered on this bar; skipping duplicate entry.")
+                        elif in_flight:
+                            logging.info("Previous entry order still awaiting the broker; skipping entry.")
+                        elif last_submitted is not None and time.time() - last_submitted < min_gap:
+                            logging.info(
+                                f"Last entry {time.time() - last_submitted:.0f}s ago "
+                                f"(min {min_gap}s between entries); skipping entry."
+                            )
+                        elif campaign_limit is not None and campaign_trades >= campaign_limit:
+                            logging.info(
+                                f"Campaign limit reached ({campaign_trades}/{campaign_limit} in "
+                                f"{config.execution.campaign_window_minutes} min, {current_regime} regime); skipping entry."
+                            )
+                        elif regime.spread_wide:
+                            logging.info(f"Spread wide (mean {regime.state['spread_mean']}); skipping entry.")
+                        elif gateway is not None and _position_cap_reached(mt5, symbol, config):
+                            logging.info(
+                                f"Max concurrent trades ({config.risk.max_concurrent_trades}) open; skipping entry.")
+                        else:
+                            # One alert per signal bar (not per poll), only when it can be acted on
+                            first_on_bar = bar_time != alerted_bar_time
+                            if first_on_bar:
+                                alerted_bar_time = bar_time
+                                ALERTS.notify(
+                                    'signal',
+                                    f"{signal['signal']} {symbol} (strength {signal['strength']})",
+                                    f"Entry {signal['entry_price']} SL {signal['stop_loss']} TP {signal['take_profit']}",
+                                )
+                            if gateway is not None and reconciled:
+                                # Deal times are broker server time
+                                server_offset = server_time_offset(mt5, symbol)
+                                entry = {
+                                    'bar_time': bar_time,
+                                    'symbol': symbol,
+                                    'strategy': 'smc',
+                                    'side': signal['signal'],
+                                    'volume': 0.01,
+                                    'sl': signal['stop_loss'],
+                                    'tp': signal['take_profit'],
+                                    'signal_price': float(signal['entry_price']),
+                                    'observed_at': observed_at,
+                                    'server_offset': server_offset,
+                                    'decided_at': decided_at,
+                                    'submitted_at': time.time(),
+                                    'order': None,
+                                }
+                                # Pre-validated, asynchronous send; result arrives in on_entry_result
+                                in_flight.add(id(entry))
+                                submitted = gateway.submit(
+                                    signal['signal'],
+                                    entry['volume'],
+                                    sl=float(signal['stop_loss']) if signal.get('stop_loss') else 0.0,
+                                    tp=float(signal['take_profit']) if signal.get('take_profit') else 0.0,
+                                    callback=lambda outcome, entry=entry: on_entry_result(outcome, entry),
+                                )
+                                if submitted['accepted']:
+                                    bookkeeping['last_entry_bar_time'] = bar_time
+                                    bookkeeping['entries'] = bookkeeping['entries'][-49:] + [entry]
+                                    # Persist now: a restart inside the snapshot interval must not re-enter this bar
+                                    snapshotter.maybe_save(build_state, force=True)
+                                else:
+                                    in_flight.discard(id(entry))
+                                    logging.warning(f"Order rejected before send: {submitted['reason']}")
+                                    quality.record(entry, reason=submitted['reason'])
+                                    if first_on_bar:
+                                        ALERTS.notify('risk', f"{signal['signal']} {symbol} order blocked", submitted['reason'])
+                            elif gateway is not None:
+                                logging.info("Order placement skipped until open positions are reconciled.")
+                            else:
+                                logging.info("Order placement skipped (ALLOW_PLACE_ORDERS not set or MT5 not available).")
+
+                # Fan the last closed bar out to the shadow variants (after the live path)
+                if shadow is not None and entry_data is not None and bias_data is not None:
+                    if shadow.on_bar(entry_data[:-1], bias_data[:-1]):
+                        logging.debug(f"Shadow variants evaluated in {shadow.last_duration * 1000:.1f} ms")
+
+                # Journal positions closed since the last sync (feeds /api/trades)
+                if mt5_available and time.time() - last_journal_sync >= JOURNAL_SYNC_SECONDS:
+                    last_journal_sync = time.time()
+                    try:
+                        added = sync_mt5_deals(mt5, journal, symbol, config.execution.magic_number or None)
+                        if added:
+                            logging.info(f"Journaled {added} closed trade(s)")
+                    except Exception as e:
+                        logging.error(f"Trade journal sync failed: {e}")
+
+                snapshotter.maybe_save(build_state)
+
+                _STOP.wait(poll_seconds)
+
+            except Exception as exc:
+                logging.exception(f"Executor loop error: {exc}")
+                ALERTS.notify('error', 'Executor loop error', str(exc))
+                _STOP.wait(poll_seconds)
+
+    finally:
+        # Worker processes and shared memory of the shadow runner, and the gateway's sender
+        if shadow is not None:
+            shadow.stop()
+        if gateway is not None:
+            gateway.stop()
+        logging.info("Executor stopped")
+
+
+def _fetch_incremental(mt5, symbol, timeframe, buffer, count):
+    """
+    Keep a rolling window of `count` bars, fetching only bars from the
+    buffer's last (possibly still forming) bar onwards.
+
+    The window is the MT5 rates structured array itself (no DataFrame), so
+    the strategy reads its columns as zero-copy views.
+    """
+    if buffer is None or len(buffer) < count:
+        rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+        if rates is None or len(rates) == 0:
+            return buffer
+        return rates
+
+    last_time = int(buffer['time'][-1])
+    rates = mt5.copy_rates_range(
+        symbol,
+        timeframe,
+        datetime.fromtimestamp(last_time, tz=timezone.utc),
+        datetime.now(tz=timezone.utc) + timedelta(days=1),
+    )
+    if rates is None or len(rates) == 0:
+        return buffer
+
+    # Replace the (possibly still forming) tail with the fresh bars
+    keep = np.searchsorted(buffer['time'], rates['time'][0], 'left')
+    return np.concatenate([buffer[max(0, keep + len(rates) - count):keep], rates.astype(buffer.dtype, copy=False)])
+
+
+def _reconcile_entries(mt5, symbol, magic, bookkeeping, bar_seconds):
+    """
+    Fold open bot positions into the entry bookkeeping, so a restart whose
+    snapshot predates an entry (or that has no snapshot) cannot enter the
+    same bar again or miscount the campaign.
+
+    Returns:
+        Number of positions added, or None if positions could not be read
+    """
+    positions = mt5.positions_get(symbol=symbol)
+    if positions is None:
+        return None
+    known = {e.get('order') for e in bookkeeping['entries']}
+    server_offset = server_time_offset(mt5, symbol)
+    added = 0
+    for position in sorted(positions, key=lambda p: p.time):
+        if magic and position.magic != magic:
+            continue
+        # Position and bar times are both broker server time
+        bar_time = int(position.time // bar_seconds * bar_seconds)
+        last = bookkeeping['last_entry_bar_time']
+        if last is None or bar_time > last:
+            bookkeeping['last_entry_bar_time'] = bar_time
+        if position.ticket in known:
+            continue
+        bookkeeping['entries'] = bookkeeping['entries'][-49:] + [{
+            'bar_time': bar_time,
+            'symbol': position.symbol,
+            'strategy': 'smc',
+            'side': 'BUY' if position.type == 0 else 'SELL',
+            'volume': position.volume,
+            'submitted_at': position.time - server_offset,
+            'order': position.ticket,
+        }]
+        added += 1
+    return added
+
+
+def _position_cap_reached(mt5, symbol, config):
+    """
+    True if ``risk.max_concurrent_trades`` bot positions are open, or if
+    open positions cannot be read.
+    """
+    positions = mt5.positions_get(symbol=symbol)
+    if positions is None:
+        return True
+    magic = config.execution.magic_number
+    count = sum(1 for p in positions if not magic or p.magic == magic)
+    return count >= config.risk.max_concurrent_trades
+
+
+def _close_expired_positions(mt5, gateway, symbol, config, current_regime, closing):
+    """
+    Queue closes for bot positions older than ``execution.max_position_minutes``
+    of the current regime. ``closing`` holds tickets with a close in flight.
+    """
+    limit = config.execution.max_position_minutes.get(current_regime)
+    if limit is None:
+        return
+    positions = mt5.positions_get(symbol=symbol)
+    if not positions:
+        closing.clear()
+        return
+    magic = config.execution.magic_number
+    # Position times are broker server time
+    now_server = time.time() + server_time_offset(mt5, symbol)
+    open_tickets = set()
+    for position in positions:
+        open_tickets.add(position.ticket)
+        if (magic and position.magic != magic) or position.ticket in closing:
+            continue
+        age_minutes = (now_server - position.time) / 60
+        if age_minutes < limit:
+            continue
+        submitted = gateway.submit_close(
+            position,
+            callback=lambda outcome, ticket=position.ticket: _on_close_result(outcome, ticket, closing),
+        )
+        if submitted['accepted']:
+            closing.add(position.ticket)
+            logging.info(
+                f"Closing position {position.ticket}: open {age_minutes:.0f} min "
+                f"(max {limit} in {current_regime} regime)"
+            )
+        else:
+            logging.warning(f"Close of position {position.ticket} rejected before send: {submitted['reason']}")
+    closing.intersection_update(open_tickets)
+
+
+def _on_close_result(outcome, ticket, closing):
+    """Log the broker's answer for a max-age close; failed closes are retried next loop."""
+    if outcome['ok']:
+        logging.info(f"Position {ticket} closed after {outcome['attempts']} attempt(s): {outcome['result']}")
+        ALERTS.notify('risk', f"Position {ticket} closed (max holding time)", str(outcome['request']['price']))
+    else:
+        closing.discard(ticket)
+        logging.error(f"Close of position {ticket} failed after {outcome['attempts']} attempt(s): {outcome['error']}")
 
-            time.sleep(poll_seconds)
 
-        except Exception as exc:
-            logging.exception(f"Executor loop error: {exc}")
-            time.sleep(poll_seconds)
+def _on_order_result(outcome, entry=None, quality=None, mt5=None):
+    """Log and record the broker's answer for an order sent by the gateway."""
+    if entry is not None and outcome['ok']:
+        entry['order'] = getattr(outcome['result'], 'order', None)
+    record = None
+    if entry is not None and quality is not None:
+        record = quality.record(entry, outcome, mt5=mt5)
+    request = outcome['request']
+    if outcome['ok']:
+        if record is not None and record['observed_at'] is not None:
+            logging.info(
+                f"Order filled after {outcome['attempts']} attempt(s): {record['fill_price']} "
+                f"(requested {record['requested_price']}, slippage {record['slippage_points']} pts), "
+                f"data->decision {(record['decided_at'] - record['observed_at']) * 1000:.0f} ms, "
+                f"decision->send {(record['sent_at'] - record['decided_at']) * 1000:.0f} ms, "
+                f"broker {(record['acked_at'] - record['sent_at']) * 1000:.0f} ms"
+            )
+        else:
+            logging.info(f"Order filled after {outcome['attempts']} attempt(s): {outcome['result']}")
+        result = outcome['result']
+        ALERTS.notify(
+            'fill',
+            f"{outcome['side']} {request['volume']} {request['symbol']} filled",
+            f"Price {getattr(result, 'price', request['price'])} SL {request['sl']} TP {request['tp']}",
+        )
+    else:
+        logging.error(f"Order failed after {outcome['attempts']} attempt(s): {outcome['error']}")
+        ALERTS.notify('error', f"{outcome['side']} {request['symbol']} order failed", outcome['error'])
@@ -0,0 +1,402 @@
+"""
+Bulk Historical Data Importer
+=============================
+
+Loads history into the local candle store (``src.candle_store``) from:
+
+- MT5 "Export bars" CSVs (``<DATE>\\t<TIME>\\t<OPEN>...`` headers)
+- MT4-style headerless CSVs (``2024.01.02,00:00,open,high,low,close,volume``)
+- MT4/MT5 ``.hst`` history dumps (format 400 and 401)
+- Cached yfinance downloads saved with ``DataFrame.to_csv`` (single and
+  multi-level column headers)
+- Generic CSVs with ``time`` (epoch seconds/ms or datetime) + OHLC columns
+
+Large text files are split into byte-range chunks aligned to line breaks
+and parsed in parallel across cores. Parsed chunks are collected into
+batches of at most ``batch_bytes`` and each batch is cleaned (invalid bars
+dropped, sorted, duplicates removed) and merged into the store day by day
+through its day index, so memory stays bounded by the batch size rather
+than the size of the input or of the stored series.
+
+Usage:
+    python -m src.importer exports/US30_M1_*.csv --symbol US30m --timeframe M1
+"""
+
+import argparse
+import glob
+import io
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.candle_store import BAR_DTYPE, CandleStore, clean, find_gaps, to_bars
+from src.config import BotConfig, load_config
+from src.confluence import TIMEFRAME_SECONDS
+
+
+HST_HEADER_BYTES = 148
+HST_HEADER_DTYPE = np.dtype([
+    ('version', '<i4'),
+    ('copyright', 'S64'),
+    ('symbol', 'S12'),
+    ('period', '<i4'),
+    ('digits', '<i4'),
+    ('timesign', '<i4'),
+    ('last_sync', '<i4'),
+    ('unused', '<i4', 13),
+])
+HST_400_DTYPE = np.dtype([
+    ('time', '<i4'), ('open', '<f8'), ('low', '<f8'), ('high', '<f8'), ('close', '<f8'), ('volume', '<f8'),
+])
+HST_401_DTYPE = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('tick_volume', '<i8'), ('spread', '<i4'), ('real_volume', '<i8'),
+])
+
+# Column aliases (lower-cased, brackets stripped) -> BAR_DTYPE field
+COLUMN_ALIASES = {
+    'time': 'time', 'timestamp': 'time', 'datetime': 'time', 'date': 'date',
+    'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close',
+    'tickvol': 'tick_volume', 'tick_volume': 'tick_volume', 'volume': 'tick_volume',
+    'vol': 'real_volume', 'real_volume': 'real_volume', 'spread': 'spread',
+}
+MT4_COLUMNS = ['date', 'clock', 'open', 'high', 'low', 'close', 'tick_volume']
+# Headerless epoch/datetime CSV: time,open,high,low,close[,volume]
+PLAIN_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'tick_volume']
+
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+# Parsed bars merged into the store at a time
+DEFAULT_BATCH_BYTES = 256 * 1024 * 1024
+# Gap check block size (rows) over the stored series
+GAP_BLOCK_ROWS = 1_000_000
+
+
+# ----------------------------------------------------------------- format detection
+
+def _normalize_name(name: str) -> str:
+    return name.strip().strip('<>').strip().lower().replace(' ', '_')
+
+
+def _headerless_spec(line: bytes, cells: List[str], sep: str) -> Optional[Dict]:
+    """Spec for a headerless file if its first row parses as a valid bar."""
+    layouts = (
+        (MT4_COLUMNS, 6, '%Y.%m.%d %H:%M' if '.' in cells[0] else None),
+        (PLAIN_COLUMNS, 5, None),
+    )
+    for columns, minimum, date_format in layouts:
+        if len(cells) < minimum:
+            continue
+        spec = {'kind': 'csv', 'sep': sep, 'skip': 0, 'names': columns[:len(cells)],
+                'date_format': date_format}
+        try:
+            bars = _parse_csv_bytes(line, spec)
+        except (ValueError, TypeError, OverflowError):
+            continue
+        if len(bars) == 1 and clean(bars)[1]['invalid'] == 0 and bars['time'][0] > 0:
+            return spec
+    return None
+
+
+def detect_format(path: str) -> Dict:
+    """
+    Inspect the start of a file and return a parse spec:
+    {'kind', 'sep', 'skip' (bytes of header), 'names', 'date_format'}.
+    """
+    if path.lower().endswith('.hst'):
+        return {'kind': 'hst'}
+
+    with open(path, 'rb') as f:
+        head = f.read(64 * 1024)
+    lines = head.splitlines(keepends=True)
+    if not lines:
+        raise ValueError(f"{path} is empty")
+    first = lines[0].decode('utf-8-sig', errors='replace')
+    sep = '\t' if '\t' in first else (';' if first.count(';') > first.count(',') else ',')
+    cells = [c for c in first.rstrip('\r\n').split(sep)]
+    offset = len(lines[0])
+
+    # Headerless (MT4 export or plain time,OHLC): the first row is already a bar
+    spec = _headerless_spec(lines[0], cells, sep)
+    if spec is not None:
+        return spec
+
+    names = [_normalize_name(c) for c in cells]
+    if names[0] == 'price' and len(lines) > 2:
+        # yfinance multi-level header: "Price,Close,..." / "Ticker,^DJI,..." / "Date,,,,"
+        offset += len(lines[1])
+        if lines[2].decode('utf-8', errors='replace').split(sep)[0].strip().lower() in ('date', 'datetime'):
+            offset += len(lines[2])
+        names[0] = 'time'
+
+    mapped = [COLUMN_ALIASES.get(n, n) for n in names]
+    if 'time' not in mapped and 'date' not in mapped:
+        raise ValueError(f"{path}: no time/date column in header {cells}")
+    missing = {'open', 'high', 'low', 'close'} - set(mapped)
+    if missing:
+        raise ValueError(f"{path}: missing columns {sorted(missing)}")
+    if 'date' in mapped and 'time' in mapped:
+        # MT5 export: <DATE> + <TIME>
+        mapped[mapped.index('time')] = 'clock'
+    if 'date' in mapped and 'clock' not in mapped:
+        mapped[mapped.index('date')] = 'time'
+    date_format = '%Y.%m.%d %H:%M:%S' if 'clock' in mapped else None
+    return {'kind': 'csv', 'sep': sep, 'skip': offset, 'names': mapped, 'date_format': date_format}
+
+
+def infer_timeframe(times: np.ndarray) -> Optional[str]:
+    """Closest known timeframe to the most common bar spacing."""
+    if len(times) < 3:
+        return None
+    diffs = np.diff(np.sort(np.asarray(times, dtype=np.int64)))
+    diffs = diffs[diffs > 0]
+    if len(diffs) == 0:
+        return None
+    values, counts = np.unique(diffs, return_counts=True)
+    step = values[np.argmax(counts)]
+    return min(TIMEFRAME_SECONDS, key=lambda tf: abs(TIMEFRAME_SECONDS[tf] - step))
+
+
+# ----------------------------------------------------------------- parsing
+
+def _to_epoch(values: pd.Series, date_format: Optional[str]) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(values):
+        times = values.to_numpy(dtype=np.int64)
+        # Millisecond timestamps
+        return times // 1000 if len(times) and np.median(times) > 1e11 else times
+    parsed = pd.to_datetime(values, format=date_format, utc=True)
+    return parsed.dt.tz_convert(None).to_numpy().astype('datetime64[s]').astype(np.int64)
+
+
+def _parse_csv_bytes(data: bytes, spec: Dict) -> np.ndarray:
+    names = spec['names']
+    frame = pd.read_csv(io.BytesIO(data), sep=spec['sep'], header=None, names=names,
+                        usecols=range(len(names)), engine='c',
+                        dtype={n: str for n in ('time', 'date', 'clock') if n in names})
+    if frame.empty:
+        return np.empty(0, dtype=BAR_DTYPE)
+
+    if 'clock' in frame:
+        stamps = frame['date'] + ' ' + frame['clock']
+        frame = frame.drop(columns=['date', 'clock'])
+    else:
+        stamps = frame.pop('time')
+        if stamps.str.fullmatch(r'-?\d+').all():
+            stamps = stamps.astype(np.int64)
+    frame['time'] = _to_epoch(stamps, spec['date_format'])
+    return to_bars(frame)
+
+
+def _parse_chunk(task: Tuple[str, int, int, Dict]) -> np.ndarray:
+    """Parse the lines starting in byte range ``[start, end)`` of a text file."""
+    path, start, end, spec = task
+    with open(path, 'rb') as f:
+        if start > 0:
+            # Skip the partial line; it belongs to the previous chunk
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        if pos >= end:
+            return np.empty(0, dtype=BAR_DTYPE)
+        data = f.read(end - pos)
+        if data and not data.endswith(b'\n'):
+            # Finish the line crossing ``end``
+            data += f.readline()
+    return _parse_csv_bytes(data, spec)
+
+
+def _hst_meta(header) -> Dict:
+    seconds = int(header['period']) * 60
+    timeframe = next((tf for tf, s in TIMEFRAME_SECONDS.items() if s == seconds), None)
+    return {'symbol': header['symbol'].split(b'\0')[0].decode('ascii', 'replace'),
+            'timeframe': timeframe}
+
+
+def read_hst(path: str) -> Tuple[np.ndarray, Dict]:
+    """
+    Read an MT4/MT5 ``.hst`` file (memory-mapped, no text parsing).
+
+    Returns:
+        (bars, {'symbol', 'timeframe'})
+    """
+    header = np.fromfile(path, dtype=HST_HEADER_DTYPE, count=1)[0]
+    version = int(header['version'])
+    if version == 401:
+        raw = np.memmap(path, dtype=HST_401_DTYPE, mode='r', offset=HST_HEADER_BYTES)
+    elif version == 400:
+        raw = np.memmap(path, dtype=HST_400_DTYPE, mode='r', offset=HST_HEADER_BYTES)
+    else:
+        raise ValueError(f"{path}: unsupported HST version {version}")
+
+    bars = np.zeros(len(raw), dtype=BAR_DTYPE)
+    for name in ('time', 'open', 'high', 'low', 'close'):
+        bars[name] = raw[name]
+    if version == 401:
+        bars['tick_volume'] = raw['tick_volume']
+        bars['spread'] = raw['spread']
+        bars['real_volume'] = raw['real_volume']
+    else:
+        bars['tick_volume'] = raw['volume']
+    return bars, _hst_meta(header)
+
+
+def read_hints(paths: List[str]) -> Dict:
+    """{'symbol', 'timeframe'} from HST headers (the last file that has them wins)."""
+    hints = {}
+    for path in paths:
+        if path.lower().endswith('.hst'):
+            meta = _hst_meta(np.fromfile(path, dtype=HST_HEADER_DTYPE, count=1)[0])
+            hints = {k: v for k, v in meta.items() if v} or hints
+    return hints
+
+
+def _plan(path: str, chunk_bytes: int) -> List[Tuple]:
+    """Split a text file into line-aligned chunk tasks."""
+    spec = detect_format(path)
+    size = os.path.getsize(path)
+    return [(path, start, min(start + chunk_bytes, size), spec) for start in range(spec['skip'], size, chunk_bytes)]
+
+
+def _parse_all(tasks: List[Tuple], workers: Optional[int]) -> Iterator[np.ndarray]:
+    """Parsed chunks in task order, with at most two chunks per worker in flight."""
+    if len(tasks) <= 1 or (workers is not None and workers <= 1):
+        yield from (_parse_chunk(task) for task in tasks)
+        return
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for task in tasks:
+            pending.append(pool.submit(_parse_chunk, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def read_batches(paths: List[str], workers: Optional[int] = None, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                 batch_bytes: int = DEFAULT_BATCH_BYTES) -> Iterator[np.ndarray]:
+    """
+    Parse files in parallel and yield their raw bars in file order, in
+    batches of about ``batch_bytes`` (an HST file is read as one part).
+    """
+    def parts():
+        for path in paths:
+            if path.lower().endswith('.hst'):
+                yield read_hst(path)[0]
+            else:
+                yield from _parse_all(_plan(path, chunk_bytes), workers)
+
+    batch, size = [], 0
+    for part in parts():
+        batch.append(part)
+        size += part.nbytes
+        if size >= batch_bytes:
+            yield np.concatenate(batch)
+            batch, size = [], 0
+    if batch:
+        yield np.concatenate(batch)
+
+
+def _stored_gaps(times: np.ndarray, bar_seconds: int) -> np.ndarray:
+    """``find_gaps`` over a stored series in blocks (one overlapping bar each)."""
+    blocks = [find_gaps(times[start:start + GAP_BLOCK_ROWS + 1], bar_seconds)
+              for start in range(0, max(len(times) - 1, 0), GAP_BLOCK_ROWS)]
+    return np.concatenate(blocks) if blocks else np.empty((0, 3), dtype=np.int64)
+
+
+def import_files(paths: List[str], store: CandleStore, symbol: Optional[str] = None,
+                 timeframe: Optional[str] = None, shift_seconds: int = 0,
+                 workers: Optional[int] = None, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                 batch_bytes: int = DEFAULT_BATCH_BYTES) -> Dict:
+    """
+    Import files into ``store``.
+
+    Args:
+        paths: Input files (CSV/HST); later files win on duplicate timestamps
+        store: Destination candle store
+        symbol / timeframe: Target series (taken from HST headers or inferred
+            from bar spacing of the first batch when omitted)
+        shift_seconds: Added to every timestamp (e.g. UTC -> broker server time)
+        workers: Parser processes (default: all cores)
+        chunk_bytes: Text chunk size per task
+        batch_bytes: Parsed bars held in memory before merging into the store
+
+    Returns:
+        Import report: counts, time range and unexpected gaps
+    """
+    hints = read_hints(paths)
+    symbol = symbol or hints.get('symbol')
+    timeframe = timeframe or hints.get('timeframe')
+    totals = {'parsed': 0, 'invalid': 0, 'duplicates': 0, 'added': 0}
+
+    for bars in read_batches(paths, workers, chunk_bytes, batch_bytes):
+        if shift_seconds:
+            bars['time'] += shift_seconds
+        timeframe = timeframe or infer_timeframe(bars['time'])
+        if not symbol or not timeframe:
+            break
+        merge = store.merge(symbol, timeframe, bars)
+        totals['parsed'] += len(bars)
+        for key in ('invalid', 'duplicates', 'added'):
+            totals[key] += merge[key]
+    if not symbol or not timeframe:
+        raise ValueError("Could not determine symbol/timeframe; pass --symbol and --timeframe")
+
+    stored = store.load(symbol, timeframe)
+    gaps = _stored_gaps(stored['time'], TIMEFRAME_SECONDS[timeframe])
+    largest = gaps[np.argsort(gaps[:, 2])[::-1][:10]] if len(gaps) else gaps
+
+    def _iso(ts):
+        return datetime.fromtimestamp(int(ts), tz=timezone.utc).isoformat()
+
+    return {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'files': len(paths),
+        'parsed': totals['parsed'],
+        'invalid': totals['invalid'],
+        'duplicates': totals['duplicates'],
+        'added': totals['added'],
+        'total': len(stored),
+        'first': _iso(stored['time'][0]) if len(stored) else None,
+        'last': _iso(stored['time'][-1]) if len(stored) else None,
+        'gaps': int(len(gaps)),
+        'missing_bars': int(gaps[:, 2].sum()) if len(gaps) else 0,
+        'largest_gaps': [{'after': _iso(g[0]), 'before': _iso(g[1]), 'missing': int(g[2])} for g in largest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import historical candles into the local candle store')
+    parser.add_argument('files', nargs='+', help='CSV/HST files or glob patterns')
+    parser.add_argument('--symbol', default=None)
+    parser.add_argument('--timeframe', default=None, choices=sorted(TIMEFRAME_SECONDS))
+    parser.add_argument('--config', default=os.getenv('CONFIG_PATH', './config_us30.json'))
+    parser.add_argument('--store', default=None, help='Store directory (default: data.candles.directory)')
+    parser.add_argument('--shift-hours', type=float, default=0.0, help='Shift timestamps, e.g. UTC -> server time')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-mb', type=int, default=None)
+    parser.add_argument('--batch-mb', type=int, default=DEFAULT_BATCH_BYTES // (1024 * 1024),
+                        help='Parsed bars merged into the store at a time')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    # Defaults when there is no config file
+    data_cfg = load_config(args.config).data if os.path.exists(args.config) else BotConfig.parse({}).data
+    store = CandleStore(args.store or data_cfg.candles_directory)
+    chunk_mb = args.chunk_mb or data_cfg.import_chunk_mb
+
+    paths = sorted({p for pattern in args.files for p in (glob.glob(pattern) or [pattern])})
+    report = import_files(paths, store, args.symbol, args.timeframe, int(args.shift_hours * 3600),
+                          args.workers, chunk_mb * 1024 * 1024, args.batch_mb * 1024 * 1024)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
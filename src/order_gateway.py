@@ -0,0 +1,295 @@
+"""
+Low-Latency Order Gateway
+=========================
+
+Sits between the executor and ``mt5.order_send``:
+
+- Caches ``symbol_info`` (digits, point, stops level, volume limits/step,
+  filling modes) and refreshes it in a background thread
+- Keeps pre-built BUY/SELL request templates, so a signal only fills in
+  price/volume/SL/TP
+- Rejects orders locally when the spread exceeds ``broker.max_spread_points``
+  or SL/TP sit inside the broker stops level, saving a failed round-trip
+- Sends from a worker thread and confirms results asynchronously, retrying
+  with a fresh price on requotes. Outcomes carry the requested price and
+  the send/acknowledgement times for execution-quality tracking
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+# MT5 trade return codes (see TRADE_RETCODE_* in the MetaTrader5 package)
+RETCODE_PLACED = 10008
+RETCODE_DONE = 10009
+RETCODE_DONE_PARTIAL = 10010
+RETCODE_REQUOTE = 10004
+RETCODE_PRICE_CHANGED = 10020
+RETCODE_PRICE_OFF = 10021
+
+SUCCESS_RETCODES = (RETCODE_PLACED, RETCODE_DONE, RETCODE_DONE_PARTIAL)
+RETRY_RETCODES = (RETCODE_REQUOTE, RETCODE_PRICE_CHANGED, RETCODE_PRICE_OFF)
+
+# symbol_info().filling_mode bit flags
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+
+class SymbolMeta:
+    """Cached trading properties of a symbol."""
+
+    __slots__ = ('digits', 'point', 'stops_level', 'volume_min', 'volume_max',
+                 'volume_step', 'filling_mode', 'updated_at')
+
+    def __init__(self, info):
+        self.digits = info.digits
+        self.point = info.point
+        self.stops_level = info.trade_stops_level
+        self.volume_min = info.volume_min
+        self.volume_max = info.volume_max
+        self.volume_step = info.volume_step
+        self.filling_mode = info.filling_mode
+        self.updated_at = time.time()
+
+
+class OrderGateway:
+    """
+    Cached-metadata, pre-validated, asynchronous market order path.
+    """
+
+    def __init__(self, mt5, symbol: str, execution, max_spread_points: Optional[float] = None,
+                 refresh_seconds: float = 60.0, max_retries: int = 3):
+        """
+        Args:
+            mt5: The imported MetaTrader5 module
+            symbol: Symbol to trade
+            execution: Typed ``execution`` section (``BotConfig.execution``)
+            max_spread_points: Reject orders above this spread (``broker.max_spread_points``)
+            refresh_seconds: Symbol metadata refresh interval
+            max_retries: Resends allowed on requote/price-changed
+        """
+        self.mt5 = mt5
+        self.symbol = symbol
+        self.execution = execution
+        self.max_spread_points = max_spread_points
+        self.refresh_seconds = refresh_seconds
+        self.max_retries = max_retries
+
+        self.meta: Optional[SymbolMeta] = None
+        self._templates: Dict[str, Dict] = {}
+        self._outbox = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self.stats = {'submitted': 0, 'rejected': 0, 'filled': 0, 'failed': 0, 'retries': 0}
+
+    # ----------------------------------------------------------------- lifecycle
+
+    def start(self):
+        """Load metadata and start the refresh and sender threads."""
+        self.refresh()
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+        threading.Thread(target=self._send_loop, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._outbox.put(None)
+
+    def refresh(self) -> bool:
+        """Re-read ``symbol_info`` and rebuild request templates."""
+        try:
+            info = self.mt5.symbol_info(self.symbol)
+            if info is None:
+                logging.warning(f"symbol_info({self.symbol}) returned None; keeping cached metadata")
+                return False
+            if not info.visible:
+                self.mt5.symbol_select(self.symbol, True)
+            meta = SymbolMeta(info)
+        except Exception as e:
+            logging.error(f"Failed to refresh symbol metadata: {e}")
+            return False
+
+        filling = self._filling_type(meta.filling_mode)
+        base = {
+            "action": self.mt5.TRADE_ACTION_DEAL,
+            "symbol": self.symbol,
+            "deviation": self.execution.deviation_points,
+            "magic": self.execution.magic_number,
+            "comment": self.execution.comment,
+            "type_time": self.mt5.ORDER_TIME_GTC,
+            "type_filling": filling,
+        }
+        templates = {
+            'BUY': {**base, "type": self.mt5.ORDER_TYPE_BUY},
+            'SELL': {**base, "type": self.mt5.ORDER_TYPE_SELL},
+        }
+        # Swap both references together; readers take one snapshot each
+        self.meta, self._templates = meta, templates
+        return True
+
+    def _filling_type(self, filling_mode: int):
+        if filling_mode & SYMBOL_FILLING_FOK:
+            return self.mt5.ORDER_FILLING_FOK
+        if filling_mode & SYMBOL_FILLING_IOC:
+            return self.mt5.ORDER_FILLING_IOC
+        return self.mt5.ORDER_FILLING_RETURN
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            self.refresh()
+
+    # ----------------------------------------------------------------- validation
+
+    def normalize_volume(self, volume: float) -> float:
+        meta = self.meta
+        if meta is None or meta.volume_step <= 0:
+            return volume
+        steps = int(round(volume / meta.volume_step, 8))
+        volume = min(max(steps * meta.volume_step, meta.volume_min), meta.volume_max)
+        return round(volume, 8)
+
+    def check(self, side: str, tick, sl: float = 0.0, tp: float = 0.0) -> Optional[str]:
+        """
+        Cheap local pre-trade checks.
+
+        Returns:
+            Rejection reason, or None if the order may be sent
+        """
+        meta = self.meta
+        if meta is None:
+            return 'no_symbol_metadata'
+        if tick is None or tick.bid <= 0 or tick.ask <= 0:
+            return 'no_tick'
+
+        spread_points = (tick.ask - tick.bid) / meta.point
+        if self.max_spread_points is not None and spread_points > self.max_spread_points:
+            return f'spread_too_wide ({spread_points:.0f} > {self.max_spread_points} points)'
+
+        price = tick.ask if side == 'BUY' else tick.bid
+        min_distance = meta.stops_level * meta.point
+        direction = 1 if side == 'BUY' else -1
+        if sl:
+            if (price - sl) * direction <= 0:
+                return 'sl_wrong_side'
+            if abs(price - sl) < min_distance:
+                return f'sl_too_close ({abs(price - sl):.{meta.digits}f} < {min_distance:.{meta.digits}f})'
+        if tp:
+            if (tp - price) * direction <= 0:
+                return 'tp_wrong_side'
+            if abs(tp - price) < min_distance:
+                return f'tp_too_close ({abs(tp - price):.{meta.digits}f} < {min_distance:.{meta.digits}f})'
+        return None
+
+    # ----------------------------------------------------------------- sending
+
+    def submit(self, side: str, volume: float, sl: float = 0.0, tp: float = 0.0,
+               callback: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Validate and queue a market order. Returns immediately; the broker
+        result is delivered to ``callback`` from the sender thread.
+
+        Returns:
+            {'accepted': bool, 'reason': str|None, 'request': dict|None}
+        """
+        tick = self.mt5.symbol_info_tick(self.symbol)
+        reason = self.check(side, tick, sl, tp)
+        if reason is not None:
+            self.stats['rejected'] += 1
+            return {'accepted': False, 'reason': reason, 'request': None}
+
+        digits = self.meta.digits
+        request = dict(self._templates[side])
+        request["volume"] = self.normalize_volume(volume)
+        request["price"] = tick.ask if side == 'BUY' else tick.bid
+        request["sl"] = round(float(sl), digits) if sl else 0.0
+        request["tp"] = round(float(tp), digits) if tp else 0.0
+
+        self.stats['submitted'] += 1
+        self._outbox.put((side, request, callback, time.time()))
+        return {'accepted': True, 'reason': None, 'request': request}
+
+    def submit_close(self, position, callback: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Queue a market close of an open position (opposite deal on its ticket).
+        Spread and stops checks do not apply to closes.
+
+        Returns:
+            Same shape as ``submit``
+        """
+        tick = self.mt5.symbol_info_tick(self.symbol)
+        if self.meta is None:
+            return {'accepted': False, 'reason': 'no_symbol_metadata', 'request': None}
+        if tick is None or tick.bid <= 0 or tick.ask <= 0:
+            return {'accepted': False, 'reason': 'no_tick', 'request': None}
+
+        side = 'SELL' if position.type == self.mt5.POSITION_TYPE_BUY else 'BUY'
+        request = dict(self._templates[side])
+        request["position"] = position.ticket
+        request["volume"] = position.volume
+        request["price"] = tick.ask if side == 'BUY' else tick.bid
+        request["sl"] = 0.0
+        request["tp"] = 0.0
+
+        self.stats['submitted'] += 1
+        self._outbox.put((side, request, callback, time.time()))
+        return {'accepted': True, 'reason': None, 'request': request}
+
+    def _send_loop(self):
+        while not self._stop.is_set():
+            item = self._outbox.get()
+            if item is None:
+                break
+            side, request, callback, queued_at = item
+            outcome = self._send_with_retry(side, request)
+            outcome['queued_at'] = queued_at
+            # Price as submitted (requotes re-price ``outcome['request']``)
+            outcome['requested_price'] = request['price']
+            outcome['point'] = self.meta.point if self.meta is not None else None
+            if callback is not None:
+                try:
+                    callback(outcome)
+                except Exception as e:
+                    logging.error(f"Order callback failed: {e}")
+
+    def _send_with_retry(self, side: str, request: Dict) -> Dict:
+        result = None
+        attempts = 0
+        while attempts <= self.max_retries:
+            attempts += 1
+            sent_at = time.time()
+            try:
+                result = self.mt5.order_send(request)
+            except Exception as e:
+                self.stats['failed'] += 1
+                return {'ok': False, 'side': side, 'request': request, 'result': None,
+                        'error': str(e), 'attempts': attempts, 'sent_at': sent_at, 'acked_at': time.time()}
+            acked_at = time.time()
+
+            retcode = getattr(result, 'retcode', None)
+            if retcode in SUCCESS_RETCODES:
+                self.stats['filled'] += 1
+                return {'ok': True, 'side': side, 'request': request, 'result': result,
+                        'error': None, 'attempts': attempts, 'sent_at': sent_at, 'acked_at': acked_at}
+            if retcode not in RETRY_RETCODES:
+                break
+
+            # Requote: re-price from a fresh tick and re-check spread/stops
+            self.stats['retries'] += 1
+            tick = self.mt5.symbol_info_tick(self.symbol)
+            if request.get("position"):
+                reason = None if tick is not None and tick.bid > 0 and tick.ask > 0 else 'no_tick'
+            else:
+                reason = self.check(side, tick, request["sl"], request["tp"])
+            if reason is not None:
+                self.stats['failed'] += 1
+                return {'ok': False, 'side': side, 'request': request, 'result': result,
+                        'error': f'requote then {reason}', 'attempts': attempts, 'sent_at': sent_at,
+                        'acked_at': acked_at}
+            request = dict(request, price=tick.ask if side == 'BUY' else tick.bid)
+
+        self.stats['failed'] += 1
+        comment = getattr(result, 'comment', None) if result is not None else self.mt5.last_error()
+        return {'ok': False, 'side': side, 'request': request, 'result': result,
+                'error': f'retcode={getattr(result, "retcode", None)} {comment}',
+                'attempts': attempts, 'sent_at': sent_at, 'acked_at': acked_at}
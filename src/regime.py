@@ -0,0 +1,293 @@
+"""
+Spread & Volatility Regime Monitor
+==================================
+
+Classifies the market into the LOW/MEDIUM/HIGH regimes used by
+``execution.campaign_max_trades`` and ``execution.max_position_minutes``.
+
+All statistics are incremental, with constant memory and no windows kept:
+
+- Spread: exponentially weighted mean/variance of ask - bid, from the
+  tick recorder's capture stream (or the executor's polled tick)
+- ATR: Wilder-smoothed true range of closed entry bars
+- Realized volatility: exponentially weighted mean of squared log returns
+
+Both volatility measures are projected to a daily range (range grows with
+the square root of the bar count) and compared with
+``us30_specific.typical_daily_range``. The larger ratio sets the regime,
+and hysteresis stops it flipping at the band edges. The spread is
+compared with ``typical_spread`` and ``broker.max_spread_points``.
+
+Readers take ``monitor.regime`` (a str) or ``monitor.state`` (a dict
+replaced as a whole on every update): one attribute lookup, no lock.
+"""
+
+import logging
+import math
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.config import REGIMES
+from src.confluence import TIMEFRAME_SECONDS
+
+LOW, MEDIUM, HIGH = REGIMES
+
+# Expected high-low range of a random walk is ~1.6 standard deviations
+RANGE_PER_SIGMA = math.sqrt(8 / math.pi)
+
+
+class RegimeMonitor:
+    """
+    Incremental spread/ATR/realized-volatility statistics and regime label.
+    """
+
+    def __init__(self, typical_daily_range: float, typical_spread: Optional[float] = None,
+                 max_spread_points: Optional[float] = None, bar_seconds: int = 300,
+                 atr_period: int = 14, volatility_bars: int = 48, spread_ticks: int = 200,
+                 session_hours: float = 23.0, low_below: float = 0.7, high_above: float = 1.3,
+                 hysteresis: float = 0.05, wide_spread_ratio: float = 3.0):
+        """
+        Args:
+            typical_daily_range: Normal daily high-low range (price units)
+            typical_spread: Normal ask - bid (price units)
+            max_spread_points: Broker spread limit in points (needs ``point``)
+            bar_seconds: Entry bar length
+            atr_period: Wilder ATR period (bars)
+            volatility_bars: Realized-volatility EWMA span (bars)
+            spread_ticks: Spread EWMA span (ticks)
+            session_hours: Trading hours per day, for the daily projection
+            low_below / high_above: Daily-range ratio bands for LOW / HIGH
+            hysteresis: Ratio margin needed to leave the current regime
+            wide_spread_ratio: Mean spread above this multiple of
+                ``typical_spread`` counts as wide
+        """
+        self.typical_daily_range = float(typical_daily_range)
+        self.typical_spread = typical_spread
+        self.max_spread_points = max_spread_points
+        self.point: Optional[float] = None
+        self.atr_period = int(atr_period)
+        self.low_below = low_below
+        self.high_above = high_above
+        self.hysteresis = hysteresis
+        self.wide_spread_ratio = wide_spread_ratio
+        self.bars_per_day = session_hours * 3600 / bar_seconds
+
+        self._vol_alpha = 2.0 / (volatility_bars + 1)
+        self._spread_alpha = 2.0 / (spread_ticks + 1)
+        self._lock = threading.Lock()
+
+        # Bar statistics
+        self._last_bar_time = None
+        self._prev_close = None
+        self._atr = None
+        self._tr_seed = 0.0
+        self._bars = 0
+        self._var_return = None
+
+        # Spread statistics
+        self._spread_mean = None
+        self._spread_var = 0.0
+        self._last_spread = None
+        self._ticks = 0
+
+        # Published values (single reference reads)
+        self.regime = MEDIUM
+        self.spread_wide = False
+        self.state: Dict = self._build_state(None, None)
+
+    # ----------------------------------------------------------------- ticks
+
+    def on_tick(self, bid: float, ask: float):
+        """Update spread statistics with one quote."""
+        if bid <= 0 or ask <= 0:
+            return
+        with self._lock:
+            self._add_spread(ask - bid)
+            self._publish()
+
+    def on_ticks(self, ticks):
+        """Update spread statistics with a tick array (``bid``/``ask`` fields)."""
+        if ticks is None or len(ticks) == 0:
+            return
+        with self._lock:
+            for bid, ask in zip(ticks['bid'].tolist(), ticks['ask'].tolist()):
+                if bid > 0 and ask > 0:
+                    self._add_spread(ask - bid)
+            self._publish()
+
+    def _add_spread(self, spread: float):
+        self._last_spread = spread
+        self._ticks += 1
+        if self._spread_mean is None:
+            self._spread_mean = spread
+            return
+        delta = spread - self._spread_mean
+        self._spread_mean += self._spread_alpha * delta
+        self._spread_var = (1 - self._spread_alpha) * (self._spread_var + self._spread_alpha * delta * delta)
+
+    # ----------------------------------------------------------------- bars
+
+    def on_bars(self, rates) -> int:
+        """
+        Feed closed bars not seen yet.
+
+        Args:
+            rates: Closed bars (MT5 rates layout), oldest first; only rows
+                newer than the last processed bar are read
+
+        Returns:
+            Number of bars processed
+        """
+        if rates is None or len(rates) == 0:
+            return 0
+        start = 0
+        if self._last_bar_time is not None:
+            start = int(np.searchsorted(rates['time'], self._last_bar_time, 'right'))
+        fresh = rates[start:]
+        if len(fresh) == 0:
+            return 0
+        with self._lock:
+            for high, low, close in zip(fresh['high'].tolist(), fresh['low'].tolist(), fresh['close'].tolist()):
+                self._add_bar(high, low, close)
+            self._last_bar_time = int(fresh['time'][-1])
+            self._publish()
+        return len(fresh)
+
+    def _add_bar(self, high: float, low: float, close: float):
+        prev = self._prev_close
+        self._prev_close = close
+        if prev is None or prev <= 0 or close <= 0:
+            return
+        true_range = max(high - low, abs(high - prev), abs(low - prev))
+        self._bars += 1
+        if self._bars <= self.atr_period:
+            # Seed with the simple mean of the first ``atr_period`` ranges
+            self._tr_seed += true_range
+            self._atr = self._tr_seed / self._bars
+        else:
+            self._atr += (true_range - self._atr) / self.atr_period
+
+        r = math.log(close / prev)
+        if self._var_return is None:
+            self._var_return = r * r
+        else:
+            self._var_return += self._vol_alpha * (r * r - self._var_return)
+
+    # ----------------------------------------------------------------- classification
+
+    def _publish(self):
+        vol_ratio = None
+        if self._bars >= self.atr_period and self.typical_daily_range > 0:
+            scale = math.sqrt(self.bars_per_day)
+            atr_range = self._atr * scale
+            rv_range = RANGE_PER_SIGMA * math.sqrt(self._var_return) * self._prev_close * scale
+            vol_ratio = max(atr_range, rv_range) / self.typical_daily_range
+            self.regime = self._classify(vol_ratio)
+
+        spread_ratio = None
+        if self._spread_mean is not None:
+            wide = False
+            if self.typical_spread:
+                spread_ratio = self._spread_mean / self.typical_spread
+                wide = spread_ratio > self.wide_spread_ratio
+            if self.max_spread_points is not None and self.point:
+                wide = wide or self._spread_mean > self.max_spread_points * self.point
+            self.spread_wide = wide
+        self.state = self._build_state(vol_ratio, spread_ratio)
+
+    def _classify(self, ratio: float) -> str:
+        low, high = self.low_below, self.high_above
+        h = self.hysteresis
+        current = self.regime
+        if current == LOW:
+            low += h
+        elif current == HIGH:
+            high -= h
+        else:
+            low -= h
+            high += h
+        if ratio < low:
+            return LOW
+        if ratio > high:
+            return HIGH
+        return MEDIUM
+
+    def _build_state(self, vol_ratio, spread_ratio) -> Dict:
+        def rounded(value, digits=3):
+            return None if value is None else round(value, digits)
+
+        realized = None
+        if self._var_return is not None and self._prev_close:
+            realized = math.sqrt(self._var_return) * self._prev_close
+        return {
+            'regime': self.regime,
+            'warm': self._bars >= self.atr_period,
+            'volatility_ratio': rounded(vol_ratio),
+            'atr': rounded(self._atr),
+            'realized_vol': rounded(realized),
+            'bars': self._bars,
+            'spread': rounded(self._last_spread, 5),
+            'spread_mean': rounded(self._spread_mean, 5),
+            'spread_std': rounded(math.sqrt(self._spread_var), 5),
+            'spread_ratio': rounded(spread_ratio),
+            'spread_wide': self.spread_wide,
+            'ticks': self._ticks,
+            'last_bar_time': self._last_bar_time,
+        }
+
+    # ----------------------------------------------------------------- config
+
+    def configure(self, config):
+        """Apply thresholds from a (reloaded) ``BotConfig``; statistics are kept."""
+        regime_cfg = config.regime
+        self.typical_daily_range = regime_cfg.typical_daily_range
+        self.typical_spread = regime_cfg.typical_spread
+        self.max_spread_points = config.broker.max_spread_points
+        self.low_below = regime_cfg.low_below
+        self.high_above = regime_cfg.high_above
+        self.hysteresis = regime_cfg.hysteresis
+        self.wide_spread_ratio = regime_cfg.wide_spread_ratio
+        with self._lock:
+            self._publish()
+
+    @classmethod
+    def from_config(cls, config) -> 'RegimeMonitor':
+        """Build from a ``BotConfig`` (``regime``, ``broker`` and the SMC entry timeframe)."""
+        regime_cfg = config.regime
+        entry_tf = config.strategies.smc.get('entry_timeframe', 'M5')
+        return cls(
+            typical_daily_range=regime_cfg.typical_daily_range,
+            typical_spread=regime_cfg.typical_spread,
+            max_spread_points=config.broker.max_spread_points,
+            bar_seconds=TIMEFRAME_SECONDS.get(entry_tf, 300),
+            atr_period=regime_cfg.atr_period,
+            volatility_bars=regime_cfg.volatility_bars,
+            spread_ticks=regime_cfg.spread_ticks,
+            session_hours=regime_cfg.session_hours,
+            low_below=regime_cfg.low_below,
+            high_above=regime_cfg.high_above,
+            hysteresis=regime_cfg.hysteresis,
+            wide_spread_ratio=regime_cfg.wide_spread_ratio,
+        )
+
+
+_monitor: Optional[RegimeMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_regime_monitor(config=None) -> Optional[RegimeMonitor]:
+    """
+    Process-wide monitor shared by the executor, the strategy and the
+    dashboard. Created from ``config`` on first call; None before that.
+    """
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None and config is not None:
+            _monitor = RegimeMonitor.from_config(config)
+            logging.info(
+                f"Regime monitor: typical daily range {_monitor.typical_daily_range}, "
+                f"bands <{_monitor.low_below} LOW / >{_monitor.high_above} HIGH"
+            )
+        return _monitor
@@ -0,0 +1,237 @@
+"""
+Walk-Forward and Monte Carlo Robustness Analysis
+================================================
+
+Checks whether SMCStrategy parameters (e.g. ``rr_ratio`` / ``ema_period``)
+hold up out of sample:
+
+- Walk-forward: rolling in-sample grid optimisation followed by an
+  out-of-sample test with the winning parameters. Windows run in parallel
+  across CPU cores.
+- Monte Carlo: trade-order reshuffling of the R-multiple sequence,
+  thousands of paths per NumPy operation.
+- Bootstrap: resampling trades with replacement for confidence intervals
+  on expectancy and max drawdown.
+
+Usage:
+    python -m src.robustness --data data/US30m_M5.csv --grid rr_ratio=2,3,4 ema_period=20,50,100
+    python -m src.robustness --symbol US30m --timeframe M5   # from the local candle store
+"""
+
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import run_backtest, summarize, warmup_bars
+from src.candle_store import get_candle_store, to_frame
+from src.config import load_config, thaw
+
+
+# Cap on path x trade elements per vectorized batch (~160 MB of float64)
+MAX_BATCH_ELEMENTS = 20_000_000
+
+
+def expand_grid(param_grid: Dict[str, List]) -> List[Dict]:
+    """{'a': [1, 2], 'b': [3]} -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]"""
+    keys = list(param_grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[k] for k in keys))]
+
+
+def _evaluate_window(args) -> Dict:
+    """Optimise on the in-sample slice, then test on the out-of-sample slice."""
+    data, base_config, grid, split, warmup, objective = args
+    in_sample = data.iloc[:split]
+
+    best_params, best_stats = None, None
+    for params in grid:
+        stats = summarize(run_backtest(in_sample, {**base_config, **params}))
+        if stats['trades'] == 0:
+            continue
+        if best_stats is None or stats[objective] > best_stats[objective]:
+            best_params, best_stats = params, stats
+
+    if best_params is None:
+        best_params = grid[0]
+        best_stats = summarize([])
+
+    # Out-of-sample keeps `warmup` bars of history but only trades after `split`
+    oos_data = data.iloc[max(0, split - warmup):].reset_index(drop=True)
+    oos_trades = run_backtest(oos_data, {**base_config, **best_params}, start_index=min(split, warmup))
+
+    return {
+        'in_sample_start': int(data['time'].iloc[0]),
+        'out_sample_start': int(data['time'].iloc[split]),
+        'out_sample_end': int(data['time'].iloc[-1]),
+        'params': best_params,
+        'in_sample': best_stats,
+        'out_sample': summarize(oos_trades),
+        'trades': oos_trades,
+    }
+
+
+def walk_forward(data: pd.DataFrame, base_config: Dict, param_grid: Dict[str, List],
+                 in_sample_bars: int, out_sample_bars: int, objective: str = 'expectancy_r',
+                 workers: Optional[int] = None) -> Dict:
+    """
+    Rolling walk-forward analysis.
+
+    Args:
+        data: Base-timeframe candles (time/open/high/low/close)
+        base_config: SMC config the grid values are layered on
+        param_grid: Parameter name -> candidate values
+        in_sample_bars: Bars used to pick parameters in each window
+        out_sample_bars: Bars traded with the picked parameters (also the step)
+        objective: summarize() key to maximise in-sample
+        workers: Process count (defaults to CPU count)
+
+    Returns:
+        {'windows': [...], 'out_sample': summary over all OOS trades, 'trades': [...]}
+    """
+    data = data.reset_index(drop=True)
+    grid = expand_grid(param_grid)
+    warmup = max(warmup_bars({**base_config, **params}) for params in grid)
+
+    jobs = []
+    start = 0
+    while start + in_sample_bars < len(data):
+        end = min(start + in_sample_bars + out_sample_bars, len(data))
+        jobs.append((data.iloc[start:end].reset_index(drop=True), base_config, grid,
+                     in_sample_bars, warmup, objective))
+        start += out_sample_bars
+
+    if workers == 1 or len(jobs) <= 1:
+        windows = [_evaluate_window(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            windows = list(pool.map(_evaluate_window, jobs))
+
+    trades = [t for w in windows for t in w.pop('trades')]
+    return {'windows': windows, 'out_sample': summarize(trades), 'trades': trades}
+
+
+def _max_drawdown(paths: np.ndarray) -> np.ndarray:
+    """Max peak-to-trough drawdown per row of an R-multiple path matrix."""
+    equity = np.cumsum(paths, axis=1)
+    peaks = np.maximum.accumulate(np.maximum(equity, 0.0), axis=1)
+    return (peaks - equity).max(axis=1)
+
+
+def _batches(n_paths: int, n_trades: int):
+    size = max(1, MAX_BATCH_ELEMENTS // max(1, n_trades))
+    for start in range(0, n_paths, size):
+        yield min(size, n_paths - start)
+
+
+def monte_carlo(r_multiples, n_paths: int = 10000, seed: Optional[int] = None) -> Dict:
+    """
+    Reshuffle trade order to see how much drawdown is down to sequencing luck.
+
+    Returns:
+        Percentiles (5/50/95/99) of max drawdown in R; total R is order-independent.
+    """
+    r = np.asarray(r_multiples, dtype=float)
+    if len(r) == 0:
+        return {'paths': 0}
+    rng = np.random.default_rng(seed)
+
+    drawdowns = []
+    for size in _batches(n_paths, len(r)):
+        order = rng.permuted(np.broadcast_to(np.arange(len(r)), (size, len(r))), axis=1)
+        drawdowns.append(_max_drawdown(r[order]))
+    dd = np.concatenate(drawdowns)
+
+    return {
+        'paths': int(n_paths),
+        'total_r': float(r.sum()),
+        'max_drawdown_r': {f'p{q}': float(np.percentile(dd, q)) for q in (5, 50, 95, 99)},
+    }
+
+
+def bootstrap(r_multiples, n_paths: int = 10000, confidence: float = 0.95,
+              seed: Optional[int] = None) -> Dict:
+    """
+    Bootstrap confidence intervals for expectancy and max drawdown (in R).
+    """
+    r = np.asarray(r_multiples, dtype=float)
+    if len(r) == 0:
+        return {'paths': 0}
+    rng = np.random.default_rng(seed)
+
+    expectancy, drawdown = [], []
+    for size in _batches(n_paths, len(r)):
+        sample = r[rng.integers(0, len(r), size=(size, len(r)))]
+        expectancy.append(sample.mean(axis=1))
+        drawdown.append(_max_drawdown(sample))
+    expectancy = np.concatenate(expectancy)
+    drawdown = np.concatenate(drawdown)
+
+    lo, hi = (1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100
+    return {
+        'paths': int(n_paths),
+        'confidence': confidence,
+        'expectancy_r': {'mean': float(r.mean()), 'low': float(np.percentile(expectancy, lo)),
+                         'high': float(np.percentile(expectancy, hi))},
+        'max_drawdown_r': {'median': float(np.median(drawdown)), 'low': float(np.percentile(drawdown, lo)),
+                           'high': float(np.percentile(drawdown, hi))},
+        'prob_negative_expectancy': float((expectancy <= 0).mean()),
+    }
+
+
+def robustness_report(data: pd.DataFrame, base_config: Dict, param_grid: Dict[str, List],
+                      in_sample_bars: int, out_sample_bars: int, n_paths: int = 10000,
+                      workers: Optional[int] = None, seed: Optional[int] = None) -> Dict:
+    """Walk-forward, then Monte Carlo + bootstrap over the out-of-sample trades."""
+    wf = walk_forward(data, base_config, param_grid, in_sample_bars, out_sample_bars, workers=workers)
+    r = [t['r_multiple'] for t in wf['trades']]
+    return {
+        'walk_forward': {'windows': wf['windows'], 'out_sample': wf['out_sample']},
+        'monte_carlo': monte_carlo(r, n_paths, seed),
+        'bootstrap': bootstrap(r, n_paths, seed=seed),
+    }
+
+
+def _parse_grid(items: List[str]) -> Dict[str, List]:
+    grid = {}
+    for item in items:
+        name, _, values = item.partition('=')
+        grid[name] = [json.loads(v) for v in values.split(',') if v]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward / Monte Carlo robustness report for SMCStrategy')
+    parser.add_argument('--data', default=None, help='CSV with time,open,high,low,close (epoch seconds)')
+    parser.add_argument('--symbol', default=None, help='Read candles from the local candle store instead of --data')
+    parser.add_argument('--timeframe', default='M5')
+    parser.add_argument('--config', default=os.getenv('CONFIG_PATH', './config_us30.json'))
+    parser.add_argument('--grid', nargs='+', default=['rr_ratio=2,3,4', 'ema_period=20,50,100'])
+    parser.add_argument('--in-sample', type=int, default=12 * 24 * 60, help='In-sample bars (default ~60 days of M5)')
+    parser.add_argument('--out-sample', type=int, default=12 * 24 * 20, help='Out-of-sample bars (default ~20 days of M5)')
+    parser.add_argument('--paths', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if not args.data and not args.symbol:
+        parser.error('one of --data or --symbol is required')
+
+    config = load_config(args.config)
+    base_config = thaw(config.strategies.smc)
+
+    if args.data:
+        data = pd.read_csv(args.data)
+    else:
+        data = to_frame(get_candle_store(config).load(args.symbol, args.timeframe))
+    report = robustness_report(data, base_config, _parse_grid(args.grid), args.in_sample,
+                               args.out_sample, args.paths, args.workers, args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Shadow (Paper) Strategy Variants
+================================
+
+Runs N ``SMCStrategy`` parameter variants next to the live strategy on the
+executor's own data feed, without placing orders. Each closed bar is fanned
+out to every variant. A variant keeps its own zone book, a simulated
+position (SL/TP checked against the following bars' high/low, as in the
+backtester) and R-multiple metrics for side-by-side comparison on the
+dashboard.
+
+- No extra broker calls: variants read the executor's M5/H1 windows
+- Few variants run in-process on column views of those windows
+- Many variants are split across worker processes. The windows are copied
+  once per bar into shared memory and workers map them zero-copy, so the
+  fan-out message is just two row counts
+
+Configured under ``shadow`` in config_us30.json; each variant's ``params``
+override ``strategies.smc``.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.backtest import check_exit, summarize
+from src.candle_store import BAR_DTYPE
+from src.config import thaw
+from src.strategies import SMCStrategy
+from src.strategies.bars import as_bars
+
+
+class ShadowVariant:
+    """One paper-traded strategy variant."""
+
+    __slots__ = ('name', 'params', 'strategy', 'position', 'r_multiples', 'recent', 'signals', 'last_signal')
+
+    def __init__(self, name: str, config: Dict, params: Dict):
+        self.name = name
+        self.params = params
+        # Signals are tracked below; no per-variant evaluation ring
+        self.strategy = SMCStrategy({**config, 'signal_history_size': 0})
+        self.position: Optional[Dict] = None
+        self.r_multiples: List[float] = []
+        self.recent = deque(maxlen=20)
+        self.signals = 0
+        self.last_signal = None
+
+    def on_bar(self, entry, bias):
+        """Process one closed bar: manage the open paper position, else look for an entry."""
+        bar_time = int(entry.time[-1])
+        if self.position is not None:
+            if bar_time <= self.position['entry_time']:
+                return
+            exit_price, reason = check_exit(self.position, float(entry.high[-1]), float(entry.low[-1]))
+            if exit_price is not None:
+                self._close(bar_time, exit_price, reason)
+            return
+
+        signal = self.strategy.analyze(entry, bias)
+        if signal['signal'] == 'NONE' or not signal.get('sl_distance') or signal['sl_distance'] <= 0:
+            return
+        self.signals += 1
+        self.last_signal = {'time': bar_time, 'signal': signal['signal'], 'strength': signal['strength']}
+        self.position = {
+            'side': signal['signal'],
+            'entry_time': bar_time,
+            'entry_price': float(signal['entry_price']),
+            'stop_loss': float(signal['stop_loss']),
+            'take_profit': float(signal['take_profit']),
+            'risk': float(signal['sl_distance']),
+        }
+
+    def _close(self, bar_time: int, exit_price: float, reason: str):
+        position = self.position
+        direction = 1 if position['side'] == 'BUY' else -1
+        r = (exit_price - position['entry_price']) * direction / position['risk']
+        self.r_multiples.append(r)
+        self.recent.append({
+            'side': position['side'],
+            'entry_time': position['entry_time'],
+            'exit_time': bar_time,
+            'entry_price': position['entry_price'],
+            'exit_price': float(exit_price),
+            'exit_reason': reason,
+            'r_multiple': round(r, 3),
+        })
+        self.position = None
+
+    def status(self) -> Dict:
+        stats = summarize([{'r_multiple': r} for r in self.r_multiples])
+        if stats['profit_factor'] == float('inf'):
+            stats['profit_factor'] = None
+        return {
+            'name': self.name,
+            'params': self.params,
+            **stats,
+            'signals': self.signals,
+            'last_signal': self.last_signal,
+            'position': dict(self.position) if self.position else None,
+            'recent_trades': list(self.recent),
+        }
+
+
+def build_variants(base_config: Dict, specs: List[Dict], include_baseline: bool = True) -> List[ShadowVariant]:
+    """Variants from config specs ({'name', 'params'}), plus a paper copy of the live parameters."""
+    variants = [ShadowVariant('baseline', base_config, {})] if include_baseline else []
+    for i, spec in enumerate(specs):
+        params = dict(spec.get('params', {}))
+        variants.append(ShadowVariant(spec.get('name') or f'variant_{i + 1}', {**base_config, **params}, params))
+    return variants
+
+
+def _worker_main(conn, base_config: Dict, specs: List[Dict], include_baseline: bool,
+                 shm_names: Tuple[str, str], capacity: int):
+    """Worker process: owns a subset of variants and evaluates them on shared bar windows."""
+    # The parent owns (and unlinks) the blocks; workers only attach
+    blocks = [shared_memory.SharedMemory(name=name) for name in shm_names]
+    entry_all = np.ndarray((capacity,), dtype=BAR_DTYPE, buffer=blocks[0].buf)
+    bias_all = np.ndarray((capacity,), dtype=BAR_DTYPE, buffer=blocks[1].buf)
+    variants = build_variants(base_config, specs, include_baseline)
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            n_entry, n_bias = message
+            entry, bias = as_bars(entry_all[:n_entry]), as_bars(bias_all[:n_bias])
+            for variant in variants:
+                try:
+                    variant.on_bar(entry, bias)
+                except Exception as e:
+                    logging.error(f"Shadow variant {variant.name} failed: {e}")
+            conn.send([v.status() for v in variants])
+    finally:
+        del entry_all, bias_all
+        for block in blocks:
+            block.close()
+
+
+class ShadowRunner:
+    """
+    Fans closed bars out to all shadow variants and publishes their status.
+    """
+
+    def __init__(self, base_config: Dict, specs: List[Dict], workers: int = 0,
+                 parallel_threshold: int = 8, capacity: int = 4096, include_baseline: bool = True):
+        """
+        Args:
+            base_config: Live ``strategies.smc`` config (plain dict)
+            specs: Variant specs, ``[{'name': str, 'params': {...}}]``
+            workers: Worker processes (0 = one per core, capped by variant count)
+            parallel_threshold: Variant count at which workers are used
+            capacity: Max rows per shared bar window
+            include_baseline: Also paper-trade the unmodified live parameters
+        """
+        self.capacity = capacity
+        self.status: Tuple[Dict, ...] = ()
+        self.last_bar_time = None
+        self.last_duration = 0.0
+
+        configs = [base_config] + [{**base_config, **dict(s.get('params', {}))} for s in specs]
+        self.required_bars = max(SMCStrategy(c).required_bars for c in configs)
+
+        n_variants = len(specs) + int(include_baseline)
+        workers = workers or os.cpu_count() or 1
+        workers = min(workers, n_variants)
+        self._variants: List[ShadowVariant] = []
+        self._workers = []
+        self._blocks = []
+
+        if n_variants < parallel_threshold or workers <= 1:
+            self._variants = build_variants(base_config, specs, include_baseline)
+            return
+
+        nbytes = capacity * BAR_DTYPE.itemsize
+        self._blocks = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(2)]
+        self._entry = np.ndarray((capacity,), dtype=BAR_DTYPE, buffer=self._blocks[0].buf)
+        self._bias = np.ndarray((capacity,), dtype=BAR_DTYPE, buffer=self._blocks[1].buf)
+        names = tuple(b.name for b in self._blocks)
+        for w in range(workers):
+            chunk = specs[w::workers]
+            baseline = include_baseline and w == 0
+            if not chunk and not baseline:
+                continue
+            parent, child = mp.Pipe()
+            process = mp.Process(target=_worker_main, daemon=True,
+                                 args=(child, base_config, chunk, baseline, names, capacity))
+            process.start()
+            self._workers.append((process, parent))
+        logging.info(f"Shadow mode: {n_variants} variants across {len(self._workers)} worker processes")
+
+    def on_bar(self, entry_rates: np.ndarray, bias_rates: np.ndarray) -> bool:
+        """
+        Evaluate all variants on closed-bar windows (each closed bar once).
+
+        Args:
+            entry_rates / bias_rates: Closed bars only (MT5 rates layout)
+
+        Returns:
+            True if a new bar was processed
+        """
+        if len(entry_rates) == 0 or len(bias_rates) < 2:
+            return False
+        bar_time = int(entry_rates['time'][-1])
+        if bar_time == self.last_bar_time:
+            return False
+        self.last_bar_time = bar_time
+        started = time.perf_counter()
+
+        if not self._workers:
+            entry, bias = as_bars(entry_rates), as_bars(bias_rates)
+            for variant in self._variants:
+                try:
+                    variant.on_bar(entry, bias)
+                except Exception as e:
+                    logging.error(f"Shadow variant {variant.name} failed: {e}")
+            status = [v.status() for v in self._variants]
+        else:
+            entry_rates = entry_rates[-self.capacity:]
+            bias_rates = bias_rates[-self.capacity:]
+            self._entry[:len(entry_rates)] = entry_rates.astype(BAR_DTYPE, copy=False)
+            self._bias[:len(bias_rates)] = bias_rates.astype(BAR_DTYPE, copy=False)
+            for _, conn in self._workers:
+                conn.send((len(entry_rates), len(bias_rates)))
+            status = []
+            for _, conn in self._workers:
+                status.extend(conn.recv())
+
+        # Publish a new immutable tuple; readers never see a partial update
+        self.status = tuple(status)
+        self.last_duration = time.perf_counter() - started
+        return True
+
+    def stop(self):
+        for process, conn in self._workers:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            process.join(timeout=2)
+        self._workers = []
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+_runner: Optional[ShadowRunner] = None
+
+
+def start_from_config(config) -> Optional[ShadowRunner]:
+    """Create the process-wide runner if ``shadow.enabled`` (None otherwise)."""
+    global _runner
+    shadow_cfg = config.get('shadow', {})
+    if not shadow_cfg.get('enabled', False):
+        return None
+    _runner = ShadowRunner(
+        thaw(config.strategies.smc),
+        thaw(shadow_cfg.get('variants', [])),
+        workers=shadow_cfg.get('workers', 0),
+        parallel_threshold=shadow_cfg.get('parallel_threshold', 8),
+        include_baseline=shadow_cfg.get('include_baseline', True),
+    )
+    return _runner
+
+
+def get_shadow_runner() -> Optional[ShadowRunner]:
+    return _runner
@@ -0,0 +1,196 @@
+"""
+Shared-Memory State Snapshot (Seqlock)
+======================================
+
+One writer process (the trading engine) publishes its latest state into a
+memory-mapped file, and any number of reader processes (the dashboard) map the
+same file and read it without taking a lock:
+
+- Header: magic, sequence number, payload length, capacity, publish time
+- The writer makes the sequence odd, writes the payload, then makes it
+  even again
+- A reader copies the payload between two sequence reads. It keeps the
+  copy only if both reads return the same even number; otherwise the writer
+  was mid-update and the reader retries. Readers never block the writer
+- The payload region has a fixed size, set when the writer opens the file
+  (``engine.snapshot_mb``). It never changes while readers have it mapped:
+  resizing a mapped file fails on Windows, and existing mappings would not
+  see the new size. A payload that does not fit is refused. A restarted
+  writer with a larger capacity grows the file once, under an odd sequence;
+  readers remap when the header reports a capacity beyond their mapping
+
+Payloads are pickles of plain dicts/arrays. Like ``state_store``
+snapshots, they are local, trusted files written by this bot only.
+"""
+
+import logging
+import mmap
+import os
+import pickle
+import struct
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+MAGIC = b'US30SNAP'
+# magic, seq, length, capacity, published_at
+HEADER = struct.Struct('<8sQQQd')
+SEQ_OFFSET = 8
+
+
+class SnapshotWriter:
+    """
+    Single-writer side of the seqlock snapshot file.
+    """
+
+    def __init__(self, path: str, capacity: int = 4 * 1024 * 1024):
+        """
+        Args:
+            path: Snapshot file (created or reused)
+            capacity: Payload capacity in bytes. An existing larger file
+                keeps its size; a smaller one is grown once here
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        self._mm = None
+        self.seq = 0
+        self.capacity = 0
+
+        size = os.fstat(self._file.fileno()).st_size
+        if size >= HEADER.size:
+            self._map(size)
+            magic, seq, _, existing, _ = HEADER.unpack_from(self._mm, 0)
+            if magic == MAGIC:
+                # Continue the sequence so running readers see a newer version
+                self.seq = seq + (seq & 1)
+                self.capacity = existing
+        if capacity > self.capacity or self._mm is None:
+            self._resize(capacity)
+
+    def _map(self, size: int):
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+    def _resize(self, capacity: int):
+        """Grow the payload region (only when the writer opens the file)."""
+        length, published_at = 0, 0.0
+        if self.capacity:
+            # Growing a published file: readers retry while the sequence is
+            # odd, and the current payload (untouched by growth) stays valid
+            _, _, length, _, published_at = HEADER.unpack_from(self._mm, 0)
+            struct.pack_into('<Q', self._mm, SEQ_OFFSET, self.seq + 1)
+        try:
+            self._file.truncate(HEADER.size + capacity)
+        except OSError as e:
+            if not self.capacity:
+                raise
+            # E.g. Windows while a reader still maps the file
+            struct.pack_into('<Q', self._mm, SEQ_OFFSET, self.seq)
+            logging.warning(f"Snapshot {self.path}: cannot grow to {capacity} bytes ({e}); "
+                            f"keeping {self.capacity}")
+            return
+        self._map(HEADER.size + capacity)
+        self.capacity = capacity
+        HEADER.pack_into(self._mm, 0, MAGIC, self.seq, length, capacity, published_at)
+
+    def publish(self, payload: Any) -> int:
+        """
+        Write a new version.
+
+        Returns:
+            The new (even) sequence number
+
+        Raises:
+            ValueError: If the pickled payload exceeds ``capacity``; the
+                previous version stays published
+        """
+        data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.capacity:
+            raise ValueError(f"snapshot payload of {len(data)} bytes exceeds the {self.capacity}-byte region")
+
+        mm = self._mm
+        struct.pack_into('<Q', mm, SEQ_OFFSET, self.seq + 1)
+        mm[HEADER.size:HEADER.size + len(data)] = data
+        HEADER.pack_into(mm, 0, MAGIC, self.seq + 1, len(data), self.capacity, time.time())
+        self.seq += 2
+        struct.pack_into('<Q', mm, SEQ_OFFSET, self.seq)
+        return self.seq
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+
+class SnapshotReader:
+    """
+    Lock-free reader of a ``SnapshotWriter`` file.
+    """
+
+    def __init__(self, path: str, max_retries: int = 100):
+        self.path = Path(path)
+        self.max_retries = max_retries
+        self.seq = 0
+        self.published_at = 0.0
+        self._file = None
+        self._mm = None
+
+    def _open(self) -> bool:
+        if self._mm is not None:
+            return True
+        if not self.path.exists() or self.path.stat().st_size < HEADER.size:
+            return False
+        self._file = open(self.path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return True
+
+    def _remap(self):
+        self._mm.close()
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, only_newer: bool = True) -> Optional[Tuple[int, Any]]:
+        """
+        Copy the latest consistent version.
+
+        Args:
+            only_newer: Return None if the version was already read
+
+        Returns:
+            (seq, payload), or None if there is no (new) version yet
+        """
+        if not self._open():
+            return None
+        for attempt in range(self.max_retries):
+            mm = self._mm
+            magic, seq, length, capacity, published_at = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or seq == 0:
+                return None
+            if seq & 1:
+                # Writer mid-update
+                time.sleep(0 if attempt < 10 else 0.001)
+                continue
+            if only_newer and seq == self.seq:
+                return None
+            if HEADER.size + capacity > len(mm):
+                self._remap()
+                continue
+            data = mm[HEADER.size:HEADER.size + length]
+            if struct.unpack_from('<Q', mm, SEQ_OFFSET)[0] != seq:
+                continue
+            self.seq = seq
+            self.published_at = published_at
+            return seq, pickle.loads(data)
+        logging.warning(f"Snapshot {self.path}: no consistent read after {self.max_retries} attempts")
+        return None
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
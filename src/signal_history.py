@@ -0,0 +1,333 @@
+"""
+Signal History Ring Buffer
+==========================
+
+Fixed-capacity record of every strategy evaluation, kept in one NumPy
+structured array so memory stays flat over months of uptime.
+
+- One compact row per evaluation (``SIGNAL_DTYPE``). Confluence flags
+  are packed into a bitmask, and no-signal reasons are stored as small codes
+- Repeated evaluations of the same bar with the same outcome update the
+  last row in place (``evaluations`` counts them). A 30s poll therefore
+  writes one row per M5 bar, not ten
+- Queries walk the two ring segments newest first as views.
+  Time bounds use ``searchsorted``, so only the rows that match are copied
+- Optionally backed by a memory-mapped file (header + rows), so another
+  process (the dashboard) can query the engine's ring in place via
+  ``SignalHistory.open``. Writes bump a sequence number odd/even around
+  each change, and readers retry a query that overlapped one (the same
+  seqlock as ``src.shared_snapshot``)
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+SIGNAL_DTYPE = np.dtype([
+    ('time', 'f8'),            # evaluated bar time (epoch seconds)
+    ('evaluated_at', 'f8'),    # wall clock of the latest evaluation
+    ('signal', 'i1'),          # 1 BUY, -1 SELL, 0 NONE
+    ('strength', 'f4'),
+    ('entry_price', 'f8'),
+    ('stop_loss', 'f8'),
+    ('take_profit', 'f8'),
+    ('flags', 'u1'),           # FLAGS bits, then EMA bias bits
+    ('confluence', 'u1'),
+    ('mtf_score', 'f4'),       # NaN without multi-timeframe scoring
+    ('zones_touched', 'u2'),
+    ('reason', 'u1'),          # index into REASONS
+    ('evaluations', 'u4'),
+])
+
+SIGNAL_CODES = {'BUY': 1, 'SELL': -1, 'NONE': 0}
+SIGNAL_NAMES = {code: name for name, code in SIGNAL_CODES.items()}
+
+# details key -> bit
+FLAGS = ('bos', 'mss', 'ob', 'fvg', 'liquidity_sweep')
+BIAS_BITS = {'bullish': 1 << len(FLAGS), 'bearish': 1 << (len(FLAGS) + 1)}
+
+# No-signal reasons reported by SMCStrategy._no_signal (0 = signal, last = other)
+REASONS = ('', 'Insufficient data', 'No EMA bias', 'No SMC entry conditions',
+           'Signal misaligned with EMA bias', 'Other')
+_REASON_CODES = {reason: code for code, reason in enumerate(REASONS)}
+
+MAX_QUERY_LIMIT = 1000
+
+MAGIC = b'US30SIGS'
+# File header in front of the rows; ``count`` is rows ever written
+META_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('capacity', '<u8'),
+    ('seq', '<u8'),
+    ('count', '<u8'),
+    ('total_signals', '<u8'),
+])
+MAX_READ_RETRIES = 100
+
+
+def _float(value) -> float:
+    return float('nan') if value is None else float(value)
+
+
+class SignalHistory:
+    """
+    Ring buffer of strategy evaluations.
+    """
+
+    def __init__(self, capacity: int = 8192, path: Optional[str] = None):
+        """
+        Args:
+            capacity: Rows kept (oldest overwritten first)
+            path: Back the ring with this file so other processes can
+                ``open`` it; an existing file of the same capacity is reused
+        """
+        self.capacity = int(capacity)
+        self.path = None if path is None else Path(path)
+        self._lock = threading.Lock()
+        size = META_DTYPE.itemsize + self.capacity * SIGNAL_DTYPE.itemsize
+        if self.path is None:
+            self._attach(np.zeros(size, dtype=np.uint8))
+            self._meta[0] = (MAGIC, self.capacity, 0, 0, 0)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            reuse = self.path.exists() and self.path.stat().st_size == size
+            self._attach(np.memmap(self.path, dtype=np.uint8, mode='r+' if reuse else 'w+', shape=(size,)))
+            meta = self._meta[0]
+            if reuse and meta['magic'] == MAGIC and meta['capacity'] == self.capacity:
+                # Left by a previous run; a write interrupted mid-way leaves it odd
+                meta['seq'] += meta['seq'] & 1
+            else:
+                self._meta[0] = (MAGIC, self.capacity, 0, 0, 0)
+
+    @classmethod
+    def open(cls, path: str) -> 'SignalHistory':
+        """
+        Read-only view of a ring another process writes to ``path``.
+
+        Raises:
+            ValueError: If ``path`` is not a signal history file
+        """
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+        meta = raw[:META_DTYPE.itemsize].view(META_DTYPE)[0]
+        if meta['magic'] != MAGIC or len(raw) != META_DTYPE.itemsize + int(meta['capacity']) * SIGNAL_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a signal history file")
+        history = cls.__new__(cls)
+        history.capacity = int(meta['capacity'])
+        history.path = Path(path)
+        history._lock = threading.Lock()
+        history._attach(raw)
+        return history
+
+    def _attach(self, raw: np.ndarray):
+        self._meta = raw[:META_DTYPE.itemsize].view(META_DTYPE)
+        self._buffer = raw[META_DTYPE.itemsize:].view(SIGNAL_DTYPE)
+
+    @property
+    def _count(self) -> int:
+        return int(self._meta[0]['count'])
+
+    @property
+    def total_signals(self) -> int:
+        return int(self._meta[0]['total_signals'])
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def _write_begin(self):
+        self._meta[0]['seq'] += 1
+
+    def _write_end(self):
+        self._meta[0]['seq'] += 1
+
+    def _consistent(self, read):
+        """Run ``read()`` until no write overlapped it (None if that keeps failing)."""
+        meta = self._meta[0]
+        with self._lock:
+            for attempt in range(MAX_READ_RETRIES):
+                seq = int(meta['seq'])
+                if seq & 1:
+                    # Writer (another process) mid-update
+                    time.sleep(0 if attempt < 10 else 0.001)
+                    continue
+                result = read()
+                if int(meta['seq']) == seq:
+                    return result
+        logging.warning(f"Signal history {self.path}: no consistent read after {MAX_READ_RETRIES} attempts")
+        return None
+
+    # ----------------------------------------------------------------- writing
+
+    def append(self, bar_time: Optional[float], result: Dict, evaluated_at: float):
+        """Record one ``SMCStrategy.analyze`` result (skipped without a bar time)."""
+        if bar_time is None:
+            return
+        details = result.get('details') or {}
+        code = SIGNAL_CODES.get(result['signal'], 0)
+        flags = 0
+        for bit, key in enumerate(FLAGS):
+            if details.get(key):
+                flags |= 1 << bit
+        flags |= BIAS_BITS.get(details.get('ema_bias'), 0)
+        reason = 0 if code else _REASON_CODES.get(details.get('reason', ''), len(REASONS) - 1)
+        bar_time = float(bar_time)
+
+        with self._lock:
+            count = self._count
+            self._write_begin()
+            try:
+                if count:
+                    last = self._buffer[(count - 1) % self.capacity]
+                    if (last['time'] == bar_time and last['signal'] == code and last['reason'] == reason
+                            and last['flags'] == flags):
+                        # Same bar, same outcome: refresh in place
+                        last['evaluated_at'] = evaluated_at
+                        last['strength'] = result.get('strength') or 0
+                        last['evaluations'] += 1
+                        return
+                self._buffer[count % self.capacity] = (
+                    bar_time,
+                    evaluated_at,
+                    code,
+                    result.get('strength') or 0,
+                    _float(result.get('entry_price')),
+                    _float(result.get('stop_loss')),
+                    _float(result.get('take_profit')),
+                    flags,
+                    details.get('confluence_count') or 0,
+                    _float(details.get('mtf_score')),
+                    min(details.get('zones_touched') or 0, 65535),
+                    reason,
+                    1,
+                )
+                self._meta[0]['count'] = count + 1
+                if code:
+                    self._meta[0]['total_signals'] += 1
+            finally:
+                self._write_end()
+
+    # ----------------------------------------------------------------- reading
+
+    def _segments(self) -> List[np.ndarray]:
+        """Views of the filled ring, oldest segment first."""
+        count = self._count
+        if count <= self.capacity:
+            return [self._buffer[:count]]
+        head = count % self.capacity
+        return [self._buffer[head:], self._buffer[:head]]
+
+    def query(self, signal: Optional[str] = None, min_strength: Optional[float] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              include_none: bool = False, limit: int = 100) -> List[Dict]:
+        """
+        Newest-first evaluations matching all filters.
+
+        Args:
+            signal: 'BUY', 'SELL' or 'NONE'
+            min_strength: Minimum strength
+            since / until: Bar time bounds (epoch seconds, inclusive)
+            include_none: Include no-signal evaluations when ``signal`` is unset
+            limit: Max rows (capped at ``MAX_QUERY_LIMIT``)
+        """
+        limit = max(1, min(int(limit), MAX_QUERY_LIMIT))
+        if signal is not None and signal not in SIGNAL_CODES:
+            raise ValueError(f"Unknown signal type: {signal}")
+
+        def read():
+            rows = []
+            for segment in reversed(self._segments()):
+                # Bar times are non-decreasing within the ring
+                    lo = 0 if since is None else np.searchsorted(segment['time'], since, 'left')
+                    hi = len(segment) if until is None else np.searchsorted(segment['time'], until, 'right')
+                    window = segment[lo:hi]
+                    if len(window) == 0:
+                        continue
+                    mask = np.ones(len(window), dtype=bool)
+                    if signal is not None:
+                        mask &= window['signal'] == SIGNAL_CODES[signal]
+                    elif not include_none:
+                        mask &= window['signal'] != 0
+                    if min_strength is not None:
+                        mask &= window['strength'] >= min_strength
+                    matches = np.flatnonzero(mask)[::-1][:limit - len(rows)]
+                    rows.extend(window[matches])
+                    if len(rows) >= limit:
+                        break
+            # Fancy indexing copied the rows, so they survive later writes
+            return rows
+
+        rows = self._consistent(read) or []
+        return [self.to_dict(row) for row in rows]
+
+    def last_signal(self) -> Optional[Dict]:
+        """Most recent BUY/SELL evaluation."""
+        rows = self.query(limit=1)
+        return rows[0] if rows else None
+
+    @staticmethod
+    def to_dict(row) -> Dict:
+        def value(name):
+            v = float(row[name])
+            return None if np.isnan(v) else v
+
+        flags = int(row['flags'])
+        return {
+            'time': value('time'),
+            'evaluated_at': float(row['evaluated_at']),
+            'signal': SIGNAL_NAMES[int(row['signal'])],
+            'strength': round(float(row['strength']), 2),
+            'entry_price': value('entry_price'),
+            'stop_loss': value('stop_loss'),
+            'take_profit': value('take_profit'),
+            'details': {
+                **{key: bool(flags >> bit & 1) for bit, key in enumerate(FLAGS)},
+                'ema_bias': next((bias for bias, bit in BIAS_BITS.items() if flags & bit), None),
+                'confluence_count': int(row['confluence']),
+                'mtf_score': value('mtf_score'),
+                'zones_touched': int(row['zones_touched']),
+                'reason': REASONS[int(row['reason'])] or None,
+            },
+            'evaluations': int(row['evaluations']),
+        }
+
+    # ----------------------------------------------------------------- state
+
+    def get_state(self) -> Dict:
+        """Filled rows (oldest first) for warm-state snapshots."""
+        state = self._consistent(lambda: {'rows': np.concatenate(self._segments()),
+                                          'total_signals': self.total_signals})
+        return state or {'rows': np.empty(0, dtype=SIGNAL_DTYPE), 'total_signals': 0}
+
+    def set_state(self, state: Dict):
+        """Restore a ``get_state()`` snapshot (newest rows kept if it exceeds capacity)."""
+        rows = state.get('rows')
+        if not isinstance(rows, np.ndarray) or rows.dtype != SIGNAL_DTYPE:
+            return
+        rows = rows[-self.capacity:]
+        with self._lock:
+            self._write_begin()
+            self._buffer[:len(rows)] = rows
+            self._meta[0]['count'] = len(rows)
+            self._meta[0]['total_signals'] = int(state.get('total_signals', np.count_nonzero(rows['signal'])))
+            self._write_end()
+
+
+_shared_history: Optional[SignalHistory] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_signal_history(capacity: int = 8192, path: Optional[str] = None) -> SignalHistory:
+    """
+    Process-wide signal history shared by the executor's strategy and the
+    dashboard. ``capacity`` and ``path`` (file backing, for a separate
+    dashboard process) only apply on first creation.
+    """
+    global _shared_history
+    with _shared_lock:
+        if _shared_history is None:
+            _shared_history = SignalHistory(capacity, path)
+        return _shared_history
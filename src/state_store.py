@@ -0,0 +1,100 @@
+"""
+Warm-State Snapshots
+====================
+
+Saves executor/dashboard state (rolling candle windows, strategy state,
+position bookkeeping, last dashboard view) to a compact local file at
+intervals, and restores it on startup so a restart does not have to warm
+up from nothing or re-enter a trade it already took.
+
+Files are zlib-compressed pickles written atomically (temp file +
+``os.replace``), so a crash mid-write never leaves a corrupt snapshot.
+They are local, trusted files produced by this bot only.
+"""
+
+import logging
+import os
+import pickle
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+
+STATE_VERSION = 1
+
+
+def state_path(config, name: str) -> Optional[Path]:
+    """Snapshot path for a component, or None if ``data.state.enabled`` is off."""
+    if not config.data.state_enabled:
+        return None
+    directory = Path(config.data.state_directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f'{name}.state'
+
+
+def save_state(path: Path, state: Dict):
+    """Atomically write ``state`` to ``path``."""
+    payload = {'version': STATE_VERSION, 'saved_at': time.time(), 'state': state}
+    data = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), 3)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_state(path: Optional[Path], max_age_seconds: Optional[float] = None) -> Optional[Dict]:
+    """
+    Read a snapshot written by ``save_state``.
+
+    Returns:
+        The saved state dict (with '_saved_at' added), or None if missing,
+        unreadable, from another version or older than ``max_age_seconds``
+    """
+    if path is None or not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            payload = pickle.loads(zlib.decompress(f.read()))
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable state snapshot {path}: {e}")
+        return None
+
+    if payload.get('version') != STATE_VERSION:
+        logging.info(f"Ignoring state snapshot {path} from version {payload.get('version')}")
+        return None
+    age = time.time() - payload['saved_at']
+    if max_age_seconds is not None and age > max_age_seconds:
+        logging.info(f"Ignoring stale state snapshot {path} ({age / 3600:.1f}h old)")
+        return None
+
+    state = payload['state']
+    state['_saved_at'] = payload['saved_at']
+    return state
+
+
+class Snapshotter:
+    """Rate-limits snapshot writes to one per ``interval_seconds``."""
+
+    def __init__(self, path: Optional[Path], interval_seconds: float = 60.0):
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self._last = 0.0
+
+    def maybe_save(self, build_state, force: bool = False) -> bool:
+        """
+        Call ``build_state()`` and save it if the interval has elapsed.
+
+        Args:
+            force: Save now regardless of the interval (e.g. right after an
+                entry, so a restart cannot repeat it)
+        """
+        if self.path is None or (not force and time.time() - self._last < self.interval_seconds):
+            return False
+        try:
+            save_state(self.path, build_state())
+            self._last = time.time()
+            return True
+        except Exception as e:
+            logging.error(f"Failed to save state snapshot {self.path}: {e}")
+            return False
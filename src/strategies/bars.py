@@ -0,0 +1,86 @@
+"""
+Columnar Bar Input for Strategies
+=================================
+
+Strategies read OHLC data through ``Bars``: plain NumPy column views
+instead of DataFrame ``.iloc`` lookups.
+
+- MT5 ``copy_rates_*`` structured arrays (and candle store memmaps) are
+  wrapped zero-copy: each column is a strided view of the record array
+- pandas DataFrames are still accepted; float columns come out of
+  ``to_numpy()`` without a copy
+- ``Bars.slice`` returns views, so replaying a long history bar by bar
+  does not allocate per bar
+"""
+
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class Bars:
+    """OHLC column views plus bar times (epoch seconds)."""
+
+    __slots__ = ('time', 'open', 'high', 'low', 'close', 'timed')
+
+    def __init__(self, time: np.ndarray, open: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, timed: bool = True):
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        # False when ``time`` is only a positional index (no real timestamps)
+        self.timed = timed
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def slice(self, start: Optional[int] = None, stop: Optional[int] = None) -> 'Bars':
+        """Row slice as views (no copy)."""
+        s = slice(start, stop)
+        return Bars(self.time[s], self.open[s], self.high[s], self.low[s], self.close[s], self.timed)
+
+
+def _epoch_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return index.to_numpy().astype('datetime64[s]').astype(np.int64)
+
+
+def as_bars(data) -> Bars:
+    """
+    Wrap strategy input as ``Bars``.
+
+    Args:
+        data: ``Bars``, a structured array with time/open/high/low/close
+            fields (MT5 rates), a mapping of column arrays, or a DataFrame
+            (``time`` column, DatetimeIndex or positional index)
+    """
+    if isinstance(data, Bars):
+        return data
+
+    if isinstance(data, np.ndarray) and data.dtype.names:
+        if 'time' in data.dtype.names:
+            return Bars(data['time'], data['open'], data['high'], data['low'], data['close'])
+        return Bars(np.arange(len(data)), data['open'], data['high'], data['low'], data['close'], timed=False)
+
+    if isinstance(data, pd.DataFrame):
+        columns = [data[name].to_numpy() for name in ('open', 'high', 'low', 'close')]
+        if 'time' in data.columns:
+            times = data['time']
+            if pd.api.types.is_datetime64_any_dtype(times):
+                return Bars(_epoch_seconds(pd.DatetimeIndex(times)), *columns)
+            return Bars(times.to_numpy(), *columns)
+        if isinstance(data.index, pd.DatetimeIndex):
+            return Bars(_epoch_seconds(data.index), *columns)
+        return Bars(data.index.to_numpy(), *columns, timed=False)
+
+    if isinstance(data, Mapping):
+        columns = [np.asarray(data[name]) for name in ('open', 'high', 'low', 'close')]
+        if 'time' in data:
+            return Bars(np.asarray(data['time']), *columns)
+        return Bars(np.arange(len(columns[3])), *columns, timed=False)
+
+    raise TypeError(f"Unsupported bar input: {type(data).__name__}")
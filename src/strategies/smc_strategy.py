@@ -12,9 +12,61 @@ Smart Money Concept strategy that detects:
 This strategy combines multiple SMC confluences to generate entry signals.
 """
 
-import pandas as pd
+import time
+from dataclasses import dataclass
+
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Mapping, Tuple, Optional
+
+from src.confluence import (ConfluenceEngine, detect_bos, detect_fvg, detect_mss, detect_ob,
+                            detect_sweep)
+from src.regime import RegimeMonitor
+from src.signal_history import SignalHistory
+from src.strategies.bars import Bars, as_bars
+from src.zones import ZoneBook
+
+
+@dataclass(frozen=True, slots=True)
+class SMCParams:
+    """
+    One immutable set of strategy parameters (plus the MTF engine built from
+    them). Hot-reloads replace the whole object, so ``analyze`` never sees a
+    half-updated mix.
+    """
+    config: Mapping
+    entry_tf: str
+    bias_tf: str
+    ema_period: int
+    tp_multiplier: float
+    min_candles: int
+    rr_ratio: float
+    confluence_engine: Optional[ConfluenceEngine]
+    required_bars: int
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> 'SMCParams':
+        entry_tf = config.get('entry_timeframe', 'M5')
+        min_candles = config.get('min_candles', 100)
+        # Optional multi-timeframe confluence scoring from the entry buffer
+        engine = None
+        mtf_weights = config.get('confluence_timeframes')
+        if mtf_weights:
+            engine = ConfluenceEngine(dict(mtf_weights), base_tf=entry_tf, min_bars=min_candles)
+        return cls(
+            config=config,
+            entry_tf=entry_tf,
+            bias_tf=config.get('bias_timeframe', 'H1'),
+            ema_period=config.get('ema_period', 50),
+            tp_multiplier=config.get('tp_multiplier', 3),
+            min_candles=min_candles,
+            rr_ratio=config.get('rr_ratio', 3),
+            confluence_engine=engine,
+            required_bars=max(min_candles, engine.required_base_bars if engine else 0),
+        )
+
+
+def _param(name: str) -> property:
+    return property(lambda self: getattr(self.params, name), doc=f"Current ``SMCParams.{name}``")
 
 
 class SMCStrategy:
@@ -29,32 +81,65 @@ class SMCStrategy:
     4. At least one of: Order Block, FVG, or Liquidity Sweep present
     """
     
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, zone_book: Optional[ZoneBook] = None,
+                 signal_history: Optional[SignalHistory] = None,
+                 regime_monitor: Optional[RegimeMonitor] = None):
         """
         Initialize SMC strategy.
         
         Args:
             config: Strategy configuration from config_us30.json
+            zone_book: Shared OB/FVG zone book (a private one is created if omitted)
+            signal_history: Shared evaluation ring buffer (a private one is created if
+                omitted; none with ``signal_history_size: 0``)
+            regime_monitor: Live spread/volatility regime (reported in signal details)
         """
-        self.config = config
-        self.entry_tf = config.get('entry_timeframe', 'M5')
-        self.bias_tf = config.get('bias_timeframe', 'H1')
-        self.ema_period = config.get('ema_period', 50)
-        self.tp_multiplier = config.get('tp_multiplier', 3)
-        self.min_candles = config.get('min_candles', 100)
-        self.rr_ratio = config.get('rr_ratio', 3)
-        
-        # Store last detection for logging
-        self.last_signal = None
-        self.signal_history = []
-        
-    def analyze(self, entry_data: pd.DataFrame, bias_data: pd.DataFrame) -> Dict:
+        self.update_params(config)
+
+        # Persistent OB/FVG zones (shared with backtester/dashboard when passed in)
+        if zone_book is None:
+            zone_book = ZoneBook(
+                max_age_seconds=config.get('zone_max_age_hours', 48) * 3600,
+                max_zones=config.get('zone_max_count', 500),
+            )
+        self.zone_book = zone_book
+
+        # Every evaluation, in a fixed-size ring buffer
+        history_size = config.get('signal_history_size', 8192)
+        if signal_history is None and history_size > 0:
+            signal_history = SignalHistory(history_size)
+        self.signal_history = signal_history
+        self.regime_monitor = regime_monitor
+
+    config = _param('config')
+    entry_tf = _param('entry_tf')
+    bias_tf = _param('bias_tf')
+    ema_period = _param('ema_period')
+    tp_multiplier = _param('tp_multiplier')
+    min_candles = _param('min_candles')
+    rr_ratio = _param('rr_ratio')
+    confluence_engine = _param('confluence_engine')
+    required_bars = _param('required_bars')
+
+    def update_params(self, config: Dict):
+        """
+        Apply (new) strategy parameters, e.g. after a config hot-reload from
+        another thread. The new ``SMCParams`` is built first and swapped in
+        as one reference. Zones and signal history are kept.
+        """
+        self.params = SMCParams.from_config(config)
+
+    def analyze(self, entry_data, bias_data, forming: bool = False) -> Dict:
         """
-        Analyze price data for SMC entry signals.
+        Analyze price data for SMC entry signals. Every result is recorded
+        in ``signal_history`` (if there is one).
         
         Args:
-            entry_data: OHLCV data on entry timeframe (M5)
-            bias_data: OHLCV data on bias timeframe (H1)
+            entry_data: OHLCV data on entry timeframe (M5): MT5 rates
+                structured array, ``Bars`` or DataFrame
+            bias_data: OHLCV data on bias timeframe (H1), same formats
+            forming: The last entry bar is still forming (live feed); OB/FVG
+                zones are then registered from the bar before it
             
         Returns:
             Dict with signal and details:
@@ -68,13 +153,37 @@ class SMCStrategy:
             }
         """
         
+        # Column views; no copy for structured arrays
+        entry_data = as_bars(entry_data)
+        bias_data = as_bars(bias_data)
+
+        result = self._analyze(entry_data, bias_data, forming)
+        if self.signal_history is not None:
+            bar_time = self._bar_time(entry_data) if len(entry_data) else None
+            self.signal_history.append(bar_time, result, time.time())
+        return result
+
+    def _analyze(self, entry_data: Bars, bias_data: Bars, forming: bool = False) -> Dict:
+        # One consistent parameter set for the whole evaluation
+        params = self.params
+
         # Validation
-        if len(entry_data) < self.min_candles or len(bias_data) < 2:
+        if len(entry_data) < params.min_candles or len(bias_data) < 2:
             return self._no_signal("Insufficient data")
         
+        # Zone lifecycle needs real bar times: positional indexes of a
+        # fixed-size window never advance, so zones would never age
+        touched_zones = []
+        if entry_data.timed:
+            # Age/fill existing OB/FVG zones with the latest bar
+            touched_zones = self.zone_book.update(
+                self._bar_time(entry_data), float(entry_data.high[-1]), float(entry_data.low[-1])
+            )
+            self._register_zones(entry_data.slice(None, -1) if forming else entry_data)
+
         # Step 1: Get EMA bias from H1
-        ema_value = self._calculate_ema(bias_data['close'], self.ema_period)
-        current_close_h1 = bias_data['close'].iloc[-1]
+        ema_value = self._calculate_ema(bias_data.close, params.ema_period)
+        current_close_h1 = bias_data.close[-1]
         
         bullish_bias = current_close_h1 > ema_value
         bearish_bias = current_close_h1 < ema_value
@@ -98,19 +207,23 @@ class SMCStrategy:
             return self._no_signal("Signal misaligned with EMA bias")
         
         # Step 4: Calculate entry, SL, TP
-        entry_price = entry_data['close'].iloc[-1]
+        entry_price = entry_data.close[-1]
         
         if signal == 'BUY':
             stop_loss = smc_result['support']
             sl_distance = entry_price - stop_loss
-            take_profit = entry_price + (sl_distance * self.rr_ratio)
+            take_profit = entry_price + (sl_distance * params.rr_ratio)
         else:  # SELL
             stop_loss = smc_result['resistance']
             sl_distance = stop_loss - entry_price
-            take_profit = entry_price - (sl_distance * self.rr_ratio)
+            take_profit = entry_price - (sl_distance * params.rr_ratio)
         
         # Calculate confluence strength (0-100)
-        strength = self._calculate_confluence_strength(smc_result)
+        mtf = self._evaluate_mtf(entry_data, smc_result['type'], params.confluence_engine)
+        if mtf is not None:
+            strength = mtf['score']
+        else:
+            strength = self._calculate_confluence_strength(smc_result)
         
         return {
             'signal': signal,
@@ -119,7 +232,7 @@ class SMCStrategy:
             'stop_loss': stop_loss,
             'take_profit': take_profit,
             'sl_distance': sl_distance,
-            'rr_ratio': self.rr_ratio,
+            'rr_ratio': params.rr_ratio,
             'details': {
                 'bos': smc_result['bos'],
                 'mss': smc_result['mss'],
@@ -129,12 +242,29 @@ class SMCStrategy:
                 'ema_bias': 'bullish' if bullish_bias else 'bearish',
                 'ema_value': ema_value,
                 'confluence_count': smc_result['confluence_count'],
-                'entry_tf': self.entry_tf,
-                'bias_tf': self.bias_tf,
+                'zones_touched': len(touched_zones),
+                'active_zones': len(self.zone_book),
+                'entry_tf': params.entry_tf,
+                'bias_tf': params.bias_tf,
+                'regime': self.regime_monitor.regime if self.regime_monitor is not None else None,
+                'mtf_score': mtf['score'] if mtf else None,
+                'mtf': mtf['timeframes'] if mtf else None,
             }
         }
     
-    def _check_smc_entry(self, data: pd.DataFrame) -> Dict:
+    def _register_zones(self, closed: Bars):
+        """Record OB/FVG zones formed by the last closed bar of ``closed``."""
+        if len(closed) == 0:
+            return
+        bar_time = self._bar_time(closed)
+        ob_result = self._check_ob(closed)
+        if ob_result:
+            self.zone_book.add('OB', ob_result['direction'], *ob_result['zone'], bar_time)
+        fvg_result = self._check_fvg(closed)
+        if fvg_result:
+            self.zone_book.add('FVG', fvg_result['type'], *fvg_result['zone'], bar_time)
+
+    def _check_smc_entry(self, data: Bars) -> Dict:
         """
         Check for SMC entry conditions.
         
@@ -191,12 +321,12 @@ class SMCStrategy:
         
         if has_core_signals and has_confluence:
             result['signal'] = 'VALID'
-            result['support'] = ob_result.get('support') if ob_result else data['low'].iloc[-1]
-            result['resistance'] = ob_result.get('resistance') if ob_result else data['high'].iloc[-1]
+            result['support'] = ob_result.get('support') if ob_result else data.low[-1]
+            result['resistance'] = ob_result.get('resistance') if ob_result else data.high[-1]
         
         return result
     
-    def _check_bos(self, data: pd.DataFrame) -> Optional[Dict]:
+    def _check_bos(self, data: Bars) -> Optional[Dict]:
         """
         Break of Structure: Price breaks above last 2 swing highs (bullish)
         or below last 2 swing lows (bearish).
@@ -207,26 +337,14 @@ class SMCStrategy:
         if len(data) < 3:
             return None
         
-        # Get last swing highs/lows
-        last_high = data['high'].iloc[-2]
-        prev_high = data['high'].iloc[-3]
-        last_low = data['low'].iloc[-2]
-        prev_low = data['low'].iloc[-3]
-        
-        current_high = data['high'].iloc[-1]
-        current_low = data['low'].iloc[-1]
-        
-        # Bullish BOS: Break above last 2 swing highs
-        if current_high > last_high and last_high > prev_high:
+        bullish, bearish = detect_bos(data.high, data.low)
+        if bullish:
             return {'type': 'BULLISH'}
-        
-        # Bearish BOS: Break below last 2 swing lows
-        if current_low < last_low and last_low < prev_low:
+        if bearish:
             return {'type': 'BEARISH'}
-        
         return None
     
-    def _check_mss(self, data: pd.DataFrame) -> Optional[Dict]:
+    def _check_mss(self, data: Bars) -> Optional[Dict]:
         """
         Market Structure Shift: Last candle closes higher than previous 2
         (bullish) or lower than previous 2 (bearish).
@@ -237,83 +355,68 @@ class SMCStrategy:
         if len(data) < 3:
             return None
         
-        last_close = data['close'].iloc[-1]
-        prev_close = data['close'].iloc[-2]
-        prev_prev_close = data['close'].iloc[-3]
-        
-        # Bullish MSS
-        if last_close > prev_close and prev_close > prev_prev_close:
+        bullish, bearish = detect_mss(data.close)
+        if bullish:
             return {'type': 'BULLISH'}
-        
-        # Bearish MSS
-        if last_close < prev_close and prev_close < prev_prev_close:
+        if bearish:
             return {'type': 'BEARISH'}
-        
         return None
     
-    def _check_ob(self, data: pd.DataFrame) -> Optional[Dict]:
+    def _check_ob(self, data: Bars) -> Optional[Dict]:
         """
         Order Block: Bullish candle (with large wick) before bearish candle,
         or vice versa. Detects imbalance level.
         
         Returns:
-            {'support'|'resistance': float} or None
+            {'support'|'resistance': float, 'direction': str, 'zone': (low, high)} or None
         """
         if len(data) < 3:
             return None
         
-        # Get last two candles
-        curr_open = data['open'].iloc[-1]
-        curr_close = data['close'].iloc[-1]
-        prev_open = data['open'].iloc[-2]
-        prev_close = data['close'].iloc[-2]
-        prev_high = data['high'].iloc[-2]
-        prev_low = data['low'].iloc[-2]
-        
-        # Bullish OB: Previous bullish candle (close > open) with lower wicks
-        # Price returns to it as support
-        if prev_close > prev_open and curr_close < prev_close:
-            # OB level is near previous candle's low
-            return {'support': prev_low}
-        
-        # Bearish OB: Previous bearish candle (close < open) with upper wicks
-        # Price returns to it as resistance
-        if prev_close < prev_open and curr_close > prev_close:
-            # OB level is near previous candle's high
-            return {'resistance': prev_high}
+        bullish, bearish = detect_ob(data.open, data.close)
+        prev_open = data.open[-2]
+        
+        # Bullish OB: price returns to the up candle's low as support
+        if bullish:
+            return {'support': data.low[-2], 'direction': 'bullish', 'zone': (data.low[-2], prev_open)}
+        
+        # Bearish OB: price returns to the down candle's high as resistance
+        if bearish:
+            return {'resistance': data.high[-2], 'direction': 'bearish', 'zone': (prev_open, data.high[-2])}
         
         return None
     
-    def _check_fvg(self, data: pd.DataFrame) -> Optional[Dict]:
+    def _check_fvg(self, data: Bars) -> Optional[Dict]:
         """
         Fair Value Gap: Imbalance between 3 candles (candle 1 high < candle 3 low
         in uptrend, or candle 1 low > candle 3 high in downtrend).
         
         Returns:
-            {'level': float, 'type': 'bullish'|'bearish'} or None
+            {'level': float, 'type': 'bullish'|'bearish', 'zone': (low, high)} or None
         """
         if len(data) < 4:
             return None
         
-        # Get 3-candle imbalance
-        c3_high = data['high'].iloc[-1]
-        c3_low = data['low'].iloc[-1]
-        c2_open = data['open'].iloc[-2]
-        c2_close = data['close'].iloc[-2]
-        c1_high = data['high'].iloc[-3]
-        c1_low = data['low'].iloc[-3]
+        bullish, bearish = detect_fvg(data.open, data.high, data.low, data.close)
+        c3_high = data.high[-1]
+        c3_low = data.low[-1]
+        c2_open = data.open[-2]
+        c1_high = data.high[-3]
+        c1_low = data.low[-3]
         
         # Bullish FVG: Gap up (C1 high < C2 close && C2 open < C3 low)
-        if c1_high < c2_close and c2_open < c3_low:
-            return {'level': (c1_high + c2_open) / 2, 'type': 'bullish'}
+        if bullish:
+            return {'level': (c1_high + c2_open) / 2, 'type': 'bullish',
+                    'zone': (min(c1_high, c3_low), max(c1_high, c3_low))}
         
         # Bearish FVG: Gap down (C1 low > C2 close && C2 open > C3 high)
-        if c1_low > c2_close and c2_open > c3_high:
-            return {'level': (c1_low + c2_open) / 2, 'type': 'bearish'}
+        if bearish:
+            return {'level': (c1_low + c2_open) / 2, 'type': 'bearish',
+                    'zone': (min(c3_high, c1_low), max(c3_high, c1_low))}
         
         return None
     
-    def _check_liquidity_sweep(self, data: pd.DataFrame) -> Optional[Dict]:
+    def _check_liquidity_sweep(self, data: Bars) -> Optional[Dict]:
         """
         Liquidity Sweep: Wick extends beyond previous swing high/low
         then closes back inside range.
@@ -324,28 +427,39 @@ class SMCStrategy:
         if len(data) < 3:
             return None
         
-        curr_high = data['high'].iloc[-1]
-        curr_low = data['low'].iloc[-1]
-        curr_close = data['close'].iloc[-1]
-        
-        prev_high = data['high'].iloc[-2]
-        prev_low = data['low'].iloc[-2]
-        
-        # Bullish Sweep: High extends above prev high, close inside
-        if curr_high > prev_high and curr_close < prev_high:
+        # Bullish flag: high swept, close back inside; bearish: low swept
+        above, below = detect_sweep(data.high, data.low, data.close)
+        if above:
             return {'type': 'bullish'}
-        
-        # Bearish Sweep: Low extends below prev low, close inside
-        if curr_low < prev_low and curr_close > prev_low:
+        if below:
             return {'type': 'bearish'}
-        
         return None
     
-    def _calculate_ema(self, series: pd.Series, period: int) -> float:
-        """Calculate EMA for last value."""
-        if len(series) < period:
-            return series.mean()
-        return series.ewm(span=period, adjust=False).mean().iloc[-1]
+    def _bar_time(self, data: Bars) -> float:
+        """Epoch seconds of the last bar (its position when the input is not ``timed``)."""
+        return float(data.time[-1])
+
+    def _calculate_ema(self, values: np.ndarray, period: int) -> float:
+        """EMA of the last value (same recursion as ``ewm(span=period, adjust=False)``)."""
+        if len(values) < period:
+            return float(np.mean(values))
+        alpha = 2.0 / (period + 1)
+        decay = (1.0 - alpha) ** np.arange(len(values) - 1, -1, -1)
+        return float(decay[0] * values[0] + alpha * np.dot(decay[1:], values[1:]))
+
+    def _evaluate_mtf(self, data: Bars, trade_type: str,
+                      engine: Optional[ConfluenceEngine]) -> Optional[Dict]:
+        """Run the multi-timeframe confluence engine (needs bar times)."""
+        if engine is None or not data.timed:
+            return None
+        return engine.evaluate(
+            data.time,
+            data.open.astype(float, copy=False),
+            data.high.astype(float, copy=False),
+            data.low.astype(float, copy=False),
+            data.close.astype(float, copy=False),
+            trade_type,
+        )
     
     def _calculate_confluence_strength(self, smc_result: Dict) -> int:
         """Calculate signal strength based on confluence count (0-100)."""
@@ -374,15 +488,32 @@ class SMCStrategy:
             }
         }
     
+    def get_state(self) -> Dict:
+        """Strategy state for warm restarts."""
+        return {
+            'signal_history': self.signal_history.get_state() if self.signal_history is not None else None,
+            'zones': self.zone_book.get_state(),
+        }
+
+    def set_state(self, state: Dict):
+        """Restore state saved by ``get_state()``."""
+        history = state.get('signal_history')
+        if isinstance(history, dict) and self.signal_history is not None:
+            self.signal_history.set_state(history)
+        self.zone_book.set_state(state.get('zones', []))
+
     def get_status(self) -> Dict:
         """Get strategy status."""
+        params = self.params
+        history = self.signal_history
         return {
             'strategy': 'SMC',
             'enabled': True,
-            'entry_timeframe': self.entry_tf,
-            'bias_timeframe': self.bias_tf,
-            'ema_period': self.ema_period,
-            'rr_ratio': self.rr_ratio,
-            'last_signal': self.last_signal,
-            'total_signals': len(self.signal_history),
+            'entry_timeframe': params.entry_tf,
+            'bias_timeframe': params.bias_tf,
+            'ema_period': params.ema_period,
+            'rr_ratio': params.rr_ratio,
+            'last_signal': history.last_signal() if history is not None else None,
+            'total_signals': history.total_signals if history is not None else 0,
+            'active_zones': len(self.zone_book),
         }
@@ -0,0 +1,350 @@
+"""
+Binary Tick Recorder
+====================
+
+Records live bid/ask ticks to compact daily files so live sessions can be
+replayed later.
+
+File layout (per symbol directory):
+- ``YYYY-MM-DD.ticks``   fixed-width records (``TICK_DTYPE``, 32 bytes each),
+  directly memory-mappable with ``numpy.memmap``
+- ``YYYY-MM-DD.ticks.z`` same records written as zlib-compressed blocks
+  (when ``compress=True``)
+- ``YYYY-MM-DD.idx``     one ``INDEX_DTYPE`` entry per written block
+  (byte offset, size, tick count, first/last time) for seeking
+
+Producers only append to an in-memory queue; a background thread batches
+and writes, so recording never blocks the trading path. When the queue is
+full the tick is dropped and counted rather than blocking.
+"""
+
+import logging
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+TICK_DTYPE = np.dtype([
+    ('time_msc', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('volume', '<f8'),
+])
+
+INDEX_DTYPE = np.dtype([
+    ('offset', '<i8'),
+    ('nbytes', '<i8'),
+    ('count', '<i8'),
+    ('first_msc', '<i8'),
+    ('last_msc', '<i8'),
+])
+
+MS_PER_DAY = 86_400_000
+
+
+def _day_name(day_number: int) -> str:
+    return datetime.fromtimestamp(day_number * 86_400, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class TickRecorder:
+    """
+    Non-blocking tick recorder with a background writer thread.
+    """
+
+    def __init__(self, directory: str, symbol: str, compress: bool = False,
+                 max_queue: int = 1_000_000, flush_seconds: float = 1.0):
+        """
+        Args:
+            directory: Root directory; files go to ``directory/symbol/``
+            symbol: Trading symbol (e.g. US30m)
+            compress: Write zlib-compressed blocks instead of raw records
+            max_queue: Ticks buffered in memory before new ones are dropped
+            flush_seconds: How often the writer drains the queue
+        """
+        self.path = Path(directory) / symbol
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.symbol = symbol
+        self.compress = compress
+        self.max_queue = max_queue
+        self.flush_seconds = flush_seconds
+
+        self._ticks = deque()      # (time_msc, bid, ask, volume) tuples
+        self._arrays = deque()     # TICK_DTYPE arrays from bulk captures
+        self._array_backlog = 0
+        self._array_lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+
+        self._stop = threading.Event()
+        self._writer = None
+        self._capture = None
+        # Called with each captured tick array (e.g. the regime monitor's spread stats)
+        self._listeners = []
+
+    # ----------------------------------------------------------------- producers
+
+    def record(self, time_msc: int, bid: float, ask: float, volume: float = 0.0):
+        """Queue one tick (never blocks)."""
+        if len(self._ticks) + self._array_backlog >= self.max_queue:
+            self.dropped += 1
+            return
+        self._ticks.append((time_msc, bid, ask, volume))
+
+    def record_tick(self, tick):
+        """Queue an MT5 ``symbol_info_tick`` result."""
+        if tick is not None:
+            self.record(tick.time_msc, tick.bid, tick.ask, tick.volume)
+
+    def record_array(self, ticks: np.ndarray):
+        """Queue a burst of ticks (e.g. an MT5 ``copy_ticks_*`` array)."""
+        if ticks is None or len(ticks) == 0:
+            return
+        block = np.empty(len(ticks), dtype=TICK_DTYPE)
+        for name in TICK_DTYPE.names:
+            block[name] = ticks[name]
+        with self._array_lock:
+            if len(self._ticks) + self._array_backlog + len(block) > self.max_queue:
+                self.dropped += len(block)
+                return
+            self._arrays.append(block)
+            self._array_backlog += len(block)
+
+    def add_listener(self, callback):
+        """Also pass every captured tick array to ``callback`` (from the capture thread)."""
+        self._listeners.append(callback)
+
+    # ----------------------------------------------------------------- lifecycle
+
+    def start(self):
+        """Start the background writer thread."""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+            logging.info(f"Tick recorder writing to {self.path} (compress={self.compress})")
+
+    def stop(self):
+        """Stop background threads and flush what is queued."""
+        self._stop.set()
+        for thread in (self._capture, self._writer):
+            if thread is not None:
+                thread.join(timeout=5)
+        self.flush()
+
+    def start_mt5_capture(self, mt5, poll_seconds: float = 0.5):
+        """
+        Pull every tick from MT5 with ``copy_ticks_from`` in a background thread,
+        so bursts are captured even between dashboard/strategy polls.
+        """
+        self._capture = threading.Thread(target=self._capture_loop, args=(mt5, poll_seconds), daemon=True)
+        self._capture.start()
+
+    def _capture_loop(self, mt5, poll_seconds: float):
+        last_msc = int(time.time() * 1000)
+        seen_at_last = 0
+        while not self._stop.is_set():
+            try:
+                if mt5.initialize():
+                    ticks = mt5.copy_ticks_from(self.symbol, last_msc // 1000, 100_000, mt5.COPY_TICKS_ALL)
+                    if ticks is not None and len(ticks) > 0:
+                        fresh = ticks[ticks['time_msc'] >= last_msc]
+                        # Ticks sharing the last millisecond were already recorded
+                        skip = min(seen_at_last, int((fresh['time_msc'] == last_msc).sum()))
+                        fresh = fresh[skip:]
+                        if len(fresh) > 0:
+                            self.record_array(fresh)
+                            for callback in self._listeners:
+                                callback(fresh)
+                            newest = int(fresh['time_msc'][-1])
+                            same = int((fresh['time_msc'] == newest).sum())
+                            seen_at_last = same + (seen_at_last if newest == last_msc else 0)
+                            last_msc = newest
+            except Exception as e:
+                logging.error(f"Tick capture error: {e}")
+            self._stop.wait(poll_seconds)
+
+    # ----------------------------------------------------------------- writing
+
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Tick recorder flush failed: {e}")
+
+    def flush(self):
+        """Drain the queue and append to the daily files."""
+        parts = []
+        with self._array_lock:
+            while self._arrays:
+                parts.append(self._arrays.popleft())
+            self._array_backlog = 0
+        count = len(self._ticks)
+        if count:
+            rows = [self._ticks.popleft() for _ in range(count)]
+            parts.append(np.array(rows, dtype=TICK_DTYPE))
+        if not parts:
+            return
+
+        batch = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        batch = batch[np.argsort(batch['time_msc'], kind='stable')]
+
+        days = batch['time_msc'] // MS_PER_DAY
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        for chunk in np.split(batch, bounds):
+            self._append(_day_name(int(chunk['time_msc'][0] // MS_PER_DAY)), chunk)
+        self.written += len(batch)
+
+    def _append(self, day: str, chunk: np.ndarray):
+        data_path = self.path / (f'{day}.ticks.z' if self.compress else f'{day}.ticks')
+        payload = chunk.tobytes()
+        if self.compress:
+            payload = zlib.compress(payload, 1)
+
+        with open(data_path, 'ab') as f:
+            offset = f.tell()
+            f.write(payload)
+
+        entry = np.array([(offset, len(payload), len(chunk),
+                           chunk['time_msc'][0], chunk['time_msc'][-1])], dtype=INDEX_DTYPE)
+        with open(self.path / f'{day}.idx', 'ab') as f:
+            f.write(entry.tobytes())
+
+    def get_status(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'path': str(self.path),
+            'queued': len(self._ticks) + self._array_backlog,
+            'written': self.written,
+            'dropped': self.dropped,
+            'compress': self.compress,
+        }
+
+
+class TickReader:
+    """
+    Lazy reader for recorded tick days.
+    """
+
+    def __init__(self, directory: str, symbol: str):
+        self.path = Path(directory) / symbol
+        self.symbol = symbol
+
+    def days(self) -> List[str]:
+        """Recorded days, oldest first."""
+        return sorted(p.name[:10] for p in self.path.glob('*.idx'))
+
+    def index(self, day: str) -> np.ndarray:
+        return np.fromfile(self.path / f'{day}.idx', dtype=INDEX_DTYPE)
+
+    def load_day(self, day: str) -> np.ndarray:
+        """
+        Whole day of ticks: a zero-copy memmap for raw files, a decompressed
+        array for compressed ones.
+        """
+        raw = self.path / f'{day}.ticks'
+        if raw.exists():
+            if raw.stat().st_size == 0:
+                return np.empty(0, dtype=TICK_DTYPE)
+            return np.memmap(raw, dtype=TICK_DTYPE, mode='r')
+        blocks = list(self.iter_blocks(day))
+        return np.concatenate(blocks) if blocks else np.empty(0, dtype=TICK_DTYPE)
+
+    def iter_blocks(self, day: str, start_msc: Optional[int] = None,
+                    end_msc: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Yield tick blocks in time order, skipping blocks outside
+        ``[start_msc, end_msc]`` via the index.
+        """
+        raw = self.path / f'{day}.ticks'
+        compressed = not raw.exists()
+        data = None if compressed else self.load_day(day)
+
+        if compressed:
+            handle = open(self.path / f'{day}.ticks.z', 'rb')
+        try:
+            for entry in self.index(day):
+                if start_msc is not None and entry['last_msc'] < start_msc:
+                    continue
+                if end_msc is not None and entry['first_msc'] > end_msc:
+                    break
+                if compressed:
+                    handle.seek(int(entry['offset']))
+                    block = np.frombuffer(zlib.decompress(handle.read(int(entry['nbytes']))), dtype=TICK_DTYPE)
+                else:
+                    first = int(entry['offset']) // TICK_DTYPE.itemsize
+                    block = data[first:first + int(entry['count'])]
+
+                if start_msc is not None or end_msc is not None:
+                    lo = 0 if start_msc is None else np.searchsorted(block['time_msc'], start_msc, 'left')
+                    hi = len(block) if end_msc is None else np.searchsorted(block['time_msc'], end_msc, 'right')
+                    block = block[lo:hi]
+                if len(block):
+                    yield block
+        finally:
+            if compressed:
+                handle.close()
+
+    def iter_ticks(self, day: str) -> Iterator[np.void]:
+        """Yield individual tick records lazily (e.g. for a simulated broker)."""
+        for block in self.iter_blocks(day):
+            yield from block
+
+    def iter_bars(self, day: str, seconds: int = 300) -> Iterator[Dict]:
+        """
+        Stream bid-price OHLC bars built from the day's ticks, in the same
+        shape as MT5 rates rows, so a recorded day can be fed to the strategy.
+        """
+        bar = None
+        for block in self.iter_blocks(day):
+            buckets = block['time_msc'] // (seconds * 1000)
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            ends = np.r_[starts[1:], len(block)]
+            for s, e in zip(starts, ends):
+                bucket_time = int(buckets[s]) * seconds
+                bids = block['bid'][s:e]
+                if bar is not None and bar['time'] == bucket_time:
+                    bar['high'] = max(bar['high'], float(bids.max()))
+                    bar['low'] = min(bar['low'], float(bids.min()))
+                    bar['close'] = float(bids[-1])
+                    bar['tick_volume'] += e - s
+                    continue
+                if bar is not None:
+                    yield bar
+                bar = {
+                    'time': bucket_time,
+                    'open': float(bids[0]),
+                    'high': float(bids.max()),
+                    'low': float(bids.min()),
+                    'close': float(bids[-1]),
+                    'tick_volume': int(e - s),
+                }
+        if bar is not None:
+            yield bar
+
+
+def start_from_config(config) -> Optional[TickRecorder]:
+    """Start a recorder (and MT5 tick capture) if ``data.tick_recorder.enabled``."""
+    data = config.data
+    if not data.ticks_enabled:
+        return None
+
+    recorder = TickRecorder(
+        data.ticks_directory,
+        config.broker.symbol,
+        compress=data.ticks_compress,
+        max_queue=data.ticks_max_queue,
+        flush_seconds=data.ticks_flush_seconds,
+    )
+    recorder.start()
+    try:
+        import MetaTrader5 as mt5
+        recorder.start_mt5_capture(mt5, data.ticks_poll_seconds)
+    except Exception:
+        logging.warning("MetaTrader5 not available; tick recorder only receives pushed ticks.")
+    return recorder
@@ -0,0 +1,388 @@
+"""
+Trade Journal (SQLite)
+======================
+
+Closed trades in ``data.db_path`` (``data/us30_trades.sqlite``) for the
+dashboard's trade history and analytics endpoints.
+
+- ``trades`` holds one row per closed position. Indexes on
+  ``close_time``, ``(strategy, close_time)`` and ``(symbol, close_time)``
+  end in the implicit rowid, so keyset pages ``(close_time, id) < cursor``
+  are a single index seek at any journal size
+- ``trade_rollup`` keeps per-hour aggregates (trades, wins, P/L, R) per
+  symbol/strategy and is updated in the same transaction as each insert,
+  so day/hour/session summaries scan hour buckets, not trades
+- Writers and readers use per-thread connections in WAL mode, so the
+  dashboard never blocks the recorder
+
+All times are UTC epoch seconds; ``sync_mt5_deals`` converts MT5 deal
+times (broker server time) before recording. Sessions are UTC hour bands
+(see ``SESSION_HOURS``).
+"""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Session bands by UTC hour of the trade's close
+SESSION_HOURS = (
+    ('ASIA', 0, 7),
+    ('LONDON', 7, 13),
+    ('NEW_YORK', 13, 21),
+    ('OFF_HOURS', 21, 24),
+)
+SESSIONS = tuple(name for name, _, _ in SESSION_HOURS)
+_SESSION_BY_HOUR = [next(name for name, lo, hi in SESSION_HOURS if lo <= h < hi) for h in range(24)]
+
+MAX_PAGE_SIZE = 500
+# SQLite host parameter limit per statement (conservative)
+MAX_SQL_PARAMS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    position_id INTEGER UNIQUE,
+    symbol TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    side TEXT NOT NULL,
+    volume REAL NOT NULL,
+    open_time INTEGER NOT NULL,
+    close_time INTEGER NOT NULL,
+    open_price REAL NOT NULL,
+    close_price REAL NOT NULL,
+    sl REAL,
+    tp REAL,
+    profit REAL NOT NULL,
+    commission REAL NOT NULL DEFAULT 0,
+    swap REAL NOT NULL DEFAULT 0,
+    r_multiple REAL,
+    session TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_close ON trades(close_time);
+CREATE INDEX IF NOT EXISTS idx_trades_strategy_close ON trades(strategy, close_time);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_close ON trades(symbol, close_time);
+
+CREATE TABLE IF NOT EXISTS trade_rollup (
+    hour INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    trades INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    profit REAL NOT NULL,
+    gross_win REAL NOT NULL,
+    gross_loss REAL NOT NULL,
+    r_sum REAL NOT NULL,
+    r_count INTEGER NOT NULL,
+    PRIMARY KEY (hour, symbol, strategy)
+) WITHOUT ROWID;
+"""
+
+TRADE_COLUMNS = ('id', 'position_id', 'symbol', 'strategy', 'side', 'volume', 'open_time', 'close_time',
+                 'open_price', 'close_price', 'sl', 'tp', 'profit', 'commission', 'swap', 'r_multiple', 'session')
+
+
+def session_of(epoch_seconds: float) -> str:
+    """Session name for a UTC timestamp."""
+    return _SESSION_BY_HOUR[int(epoch_seconds // 3600) % 24]
+
+
+def encode_cursor(close_time: int, trade_id: int) -> str:
+    return f"{close_time}:{trade_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    close_time, _, trade_id = cursor.partition(':')
+    return int(close_time), int(trade_id)
+
+
+class TradeJournal:
+    """
+    Append-only closed-trade store with keyset pagination and rollups.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    # ----------------------------------------------------------------- writing
+
+    def record(self, trade: Dict) -> bool:
+        """
+        Insert a closed trade and update the hourly rollup.
+
+        Args:
+            trade: symbol, strategy, side, volume, open_time, close_time
+                (UTC epoch seconds), open_price, close_price, profit and optionally
+                position_id, sl, tp, commission, swap, r_multiple
+
+        Returns:
+            False if a trade with the same ``position_id`` is already stored
+        """
+        row = dict(trade)
+        row.setdefault('position_id', None)
+        row.setdefault('sl', None)
+        row.setdefault('tp', None)
+        row.setdefault('commission', 0.0)
+        row.setdefault('swap', 0.0)
+        if row.get('r_multiple') is None and row['sl']:
+            risk = abs(row['open_price'] - row['sl'])
+            direction = 1 if row['side'] == 'BUY' else -1
+            row['r_multiple'] = (row['close_price'] - row['open_price']) * direction / risk if risk else None
+        row.setdefault('r_multiple', None)
+        row['session'] = session_of(row['close_time'])
+
+        net = row['profit'] + row['commission'] + row['swap']
+        r = row['r_multiple']
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO trades (position_id, symbol, strategy, side, volume, open_time, "
+                    "close_time, open_price, close_price, sl, tp, profit, commission, swap, r_multiple, session) "
+                    "VALUES (:position_id, :symbol, :strategy, :side, :volume, :open_time, :close_time, "
+                    ":open_price, :close_price, :sl, :tp, :profit, :commission, :swap, :r_multiple, :session)",
+                    row,
+                )
+                if cur.rowcount == 0:
+                    return False
+                conn.execute(
+                    "INSERT INTO trade_rollup VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (hour, symbol, strategy) DO UPDATE SET "
+                    "trades = trades + 1, wins = wins + excluded.wins, profit = profit + excluded.profit, "
+                    "gross_win = gross_win + excluded.gross_win, gross_loss = gross_loss + excluded.gross_loss, "
+                    "r_sum = r_sum + excluded.r_sum, r_count = r_count + excluded.r_count",
+                    (int(row['close_time']) // 3600, row['symbol'], row['strategy'], int(net > 0), net,
+                     max(net, 0.0), min(net, 0.0), r or 0.0, int(r is not None)),
+                )
+        return True
+
+    def known_positions(self, position_ids) -> set:
+        """The subset of ``position_ids`` already journaled."""
+        ids = list(position_ids)
+        known = set()
+        for i in range(0, len(ids), MAX_SQL_PARAMS):
+            batch = ids[i:i + MAX_SQL_PARAMS]
+            rows = self._conn().execute(
+                f"SELECT position_id FROM trades WHERE position_id IN ({', '.join('?' * len(batch))})", batch)
+            known.update(row[0] for row in rows)
+        return known
+
+    def last_close_time(self, symbol: Optional[str] = None) -> Optional[int]:
+        if symbol is None:
+            row = self._conn().execute("SELECT MAX(close_time) FROM trades").fetchone()
+        else:
+            row = self._conn().execute("SELECT MAX(close_time) FROM trades WHERE symbol = ?", (symbol,)).fetchone()
+        return row[0]
+
+    # ----------------------------------------------------------------- reading
+
+    def page(self, limit: int = 50, cursor: Optional[str] = None, strategy: Optional[str] = None,
+             symbol: Optional[str] = None, since: Optional[int] = None, until: Optional[int] = None) -> Dict:
+        """
+        Newest-first page of trades.
+
+        Args:
+            limit: Page size (capped at ``MAX_PAGE_SIZE``)
+            cursor: ``next_cursor`` of the previous page
+            strategy / symbol: Optional filters
+            since / until: Close-time bounds (epoch seconds, inclusive)
+
+        Returns:
+            {'trades': [...], 'next_cursor': str|None}
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        where, params = self._filters(strategy, symbol, since, until)
+        if cursor:
+            where.append("(close_time, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        sql = f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY close_time DESC, id DESC LIMIT ?"
+        rows = self._conn().execute(sql, (*params, limit + 1)).fetchall()
+
+        trades = [dict(zip(TRADE_COLUMNS, row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = trades[-1]
+            next_cursor = encode_cursor(last['close_time'], last['id'])
+        return {'trades': trades, 'next_cursor': next_cursor}
+
+    def summary(self, group: str = 'day', strategy: Optional[str] = None, symbol: Optional[str] = None,
+                since: Optional[int] = None, until: Optional[int] = None) -> Dict:
+        """
+        Aggregates from the hourly rollup.
+
+        Args:
+            group: 'day' (UTC date), 'hour' (UTC hour of day) or 'session'
+            strategy / symbol / since / until: As in ``page`` (bounds are
+                applied at hour resolution)
+
+        Returns:
+            {'group', 'groups': [{'key', 'trades', 'wins', 'win_rate', 'profit',
+             'profit_factor', 'avg_r'}], 'total': {...}}
+        """
+        if group not in ('day', 'hour', 'session'):
+            raise ValueError(f"Unknown summary group: {group}")
+        # Rollup buckets are whole hours
+        where, params = self._filters(strategy, symbol,
+                                      None if since is None else int(since) // 3600,
+                                      None if until is None else int(until) // 3600, time_column='hour')
+
+        key_sql = 'hour / 24' if group == 'day' else 'hour % 24'
+        sql = (f"SELECT {key_sql} AS k, SUM(trades), SUM(wins), SUM(profit), SUM(gross_win), "
+               f"SUM(gross_loss), SUM(r_sum), SUM(r_count) FROM trade_rollup")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " GROUP BY k ORDER BY k"
+        rows = self._conn().execute(sql, params).fetchall()
+
+        buckets: Dict = {}
+        for k, *values in rows:
+            if group == 'day':
+                key = datetime.fromtimestamp(k * 86400, tz=timezone.utc).strftime('%Y-%m-%d')
+            elif group == 'hour':
+                key = int(k)
+            else:
+                key = _SESSION_BY_HOUR[k]
+            acc = buckets.setdefault(key, [0, 0, 0.0, 0.0, 0.0, 0.0, 0])
+            for i, v in enumerate(values):
+                acc[i] += v
+
+        groups = [dict(key=key, **_stats(acc)) for key, acc in buckets.items()]
+        if group == 'session':
+            groups.sort(key=lambda g: SESSIONS.index(g['key']))
+        total = [sum(acc[i] for acc in buckets.values()) for i in range(7)]
+        return {'group': group, 'groups': groups, 'total': _stats(total)}
+
+    @staticmethod
+    def _filters(strategy, symbol, since, until, time_column: str = 'close_time') -> Tuple[List[str], List]:
+        where, params = [], []
+        if strategy:
+            where.append("strategy = ?")
+            params.append(strategy)
+        if symbol:
+            where.append("symbol = ?")
+            params.append(symbol)
+        if since is not None:
+            where.append(f"{time_column} >= ?")
+            params.append(int(since))
+        if until is not None:
+            where.append(f"{time_column} <= ?")
+            params.append(int(until))
+        return where, params
+
+
+def _stats(acc) -> Dict:
+    trades, wins, profit, gross_win, gross_loss, r_sum, r_count = acc
+    return {
+        'trades': int(trades),
+        'wins': int(wins),
+        'win_rate': round(wins / trades * 100, 1) if trades else 0.0,
+        'profit': round(profit, 2),
+        'profit_factor': round(gross_win / -gross_loss, 2) if gross_loss < 0 else None,
+        'avg_r': round(r_sum / r_count, 3) if r_count else None,
+    }
+
+
+def sync_mt5_deals(mt5, journal: TradeJournal, symbol: str, magic: Optional[int] = None,
+                   strategy: str = 'smc', lookback_days: int = 30) -> int:
+    """
+    Record positions closed in MT5 since the journal's last trade (or the
+    last ``lookback_days`` on an empty journal). The window starts a day
+    before the last close so entry deals of positions held across it are
+    found; positions already stored are skipped by ``position_id`` before
+    their orders are looked up.
+
+    Deal times are broker server time and are stored as UTC.
+
+    Returns:
+        Number of trades added
+    """
+    # Local import: execution_quality imports this module
+    from src.execution_quality import server_time_offset
+
+    server_offset = server_time_offset(mt5, symbol)
+    last = journal.last_close_time(symbol)
+    if last:
+        start = datetime.fromtimestamp(last + server_offset, tz=timezone.utc) - timedelta(days=1)
+    else:
+        start = datetime.now(tz=timezone.utc) - timedelta(days=lookback_days)
+    deals = mt5.history_deals_get(start, datetime.now(tz=timezone.utc) + timedelta(days=1))
+    if not deals:
+        return 0
+
+    positions: Dict[int, Dict] = {}
+    for deal in deals:
+        if deal.symbol != symbol or (magic and deal.magic != magic):
+            continue
+        pos = positions.setdefault(deal.position_id, {'in': None, 'out': [], 'commission': 0.0, 'swap': 0.0})
+        pos['commission'] += deal.commission
+        pos['swap'] += deal.swap
+        if deal.entry == mt5.DEAL_ENTRY_IN:
+            pos['in'] = deal
+        elif deal.entry in (mt5.DEAL_ENTRY_OUT, mt5.DEAL_ENTRY_OUT_BY):
+            pos['out'].append(deal)
+
+    known = journal.known_positions(positions)
+    added = 0
+    for position_id, pos in positions.items():
+        entry, exits = pos['in'], pos['out']
+        if entry is None or not exits or position_id in known:
+            continue
+        volume = sum(d.volume for d in exits)
+        close_price = sum(d.price * d.volume for d in exits) / volume if volume else exits[-1].price
+        sl = tp = None
+        orders = mt5.history_orders_get(position=position_id)
+        if orders:
+            sl, tp = orders[0].sl or None, orders[0].tp or None
+        try:
+            added += journal.record({
+                'position_id': position_id,
+                'symbol': symbol,
+                'strategy': strategy,
+                'side': 'BUY' if entry.type == mt5.DEAL_TYPE_BUY else 'SELL',
+                'volume': volume,
+                'open_time': int(entry.time - server_offset),
+                'close_time': int(max(d.time for d in exits) - server_offset),
+                'open_price': entry.price,
+                'close_price': close_price,
+                'sl': sl,
+                'tp': tp,
+                'profit': sum(d.profit for d in exits),
+                'commission': pos['commission'],
+                'swap': pos['swap'],
+            })
+        except sqlite3.Error as e:
+            logging.error(f"Failed to journal position {position_id}: {e}")
+    return added
+
+
+_journals: Dict[str, TradeJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_trade_journal(config) -> TradeJournal:
+    """Process-wide journal for ``data.db_path``."""
+    path = config.data.db_path
+    with _journals_lock:
+        if path not in _journals:
+            _journals[path] = TradeJournal(path)
+        return _journals[path]
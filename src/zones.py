@@ -0,0 +1,265 @@
+"""
+Zone Book for SMC Order Blocks and Fair Value Gaps
+===================================================
+
+Keeps every detected Order Block (OB) and Fair Value Gap (FVG) alive after
+the bar it was detected on, so the strategy, the backtester and the
+dashboard can all ask "which zones is price trading in right now?".
+
+Zones are kept in an interval index (zone lows sorted with ``bisect`` plus
+the widest live zone width), so a bar's high/low range is matched against
+the book in O(log n + k) instead of scanning every zone. A creation-time
+ordered deque lets age expiry and the ``max_zones`` cap pop the oldest
+zones from the left without a scan. Zones are retired when they are fully
+filled, when they get older than ``max_age_seconds`` or when the book grows
+past ``max_zones`` (oldest first), which keeps memory flat during long live
+sessions.
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+ZONE_KINDS = ('OB', 'FVG')
+
+
+class Zone:
+    """A single OB/FVG price zone and its lifecycle counters."""
+
+    __slots__ = ('kind', 'direction', 'low', 'high', 'created_time',
+                 'touches', 'fill_pct', 'last_touch_time')
+
+    def __init__(self, kind: str, direction: str, low: float, high: float, created_time: float):
+        self.kind = kind
+        self.direction = direction
+        self.low = float(low)
+        self.high = float(high)
+        self.created_time = float(created_time)
+        self.touches = 0
+        self.fill_pct = 0.0
+        self.last_touch_time = None
+
+    @property
+    def key(self) -> Tuple[str, str, float]:
+        return (self.kind, self.direction, self.created_time)
+
+    def to_dict(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'direction': self.direction,
+            'low': self.low,
+            'high': self.high,
+            'created_time': self.created_time,
+            'touches': self.touches,
+            'fill_pct': round(self.fill_pct * 100, 1),
+            'last_touch_time': self.last_touch_time,
+        }
+
+
+class ZoneBook:
+    """
+    Persistent, bounded store of OB/FVG zones with interval lookups.
+
+    Bullish zones (demand) are filled from above, bearish zones (supply)
+    from below; ``fill_pct`` is the deepest penetration seen so far.
+    """
+
+    def __init__(self, max_age_seconds: float = 48 * 3600, max_zones: int = 500):
+        """
+        Args:
+            max_age_seconds: Zones older than this (vs. the latest bar) are expired
+            max_zones: Hard cap on live zones; the oldest are compacted away
+        """
+        self.max_age_seconds = max_age_seconds
+        self.max_zones = max_zones
+
+        self._zones: Dict[Tuple, Zone] = {}
+        # Interval index: zones sorted by low, plus the widest live zone
+        self._lows: List[float] = []
+        self._keys: List[Tuple] = []
+        self._max_width = 0.0
+        # Zones oldest first; removed zones stay until they reach the left end
+        self._by_time = deque()
+        # Bumped on every change (lets publishers skip unchanged books)
+        self.version = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def add(self, kind: str, direction: str, low: float, high: float, created_time: float) -> Zone:
+        """Add a zone (or refresh the bounds of the same zone re-detected on the same bar)."""
+        if kind not in ZONE_KINDS:
+            raise ValueError(f"Unknown zone kind: {kind}")
+        if low > high:
+            low, high = high, low
+
+        with self._lock:
+            zone = Zone(kind, direction, low, high, created_time)
+            existing = self._zones.get(zone.key)
+            if existing is not None:
+                if existing.low == zone.low and existing.high == zone.high:
+                    return existing
+                self._unindex(existing)
+                narrowed = existing.high - existing.low >= self._max_width
+                existing.low, existing.high = zone.low, zone.high
+                zone = existing
+                if narrowed:
+                    self._max_width = self._widest()
+            else:
+                self._zones[zone.key] = zone
+                if self._by_time and zone.created_time < self._by_time[-1].created_time:
+                    # Out of order (rare): insert at its place
+                    pos = bisect.bisect_right(self._by_time, zone.created_time, key=lambda z: z.created_time)
+                    self._by_time.insert(pos, zone)
+                else:
+                    self._by_time.append(zone)
+
+            pos = bisect.bisect_right(self._lows, zone.low)
+            self._lows.insert(pos, zone.low)
+            self._keys.insert(pos, zone.key)
+            self._max_width = max(self._max_width, zone.high - zone.low)
+            self.version += 1
+
+            while len(self._zones) > self.max_zones:
+                self._remove(self._pop_oldest())
+            return zone
+
+    def query(self, low: float, high: float, kind: Optional[str] = None) -> List[Zone]:
+        """Return live zones whose price range intersects ``[low, high]``."""
+        with self._lock:
+            # A zone intersects when zone.low <= high and zone.high >= low.
+            # zone.high <= zone.low + max_width bounds the left side of the scan.
+            start = bisect.bisect_left(self._lows, low - self._max_width)
+            stop = bisect.bisect_right(self._lows, high)
+            hits = []
+            for key in self._keys[start:stop]:
+                zone = self._zones[key]
+                if zone.high >= low and (kind is None or zone.kind == kind):
+                    hits.append(zone)
+            return hits
+
+    def update(self, bar_time: float, high: float, low: float) -> List[Zone]:
+        """
+        Apply a new bar to the book: count touches, update fill percentage,
+        retire fully filled zones and expire old ones.
+
+        Returns:
+            Zones touched by this bar (including ones just filled)
+        """
+        with self._lock:
+            touched = []
+            for zone in self.query(low, high):
+                if zone.created_time >= bar_time:
+                    continue
+                if zone.last_touch_time != bar_time:
+                    zone.touches += 1
+                    zone.last_touch_time = bar_time
+
+                width = zone.high - zone.low
+                if width <= 0:
+                    fill = 1.0
+                elif zone.direction == 'bullish':
+                    fill = (zone.high - low) / width
+                else:
+                    fill = (high - zone.low) / width
+                zone.fill_pct = max(zone.fill_pct, min(1.0, max(0.0, fill)))
+
+                touched.append(zone)
+                if zone.fill_pct >= 1.0:
+                    self._remove(zone)
+            if touched:
+                self.version += 1
+
+            self.expire(bar_time)
+            return touched
+
+    def expire(self, now: float):
+        """Drop zones created more than ``max_age_seconds`` before ``now``."""
+        with self._lock:
+            cutoff = now - self.max_age_seconds
+            while self._by_time:
+                zone = self._by_time[0]
+                if self._zones.get(zone.key) is zone and zone.created_time >= cutoff:
+                    break
+                self._by_time.popleft()
+                self._remove(zone)
+
+    def active(self, kind: Optional[str] = None) -> List[Zone]:
+        """All live zones, oldest first."""
+        with self._lock:
+            return [z for z in self._by_time
+                    if self._zones.get(z.key) is z and (kind is None or z.kind == kind)]
+
+    def clear(self):
+        with self._lock:
+            self._zones.clear()
+            self._lows.clear()
+            self._keys.clear()
+            self._by_time.clear()
+            self._max_width = 0.0
+            self.version += 1
+
+    def get_state(self) -> List[Tuple]:
+        """Compact tuples for warm-state snapshots."""
+        with self._lock:
+            return [(z.kind, z.direction, z.low, z.high, z.created_time,
+                     z.touches, z.fill_pct, z.last_touch_time) for z in self.active()]
+
+    def set_state(self, state: List[Tuple]):
+        """Replace the book's zones with a ``get_state()`` snapshot."""
+        with self._lock:
+            self.clear()
+            for kind, direction, low, high, created_time, touches, fill_pct, last_touch in state:
+                zone = self.add(kind, direction, low, high, created_time)
+                zone.touches = touches
+                zone.fill_pct = fill_pct
+                zone.last_touch_time = last_touch
+            self.version += 1
+
+    def _pop_oldest(self) -> Zone:
+        """Oldest live zone, taken off the deque (skipping removed ones)."""
+        while True:
+            zone = self._by_time.popleft()
+            if self._zones.get(zone.key) is zone:
+                return zone
+
+    def _widest(self) -> float:
+        return max((z.high - z.low for z in self._zones.values()), default=0.0)
+
+    def _remove(self, zone: Zone):
+        if self._zones.get(zone.key) is not zone:
+            return
+        del self._zones[zone.key]
+        self._unindex(zone)
+        self.version += 1
+        if zone.high - zone.low >= self._max_width:
+            # The widest zone left: tighten the query window
+            self._max_width = self._widest()
+
+    def _unindex(self, zone: Zone):
+        pos = bisect.bisect_left(self._lows, zone.low)
+        while pos < len(self._keys) and self._lows[pos] == zone.low:
+            if self._keys[pos] == zone.key:
+                del self._lows[pos]
+                del self._keys[pos]
+                return
+            pos += 1
+
+
+_shared_book: Optional[ZoneBook] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_zone_book(max_age_seconds: float = 48 * 3600, max_zones: int = 500) -> ZoneBook:
+    """
+    Process-wide zone book shared by the executor's strategy, the backtester
+    and the dashboard. Arguments only apply on first creation.
+    """
+    global _shared_book
+    with _shared_lock:
+        if _shared_book is None:
+            _shared_book = ZoneBook(max_age_seconds=max_age_seconds, max_zones=max_zones)
+        return _shared_book
@@ -11,8 +11,11 @@ Features:
 - Runs on port 5001 (default Gold bot uses 5000)
 - US30-specific strategies and risk management
 - NYSE trading hours (09:30-16:00 ET)
+- Trading engine and web dashboard in separate processes
+  (``engine.separate_process``), sharing state through a lock-free snapshot
 """
 
+import multiprocessing
 import os
 import sys
 from pathlib import Path
@@ -64,20 +67,34 @@ def main():
         print("\n❌ Prerequisites check failed. Please fix the issues above.")
         sys.exit(1)
     
+    engine_process = None
     try:
         # Import bot modules AFTER setting environment variables
-        from live_dashboard import app, init_live_stream
+        from live_dashboard import app, init_live_stream, init_engine_reader
+        from src.config import get_config
         
-        print("\n🔄 Initializing US30 live data stream...")
-        init_live_stream()
+        if get_config().get('engine', {}).get('separate_process', False):
+            # Trading engine in its own process; the dashboard only reads its snapshot
+            from src import engine
+            engine_process = multiprocessing.Process(
+                target=engine.main, kwargs={'poll_seconds': 30}, name='us30-engine'
+            )
+            engine_process.start()
+            print(f"🔁 Trading engine started in a separate process (pid {engine_process.pid})")
 
-        # Start executor (strategy runner) if present
-        try:
-            from src import executor
-            executor.start(poll_seconds=30)
-            print("🔁 Strategy executor started (polling every 30s)")
-        except Exception:
-            print("⚠️  Strategy executor not available or failed to start")
+            print("\n🔄 Attaching dashboard to the engine snapshot...")
+            init_engine_reader()
+        else:
+            print("\n🔄 Initializing US30 live data stream...")
+            init_live_stream()
+
+            # Start executor (strategy runner) if present
+            try:
+                from src import executor
+                executor.start(poll_seconds=30)
+                print("🔁 Strategy executor started (polling every 30s)")
+            except Exception:
+                print("⚠️  Strategy executor not available or failed to start")
         
         print("\n✅ US30 bot initialized successfully!")
         print("🌐 Starting web dashboard on http://0.0.0.0:5001")
@@ -85,12 +102,18 @@ def main():
         print("⚠️  Press CTRL+C to stop the bot\n")
         
         # Start Flask dashboard on port 5001 (different from Gold bot)
-        app.run(
-            host='0.0.0.0',
-            port=5001,
-            debug=False,
-            use_reloader=False  # Prevent double initialization
-        )
+        try:
+            app.run(
+                host='0.0.0.0',
+                port=5001,
+                debug=False,
+                use_reloader=False  # Prevent double initialization
+            )
+        finally:
+            if engine_process is not None and engine_process.is_alive():
+                print("🛑 Stopping trading engine...")
+                engine_process.terminate()
+                engine_process.join(timeout=10)
         
     except ImportError as e:
         print(f"\n❌ Error importing bot modules: {e}")
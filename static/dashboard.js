@@ -8,8 +8,32 @@ const dashboardState = {
     priceHistory: [],
     updateInterval: 2000, // 2 seconds
     refreshTimer: null,
+    chart: {
+        timeframe: 'M5',
+        spanBars: 300,      // visible range in bars of the selected timeframe
+        data: null,
+        timer: null,
+        refreshInterval: 10000,
+    },
+    signals: {
+        refreshInterval: 30000,
+    },
+    shadow: {
+        refreshInterval: 10000,
+    },
+    trades: {
+        cursor: null,
+        group: 'session',
+        refreshInterval: 60000,
+    },
+    execution: {
+        group: 'sessions',
+        refreshInterval: 30000,
+    },
 };
 
+const TIMEFRAME_SECONDS = { M1: 60, M5: 300, M15: 900, H1: 3600, H4: 14400, D1: 86400 };
+
 /**
  * Initialize dashboard
  */
@@ -26,6 +50,22 @@ document.addEventListener('DOMContentLoaded', function() {
     updateTimestamp();
     setInterval(updateTimestamp, 1000);
     
+    // Candle chart (server-side downsampled)
+    initCandleChart();
+
+    // Strategy evaluation history
+    initSignals();
+
+    // Paper-traded shadow variants
+    loadShadow();
+    setInterval(loadShadow, dashboardState.shadow.refreshInterval);
+
+    // Closed-trade history and analytics
+    initTradeHistory();
+
+    // Signal-to-fill latency and slippage
+    initExecutionQuality();
+
     console.log('Dashboard initialized');
 });
 
@@ -221,6 +261,13 @@ function updateStatistics(data) {
     setElementText('totalPL', formatCurrency(pl), ['stat-value', plClass]);
     setElementText('openOrders', data.open_tickets.length || 0, ['stat-value']);
     setElementText('botStatusText', capitalizeFirst(data.bot_status || 'unknown'), ['stat-value']);
+
+    const regime = data.regime;
+    if (regime) {
+        const label = regime.warm ? regime.regime : `${regime.regime} (warming up)`;
+        setElementText('marketRegime', regime.spread_wide ? `${label} · wide spread` : label,
+            ['stat-value', regime.spread_wide ? 'negative' : '']);
+    }
 }
 
 /**
@@ -292,6 +339,434 @@ function updatePriceChart() {
     ctx.stroke();
 }
 
+/* ==================== CANDLE CHART ==================== */
+
+/**
+ * Set up candle chart controls and periodic refresh
+ */
+function initCandleChart() {
+    const canvas = document.getElementById('candleChart');
+    if (!canvas) return;
+
+    const select = document.getElementById('chartTimeframe');
+    if (select) {
+        select.addEventListener('change', function() {
+            dashboardState.chart.timeframe = select.value;
+            loadCandles();
+        });
+    }
+
+    // Mouse wheel zooms the visible range (the server re-buckets to fit)
+    canvas.addEventListener('wheel', function(event) {
+        event.preventDefault();
+        const factor = event.deltaY > 0 ? 1.5 : 1 / 1.5;
+        const span = Math.round(dashboardState.chart.spanBars * factor);
+        dashboardState.chart.spanBars = Math.min(Math.max(span, 30), 200000);
+        loadCandles();
+    }, { passive: false });
+
+    window.addEventListener('resize', function() {
+        drawCandleChart();
+    });
+
+    loadCandles();
+    dashboardState.chart.timer = setInterval(loadCandles, dashboardState.chart.refreshInterval);
+}
+
+/**
+ * Fetch candles sized to the canvas pixel width
+ */
+async function loadCandles() {
+    const canvas = document.getElementById('candleChart');
+    if (!canvas) return;
+
+    const chart = dashboardState.chart;
+    const tfSeconds = TIMEFRAME_SECONDS[chart.timeframe];
+    const end = Math.floor(Date.now() / 1000);
+    const start = end - chart.spanBars * tfSeconds;
+    // Roughly 3px per candle keeps bodies readable
+    const width = Math.max(Math.floor(canvas.clientWidth / 3), 10);
+
+    try {
+        const url = `/api/candles?timeframe=${chart.timeframe}&start=${start}&end=${end}&width=${width}`;
+        const response = await fetch(url);
+        if (!response.ok) return;
+        chart.data = await response.json();
+        setElementText('chartBucket', `${chart.data.bucket_bars} bar/candle`, ['symbol-label']);
+        drawCandleChart();
+    } catch (error) {
+        console.error('Error loading candles:', error);
+    }
+}
+
+/**
+ * Draw candles, zones, trade markers and SL/TP levels
+ */
+function drawCandleChart() {
+    const canvas = document.getElementById('candleChart');
+    const data = dashboardState.chart.data;
+    if (!canvas || !data) return;
+
+    canvas.width = canvas.clientWidth;
+    const ctx = canvas.getContext('2d');
+    const width = canvas.width;
+    const height = canvas.height;
+    const padding = 10;
+
+    ctx.clearRect(0, 0, width, height);
+
+    const c = data.candles;
+    if (!c.time.length) {
+        ctx.fillStyle = '#cbd5e1';
+        ctx.fillText('No candle data', padding, height / 2);
+        return;
+    }
+
+    const prices = c.high.concat(c.low, data.levels.map(l => l.price));
+    const min = Math.min(...prices);
+    const max = Math.max(...prices);
+    const range = max - min || 1;
+    const t0 = data.start;
+    const t1 = data.end;
+
+    const xOf = t => padding + ((t - t0) / (t1 - t0 || 1)) * (width - 2 * padding);
+    const yOf = p => height - padding - ((p - min) / range) * (height - 2 * padding);
+    const candleWidth = Math.max(1, (width - 2 * padding) / c.time.length * 0.7);
+
+    // OB/FVG zones
+    data.zones.forEach(zone => {
+        const x = Math.max(xOf(zone.created_time), padding);
+        ctx.fillStyle = zone.direction === 'bullish' ? 'rgba(52, 211, 153, 0.12)' : 'rgba(255, 107, 107, 0.12)';
+        ctx.fillRect(x, yOf(zone.high), width - padding - x, yOf(zone.low) - yOf(zone.high));
+    });
+
+    // Candles
+    for (let i = 0; i < c.time.length; i++) {
+        const x = xOf(c.time[i]);
+        const up = c.close[i] >= c.open[i];
+        ctx.strokeStyle = ctx.fillStyle = up ? '#34d399' : '#ff6b6b';
+        ctx.beginPath();
+        ctx.moveTo(x, yOf(c.high[i]));
+        ctx.lineTo(x, yOf(c.low[i]));
+        ctx.stroke();
+        const top = yOf(Math.max(c.open[i], c.close[i]));
+        const bottom = yOf(Math.min(c.open[i], c.close[i]));
+        ctx.fillRect(x - candleWidth / 2, top, candleWidth, Math.max(1, bottom - top));
+    }
+
+    // Entry / SL / TP levels of open positions
+    ctx.setLineDash([6, 4]);
+    data.levels.forEach(level => {
+        const colors = { entry_price: '#0ea5e9', sl: '#ef4444', tp: '#10b981' };
+        ctx.strokeStyle = colors[level.kind] || '#cbd5e1';
+        ctx.beginPath();
+        ctx.moveTo(padding, yOf(level.price));
+        ctx.lineTo(width - padding, yOf(level.price));
+        ctx.stroke();
+    });
+    ctx.setLineDash([]);
+
+    // Trade / signal markers
+    data.markers.forEach(marker => {
+        const x = xOf(marker.time);
+        const y = yOf(marker.price);
+        const buy = marker.side === 'BUY';
+        ctx.fillStyle = marker.kind === 'signal' ? '#f59e0b' : (buy ? '#10b981' : '#ef4444');
+        ctx.beginPath();
+        ctx.moveTo(x, y + (buy ? 10 : -10));
+        ctx.lineTo(x - 5, y + (buy ? 18 : -18));
+        ctx.lineTo(x + 5, y + (buy ? 18 : -18));
+        ctx.closePath();
+        ctx.fill();
+    });
+}
+
+/* ==================== SIGNAL HISTORY ==================== */
+
+function initSignals() {
+    ['#signalType', '#signalMinStrength'].forEach(selector => {
+        addEventListenerSafe(selector, 'change', loadSignals);
+    });
+    loadSignals();
+    setInterval(loadSignals, dashboardState.signals.refreshInterval);
+}
+
+/**
+ * Recent strategy evaluations with their confluence details
+ */
+async function loadSignals() {
+    const tbody = document.getElementById('signalsTableBody');
+    if (!tbody) return;
+
+    const params = new URLSearchParams({ limit: '25' });
+    const type = document.getElementById('signalType');
+    const minStrength = document.getElementById('signalMinStrength');
+    if (type && type.value) params.set('type', type.value);
+    if (minStrength && minStrength.value) params.set('min_strength', minStrength.value);
+
+    try {
+        const response = await fetch(`/api/signals?${params}`);
+        if (!response.ok) return;
+        const data = await response.json();
+        if (data.signals.length === 0) {
+            tbody.innerHTML = '<tr class="empty-row"><td colspan="9" class="empty-state">No signals</td></tr>';
+            return;
+        }
+
+        const price = value => value === null ? '--' : formatPrice(value);
+        tbody.innerHTML = data.signals.map(sig => {
+            const d = sig.details;
+            const confluence = sig.signal === 'NONE'
+                ? (d.reason || '--')
+                : ['bos', 'mss', 'ob', 'fvg', 'liquidity_sweep']
+                    .filter(key => d[key])
+                    .map(key => key === 'liquidity_sweep' ? 'SWEEP' : key.toUpperCase())
+                    .join(' · ');
+            const typeClass = sig.signal === 'BUY' ? 'buy' : (sig.signal === 'SELL' ? 'sell' : '');
+            return `
+                <tr class="position-row ${typeClass}">
+                    <td>${formatDateTime(sig.time * 1000)}</td>
+                    <td><strong>${sig.signal}</strong></td>
+                    <td>${sig.strength}${d.mtf_score === null ? '' : ' (MTF)'}</td>
+                    <td>${price(sig.entry_price)}</td>
+                    <td>${price(sig.stop_loss)}</td>
+                    <td>${price(sig.take_profit)}</td>
+                    <td>${confluence}</td>
+                    <td>${d.ema_bias || '--'}</td>
+                    <td>${sig.evaluations}</td>
+                </tr>
+            `;
+        }).join('');
+    } catch (error) {
+        console.error('Error loading signals:', error);
+    }
+}
+
+/* ==================== SHADOW VARIANTS ==================== */
+
+/**
+ * Side-by-side metrics of the paper-traded strategy variants
+ */
+async function loadShadow() {
+    const card = document.getElementById('shadowCard');
+    const tbody = document.getElementById('shadowTableBody');
+    if (!card || !tbody) return;
+
+    try {
+        const response = await fetch('/api/shadow');
+        if (!response.ok) return;
+        const shadow = await response.json();
+        card.hidden = !shadow.enabled;
+        if (!shadow.enabled) return;
+
+        setElementText('shadowEval', `${shadow.variants.length} variants · ${shadow.eval_ms} ms/bar`, ['symbol-label']);
+        tbody.innerHTML = shadow.variants.map(v => {
+            const overrides = Object.entries(v.params).map(([k, val]) => `${k}=${JSON.stringify(val)}`).join(', ') || 'live';
+            const rClass = v.total_r >= 0 ? 'text-success' : 'text-danger';
+            const position = v.position
+                ? `${v.position.side} @ ${formatPrice(v.position.entry_price)}`
+                : '--';
+            return `
+                <tr>
+                    <td><strong>${v.name}</strong></td>
+                    <td>${overrides}</td>
+                    <td>${v.trades}</td>
+                    <td>${v.win_rate.toFixed(1)}</td>
+                    <td class="${rClass}">${v.expectancy_r.toFixed(2)}</td>
+                    <td class="${rClass}"><strong>${v.total_r.toFixed(2)}</strong></td>
+                    <td>${v.max_drawdown_r.toFixed(2)}</td>
+                    <td>${v.profit_factor === null ? '--' : v.profit_factor.toFixed(2)}</td>
+                    <td>${position}</td>
+                </tr>
+            `;
+        }).join('');
+    } catch (error) {
+        console.error('Error loading shadow variants:', error);
+    }
+}
+
+/* ==================== TRADE HISTORY ==================== */
+
+function initTradeHistory() {
+    const select = document.getElementById('tradeSummaryGroup');
+    if (select) {
+        select.addEventListener('change', function() {
+            dashboardState.trades.group = select.value;
+            loadTradeSummary();
+        });
+    }
+    addEventListenerSafe('#tradesLoadMore', 'click', function() {
+        loadTrades(false);
+    });
+
+    const refresh = function() {
+        loadTrades(true);
+        loadTradeSummary();
+    };
+    refresh();
+    setInterval(refresh, dashboardState.trades.refreshInterval);
+}
+
+/**
+ * Fetch a page of closed trades (keyset cursor from the previous page)
+ */
+async function loadTrades(reset) {
+    const tbody = document.getElementById('tradesTableBody');
+    if (!tbody) return;
+
+    const state = dashboardState.trades;
+    let url = '/api/trades?limit=25';
+    if (!reset && state.cursor) {
+        url += `&cursor=${encodeURIComponent(state.cursor)}`;
+    }
+
+    try {
+        const response = await fetch(url);
+        if (!response.ok) return;
+        const page = await response.json();
+        state.cursor = page.next_cursor;
+
+        const rows = page.trades.map(trade => {
+            const typeClass = trade.side === 'BUY' ? 'buy' : 'sell';
+            const net = trade.profit + trade.commission + trade.swap;
+            const plClass = net >= 0 ? 'text-success' : 'text-danger';
+            const r = trade.r_multiple === null ? '--' : trade.r_multiple.toFixed(2);
+            return `
+                <tr class="position-row ${typeClass}">
+                    <td>${formatDateTime(trade.close_time * 1000)}</td>
+                    <td>${trade.strategy}</td>
+                    <td><strong>${trade.side}</strong></td>
+                    <td>${trade.volume}</td>
+                    <td>${formatPrice(trade.open_price)}</td>
+                    <td>${formatPrice(trade.close_price)}</td>
+                    <td class="${plClass}"><strong>${formatCurrency(net)}</strong></td>
+                    <td class="${plClass}">${r}</td>
+                    <td>${trade.session}</td>
+                </tr>
+            `;
+        }).join('');
+
+        if (reset) {
+            tbody.innerHTML = rows || '<tr class="empty-row"><td colspan="9" class="empty-state">No closed trades</td></tr>';
+        } else {
+            tbody.insertAdjacentHTML('beforeend', rows);
+        }
+        const more = document.getElementById('tradesLoadMore');
+        if (more) more.hidden = !state.cursor;
+    } catch (error) {
+        console.error('Error loading trades:', error);
+    }
+}
+
+/**
+ * Fetch server-side aggregates for the selected grouping
+ */
+async function loadTradeSummary() {
+    const container = document.getElementById('tradeSummary');
+    if (!container) return;
+
+    try {
+        const response = await fetch(`/api/trades/summary?group=${dashboardState.trades.group}`);
+        if (!response.ok) return;
+        const summary = await response.json();
+        if (summary.total.trades === 0) {
+            container.innerHTML = '<span class="empty-state">No closed trades yet</span>';
+            return;
+        }
+
+        const groups = summary.group === 'day' ? summary.groups.slice(-14) : summary.groups;
+        container.innerHTML = [{ key: 'All', ...summary.total }].concat(groups).map(g => {
+            const plClass = g.profit >= 0 ? 'text-success' : 'text-danger';
+            const label = summary.group === 'hour' && g.key !== 'All' ? `${g.key}:00` : g.key;
+            return `
+                <div class="summary-cell">
+                    <span class="summary-label">${label}</span>
+                    <span class="${plClass}"><strong>${formatCurrency(g.profit)}</strong></span>
+                    <span class="summary-label">${g.trades} trades · ${g.win_rate}% win</span>
+                </div>
+            `;
+        }).join('');
+    } catch (error) {
+        console.error('Error loading trade summary:', error);
+    }
+}
+
+/* ==================== EXECUTION QUALITY ==================== */
+
+function initExecutionQuality() {
+    const select = document.getElementById('executionGroup');
+    if (select) {
+        select.addEventListener('change', function() {
+            dashboardState.execution.group = select.value;
+            loadExecutionQuality();
+        });
+    }
+    loadExecutionQuality();
+    setInterval(loadExecutionQuality, dashboardState.execution.refreshInterval);
+}
+
+function formatMs(value) {
+    if (value === null || value === undefined) return '--';
+    return value >= 10000 ? `${(value / 1000).toFixed(1)} s` : `${Math.round(value)} ms`;
+}
+
+/**
+ * Rolling latency/slippage distributions plus the most recent orders
+ */
+async function loadExecutionQuality() {
+    const container = document.getElementById('executionSummary');
+    const tbody = document.getElementById('executionTableBody');
+    if (!container || !tbody) return;
+
+    try {
+        const response = await fetch('/api/execution?recent=20');
+        if (!response.ok) return;
+        const quality = await response.json();
+        if (quality.orders === 0) {
+            container.innerHTML = '<span class="empty-state">No orders sent yet</span>';
+            return;
+        }
+
+        const group = dashboardState.execution.group;
+        const groups = [{ key: 'All', ...quality.overall }].concat(quality[group]);
+        container.innerHTML = groups.map(g => {
+            const label = group === 'hours' && g.key !== 'All' ? `${g.key}:00` : g.key;
+            const total = g.total_ms;
+            const slip = g.slippage_points;
+            const beyond = g.beyond_slippage_points === null ? '--' : `${g.beyond_slippage_points}%`;
+            return `
+                <div class="summary-cell">
+                    <span class="summary-label">${label} · ${g.orders} orders</span>
+                    <span><strong>${total ? formatMs(total.p50) : '--'}</strong> p50 · ${total ? formatMs(total.p90) : '--'} p90</span>
+                    <span class="summary-label">slippage p50 ${slip ? slip.p50 : '--'} / p90 ${slip ? slip.p90 : '--'} pts · ${beyond} > ${quality.tolerances.slippage_points}</span>
+                </div>
+            `;
+        }).join('');
+
+        tbody.innerHTML = quality.recent.map(r => {
+            const ms = (from, to) => (r[from] === null || r[to] === null) ? null : (r[to] - r[from]) * 1000;
+            const slipClass = r.slippage_points > 0 ? 'text-danger' : 'text-success';
+            const statusClass = r.status === 'filled' ? 'text-success' : 'text-danger';
+            const typeClass = r.side === 'BUY' ? 'buy' : 'sell';
+            return `
+                <tr class="position-row ${typeClass}" title="${r.error || ''}">
+                    <td>${formatDateTime(r.decided_at * 1000)}</td>
+                    <td><strong>${r.side}</strong></td>
+                    <td class="${statusClass}">${r.status}</td>
+                    <td>${r.requested_price === null ? '--' : formatPrice(r.requested_price)}</td>
+                    <td>${r.fill_price === null ? '--' : formatPrice(r.fill_price)}</td>
+                    <td class="${slipClass}">${r.slippage_points === null ? '--' : r.slippage_points}</td>
+                    <td>${formatMs(ms('observed_at', 'decided_at'))}</td>
+                    <td>${formatMs(ms('decided_at', 'sent_at'))}</td>
+                    <td>${formatMs(ms('sent_at', 'acked_at'))}</td>
+                </tr>
+            `;
+        }).join('');
+    } catch (error) {
+        console.error('Error loading execution quality:', error);
+    }
+}
+
 /**
  * Update timestamp
  */
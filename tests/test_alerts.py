@@ -0,0 +1,214 @@
+"""AlertDispatcher delivery against stub channels and local HTTP/SMTP servers."""
+
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from src.alerts import AlertDispatcher, EmailChannel, TelegramChannel
+from src.config import BotConfig
+
+
+class StubChannel:
+    def __init__(self, name='stub', fail=0, delay=0.0, max_length=None):
+        self.name = name
+        self.fail = fail
+        self.delay = delay
+        if max_length is not None:
+            self.max_length = max_length
+        self.sent = []
+        self.attempts = 0
+
+    def send(self, subject, body):
+        self.attempts += 1
+        time.sleep(self.delay)
+        if self.attempts <= self.fail:
+            raise RuntimeError('provider down')
+        self.sent.append((subject, body))
+
+
+def _wait(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _dispatcher(channels, **kwargs):
+    options = dict(coalesce_seconds=0.05, rate_limit_per_minute=6000, burst=100, backoff_seconds=0.01)
+    options.update(kwargs)
+    return AlertDispatcher(channels, prefix='TEST', **options)
+
+
+def test_burst_is_coalesced_into_one_digest():
+    channel = StubChannel()
+    dispatcher = _dispatcher([channel], coalesce_seconds=0.2)
+    dispatcher.notify('signal', 'BUY US30m')
+    dispatcher.notify('fill', 'BUY filled')
+    dispatcher.notify('fill', 'SELL filled')
+
+    assert _wait(lambda: channel.sent)
+    dispatcher.stop()
+    assert len(channel.sent) == 1
+    subject, body = channel.sent[0]
+    assert subject == 'TEST: 3 alerts (1 signal, 2 fill)'
+    assert 'BUY filled' in body and 'SELL filled' in body
+    assert dispatcher.stats['sent'] == 3
+
+
+def test_kinds_filter():
+    channel = StubChannel()
+    dispatcher = _dispatcher([channel], kinds=['error'])
+    dispatcher.notify('signal', 'ignored')
+    dispatcher.notify('error', 'loop error')
+    dispatcher.stop()
+    assert [s for s, _ in channel.sent] == ['TEST: loop error']
+
+
+def test_oversized_digest_is_split_to_channel_limit():
+    channel = StubChannel(max_length=1000)
+    dispatcher = _dispatcher([channel], coalesce_seconds=0.2)
+    for i in range(50):
+        dispatcher.notify('error', f'error {i}', 'x' * 100)
+    dispatcher.notify('risk', 'huge', 'y' * 5000)
+
+    assert _wait(lambda: dispatcher.stats['sent'] == 51)
+    dispatcher.stop()
+    assert len(channel.sent) > 1
+    for subject, body in channel.sent:
+        assert len(subject) + 2 + len(body) <= 1000
+    assert 'to follow' in channel.sent[0][0]
+    # Every event delivered once, in order
+    titles = [line for _, body in channel.sent for line in body.split('\n') if ': error ' in line]
+    assert [t.split(': ')[1] for t in titles] == [f'error {i}' for i in range(50)]
+
+
+def test_failed_send_is_retried_then_dropped():
+    flaky = StubChannel(fail=2)
+    dead = StubChannel(name='dead', fail=100)
+    dispatcher = _dispatcher([flaky, dead], max_retries=3)
+    dispatcher.notify('error', 'boom')
+
+    assert _wait(lambda: dispatcher.stats['failed'] == 1 and dispatcher.stats['sent'] == 1)
+    dispatcher.stop()
+    assert flaky.attempts == 3 and len(flaky.sent) == 1
+    assert dead.attempts == 3 and dead.sent == []
+
+
+def test_slow_channel_does_not_delay_others():
+    slow = StubChannel(name='slow', delay=1.0)
+    fast = StubChannel(name='fast')
+    dispatcher = _dispatcher([slow, fast])
+    started = time.monotonic()
+    dispatcher.notify('fill', 'filled')
+
+    assert _wait(lambda: fast.sent, timeout=0.8)
+    assert time.monotonic() - started < 0.8
+    dispatcher.stop()
+
+
+def test_telegram_channel_against_local_http_stub():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers['Content-Length'])
+            received.append((self.path, json.loads(self.rfile.read(length))))
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b'{"ok": true}')
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        channel = TelegramChannel('TOKEN', 42, api_url=f'http://127.0.0.1:{server.server_port}')
+        dispatcher = _dispatcher([channel])
+        dispatcher.notify('fill', 'BUY filled', 'Price 1')
+        assert _wait(lambda: received)
+        dispatcher.stop()
+    finally:
+        server.shutdown()
+
+    path, payload = received[0]
+    assert path == '/botTOKEN/sendMessage'
+    assert payload['chat_id'] == 42
+    assert payload['text'].startswith('TEST: BUY filled\n\n')
+
+
+class _SMTPStub(socketserver.StreamRequestHandler):
+    """Minimal SMTP server: accepts one message per DATA command."""
+
+    messages = []
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 stub')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(' ')[0].upper()
+            if command == 'EHLO':
+                self.reply('250 stub')
+            elif command == 'DATA':
+                self.reply('354 go ahead')
+                lines = []
+                while True:
+                    data = self.rfile.readline().decode()
+                    if data.rstrip('\r\n') == '.':
+                        break
+                    lines.append(data)
+                self.messages.append(''.join(lines))
+                self.reply('250 queued')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+def test_email_channel_against_local_smtp_stub():
+    _SMTPStub.messages = []
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPStub)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        channel = EmailChannel('127.0.0.1', server.server_address[1], 'bot@example.com', 'me@example.com',
+                               use_tls=False, timeout=5)
+        dispatcher = _dispatcher([channel])
+        dispatcher.notify('risk', 'Daily loss limit hit', 'Trading paused')
+        assert _wait(lambda: _SMTPStub.messages)
+        dispatcher.stop()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    message = _SMTPStub.messages[0]
+    assert 'Subject: TEST: Daily loss limit hit' in message
+    assert 'Trading paused' in message
+
+
+def test_from_config_reads_typed_monitoring_section():
+    config = BotConfig.parse({
+        'execution': {'comment': 'BOT'},
+        'monitoring': {
+            'telegram': {'enabled': True, 'bot_token': 'x', 'chat_id': 1},
+            'email': {'enabled': True, 'smtp_server': 'localhost'},
+            'alerts': {'events': ['fill'], 'burst': 2},
+        },
+    })
+    dispatcher = AlertDispatcher.from_config(config)
+    try:
+        # Email is missing its addresses, so only Telegram is configured
+        assert [type(c.channel) for c in dispatcher._channels] == [TelegramChannel]
+        assert dispatcher.prefix == 'BOT' and dispatcher.kinds == {'fill'}
+    finally:
+        dispatcher.stop()
@@ -0,0 +1,74 @@
+"""Bar-replay backtester and walk-forward fold boundaries."""
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import run_backtest, summarize, warmup_bars
+from src.robustness import walk_forward
+
+# 2024-01-02 00:00 UTC
+START = 1_704_153_600
+CONFIG = {'min_candles': 100, 'ema_period': 50, 'rr_ratio': 3}
+
+
+def _candles(n=6000, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 40_000 + np.cumsum(rng.normal(0, 15, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'time': START + np.arange(n) * 300,
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.uniform(0, 8, n),
+        'low': np.minimum(open_, close) - rng.uniform(0, 8, n),
+        'close': close,
+    })
+
+
+def test_warmup_covers_entry_window_and_bias_ema():
+    # 51 H1 bars of M5 history for a 50-period EMA
+    assert warmup_bars(CONFIG) == 51 * 12
+    assert warmup_bars({**CONFIG, 'min_candles': 1000}) == 1000
+    assert warmup_bars({**CONFIG, 'confluence_timeframes': {'M5': 1, 'H4': 2}}) == 101 * 48
+
+
+def test_replay_is_deterministic():
+    data = _candles()
+    first = run_backtest(data, CONFIG)
+    assert first and run_backtest(data, CONFIG) == first
+    assert summarize(first)['trades'] == len(first)
+
+
+def test_warmed_up_replay_matches_continuous_run():
+    data = _candles()
+    full = run_backtest(data, CONFIG)
+    warmup = warmup_bars(CONFIG)
+
+    for split in (2000, 3000, 4500):
+        part = run_backtest(data.iloc[split - warmup:].reset_index(drop=True), CONFIG, start_index=warmup)
+        assert part[0]['entry_time'] >= data['time'].iloc[split]
+        # A position open across the split delays the continuous run; once
+        # both are flat on the same bar they trade identically
+        entries = [t['entry_time'] for t in full]
+        common = next(i for i, t in enumerate(part) if t['entry_time'] in entries)
+        assert part[common:] == full[entries.index(part[common]['entry_time']):]
+
+
+def test_walk_forward_trades_stay_inside_their_fold():
+    data = _candles()
+    result = walk_forward(data, CONFIG, {'rr_ratio': [2, 3]}, in_sample_bars=2000,
+                          out_sample_bars=1000, workers=1)
+
+    windows = result['windows']
+    assert [w['out_sample_start'] for w in windows] == [int(data['time'].iloc[s]) for s in (2000, 3000, 4000, 5000)]
+    assert [w['in_sample_start'] for w in windows] == [int(data['time'].iloc[s]) for s in (0, 1000, 2000, 3000)]
+    assert windows[-1]['out_sample_end'] == int(data['time'].iloc[-1])
+
+    trades = result['trades']
+    assert len(trades) == sum(w['out_sample']['trades'] for w in windows)
+    bounds = iter(windows)
+    window = next(bounds)
+    for trade in trades:
+        while trade['entry_time'] >= window['out_sample_start'] + 1000 * 300:
+            window = next(bounds)
+        assert window['out_sample_start'] <= trade['entry_time'] <= window['out_sample_end']
+        assert trade['exit_time'] <= window['out_sample_end']
@@ -0,0 +1,89 @@
+"""Config validation and hot-reload."""
+
+import json
+import os
+import time
+
+import pytest
+
+from src.config import BotConfig, ConfigError, ConfigManager
+
+
+def _write(path, raw, mtime):
+    path.write_text(raw if isinstance(raw, str) else json.dumps(raw))
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.parametrize('raw', [
+    {'strategies': 5},
+    {'strategies': {'smc': 5}},
+    {'data': {'state': 5}},
+    {'strategies': {'smc': {'confluence_timeframes': ['M5', 'H1']}}},
+    {'regime': {'low_below': 1.5, 'high_above': 1.3}},
+    {'monitoring': {'alerts': {'events': 'signal'}}},
+    {'data': {'tick_recorder': {'max_queue': 0}}},
+    {'risk': {'max_concurrent_trades': -1}},
+    {'execution': {'campaign_max_trades': 5}},
+    {'execution': {'magic_number': -1}},
+])
+def test_parse_rejects_bad_structure_with_config_error(raw):
+    with pytest.raises(ConfigError):
+        BotConfig.parse(raw)
+
+
+def test_reload_keeps_current_version_on_bad_edits(tmp_path):
+    path = tmp_path / 'config.json'
+    start = time.time() - 100
+    _write(path, {'broker': {'symbol': 'US30m'}}, start)
+    manager = ConfigManager(str(path))
+    seen = []
+    manager.subscribe(lambda old, new: seen.append(new.version))
+
+    for i, raw in enumerate(['{not json', {'strategies': 5}, {'risk': {'max_concurrent_trades': -1}}]):
+        _write(path, raw, start + i + 1)
+        assert not manager.reload()
+        assert manager.current.version == 1
+    assert seen == []
+
+    _write(path, {'broker': {'symbol': 'US30'}}, start + 10)
+    assert manager.reload()
+    assert manager.current.version == 2
+    assert manager.current.broker.symbol == 'US30'
+    assert seen == [2]
+
+
+def test_watcher_survives_a_bad_edit(tmp_path):
+    path = tmp_path / 'config.json'
+    start = time.time() - 100
+    _write(path, {}, start)
+    manager = ConfigManager(str(path))
+    manager.start_watching(interval=0.01)
+    try:
+        _write(path, {'strategies': 5}, start + 1)
+        time.sleep(0.1)
+        assert manager._watcher.is_alive()
+        assert manager.current.version == 1
+
+        _write(path, {'execution': {'magic_number': 7}}, start + 2)
+        deadline = time.time() + 2
+        while manager.current.version == 1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert manager.current.execution.magic_number == 7
+    finally:
+        manager.stop()
+
+
+def test_typed_sections_have_defaults():
+    config = BotConfig.parse({'data': {'state': {'enabled': True}}})
+    assert config.risk.max_concurrent_trades == 5
+    assert config.execution.quality_window == 1000
+    assert config.data.state_enabled
+    assert config.data.candles_directory == 'data/candles'
+    assert not config.data.ticks_enabled and config.data.ticks_max_queue == 1_000_000
+    assert config.regime.atr_period == 14 and config.regime.typical_spread is None
+    assert config.monitoring.alert_events is None and not config.monitoring.telegram_enabled
+
+
+def test_null_confluence_timeframes_means_none():
+    config = BotConfig.parse({'strategies': {'smc': {'confluence_timeframes': None}}})
+    assert config.strategies.smc['confluence_timeframes'] is None
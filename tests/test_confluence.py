@@ -0,0 +1,73 @@
+"""Multi-timeframe confluence engine and the shared SMC detectors."""
+
+import numpy as np
+
+from src.confluence import ConfluenceEngine
+from src.strategies import SMCStrategy
+from src.strategies.bars import Bars
+
+# 2024-01-02 00:00 UTC (a multiple of every timeframe)
+START = 1_704_153_600
+
+
+def _m5(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 40_000 + np.cumsum(rng.normal(0, 10, n))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.uniform(0, 5, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 5, n)
+    time = START + np.arange(n) * 300
+    return time, open_, high, low, close
+
+
+def test_stack_aggregates_aligned_buckets():
+    engine = ConfluenceEngine({'M5': 1, 'M15': 1}, base_tf='M5', lookback=4)
+    time, open_, high, low, close = _m5(40)
+    stacked = engine.stack(time, open_, high, low, close)
+
+    m15 = 1  # row of M15
+    # 40 M5 bars = 13 full M15 buckets + one partial (the last M5 bar)
+    assert stacked['bars'][m15] == 14
+    first = 40 - 1 - 9   # first M5 bar of the fourth-to-last M15 bucket
+    assert stacked['open'][m15, 0] == open_[first]
+    assert stacked['high'][m15, 0] == high[first:first + 3].max()
+    assert stacked['low'][m15, 0] == low[first:first + 3].min()
+    assert stacked['close'][m15, 0] == close[first + 2]
+    assert stacked['close'][m15, -1] == close[-1]
+    # The base timeframe is its own last four bars
+    assert np.array_equal(stacked['close'][0], close[-4:])
+
+
+def test_stack_pads_short_history_with_nan():
+    engine = ConfluenceEngine({'H1': 1}, base_tf='M5')
+    stacked = engine.stack(*_m5(30))
+    assert stacked['bars'][0] == 3
+    assert np.isnan(stacked['close'][0, 0]) and not np.isnan(stacked['close'][0, 1:]).any()
+
+
+def test_detect_matches_the_strategy_detectors():
+    strategy = SMCStrategy({'min_candles': 10})
+    engine = ConfluenceEngine({'M5': 1}, base_tf='M5')
+    for seed in range(200):
+        time, open_, high, low, close = _m5(4, seed)
+        bars = Bars(time, open_, high, low, close)
+        stacked = {'open': open_[None], 'high': high[None], 'low': low[None], 'close': close[None]}
+        flags = engine.detect(stacked)['flags'][:, 0]
+        expected = [strategy._check_bos(bars), strategy._check_mss(bars), strategy._check_ob(bars),
+                    strategy._check_fvg(bars), strategy._check_liquidity_sweep(bars)]
+        assert flags.tolist() == [e is not None for e in expected]
+
+
+def test_evaluate_gates_timeframes_on_min_bars():
+    time, open_, high, low, close = _m5(200)
+    engine = ConfluenceEngine({'M5': 1, 'H1': 2}, base_tf='M5', min_bars=50)
+    assert engine.required_base_bars == 51 * 12
+
+    result = engine.evaluate(time, open_, high, low, close, 'BULLISH')
+    assert result['timeframes']['M5']['available']
+    # 200 M5 bars hold only 17 H1 bars
+    assert not result['timeframes']['H1']['available']
+    m5 = result['timeframes']['M5']
+    assert result['score'] == round(m5['score'])
+
+    assert 0 <= engine.evaluate(*_m5(1000), 'BEARISH')['score'] <= 100
@@ -0,0 +1,26 @@
+"""Engine -> dashboard payload through the shared snapshot."""
+
+import pickle
+
+from src.engine import build_payload
+from src.shared_snapshot import SnapshotReader, SnapshotWriter
+from src.zones import get_shared_zone_book
+
+
+def test_zone_pickle_is_reused_until_the_book_changes(tmp_path):
+    book = get_shared_zone_book()
+    try:
+        first = build_payload({'n': 1})
+        assert build_payload({'n': 2})['zones'] is first['zones']
+
+        book.add('OB', 'bullish', 100, 110, created_time=123)
+        second = build_payload({'n': 3})
+        assert second['zones_version'] != first['zones_version']
+        assert [z['created_time'] for z in pickle.loads(second['zones'])][-1] == 123
+
+        writer = SnapshotWriter(tmp_path / 'engine.snapshot', capacity=64 * 1024)
+        seq = writer.publish(second)
+        assert SnapshotReader(tmp_path / 'engine.snapshot').read() == (seq, second)
+        writer.close()
+    finally:
+        book.clear()
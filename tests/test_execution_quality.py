@@ -0,0 +1,78 @@
+"""Execution quality records: latency fields, slippage and schema migration."""
+
+import sqlite3
+from types import SimpleNamespace
+
+from src.execution_quality import ExecutionQuality
+
+# 2024-01-02 15:00 UTC (New York session)
+START = 1_704_207_600.0
+
+
+def _entry(observed_at=START, side='BUY'):
+    return {'symbol': 'US30m', 'strategy': 'smc', 'side': side, 'volume': 0.01, 'signal_price': 100.0,
+            'observed_at': observed_at, 'decided_at': observed_at + 0.05, 'server_offset': 7200.0}
+
+
+def _outcome(sent_at, acked_at, price=100.2, ok=True):
+    result = SimpleNamespace(retcode=10009, order=11, deal=22, price=price, volume=0.01)
+    return {'ok': ok, 'result': result, 'error': None, 'attempts': 1, 'sent_at': sent_at, 'acked_at': acked_at,
+            'requested_price': 100.0, 'point': 0.1}
+
+
+def test_latency_fields_follow_the_entry_timeline(tmp_path):
+    quality = ExecutionQuality(tmp_path / 'trades.sqlite')
+    mt5 = SimpleNamespace(history_deals_get=lambda ticket: [SimpleNamespace(time_msc=int((START + 7200.5) * 1000))])
+    record = quality.record(_entry(), _outcome(START + 0.06, START + 0.16), mt5=mt5)
+
+    assert record['status'] == 'filled'
+    assert record['observed_at'] == START and record['decided_at'] == START + 0.05
+    assert (record['sent_at'], record['acked_at']) == (START + 0.06, START + 0.16)
+    # Deal time is shifted from broker server time to UTC
+    assert record['fill_time'] == START + 0.5
+    # Paid 2 points above the requested price on a buy
+    assert record['slippage_points'] == 2.0
+
+    overall = quality.summary()['overall']
+    assert round(overall['signal_ms']['p50']) == 50
+    assert round(overall['send_ms']['p50']) == 10
+    assert round(overall['broker_ms']['p50']) == 100
+    assert round(overall['total_ms']['p50']) == 160
+
+
+def test_local_rejections_have_no_send_stages(tmp_path):
+    quality = ExecutionQuality(tmp_path / 'trades.sqlite')
+    record = quality.record(_entry(), reason='spread_too_wide')
+    assert record['status'] == 'rejected' and record['sent_at'] is None
+
+    summary = quality.summary()
+    assert summary['status']['rejected'] == 1
+    assert summary['overall']['signal_ms']['count'] == 1
+    assert summary['overall']['broker_ms'] is None and summary['overall']['total_ms'] is None
+
+
+def test_rows_are_shared_across_instances(tmp_path):
+    writer = ExecutionQuality(tmp_path / 'trades.sqlite')
+    reader = ExecutionQuality(tmp_path / 'trades.sqlite')
+    writer.record(_entry(), _outcome(START + 0.06, START + 0.16))
+    writer.record(_entry(START + 60, 'SELL'), _outcome(START + 60.06, START + 60.2, price=99.9))
+
+    recent = reader.summary()['recent']
+    assert [r['side'] for r in recent] == ['SELL', 'BUY']
+    assert recent[0]['observed_at'] == START + 60 and recent[0]['slippage_points'] == 1.0
+
+
+def test_older_tables_gain_the_observed_at_column(tmp_path):
+    path = tmp_path / 'trades.sqlite'
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE executions (id INTEGER PRIMARY KEY, symbol TEXT NOT NULL, strategy TEXT NOT NULL, "
+                     "side TEXT NOT NULL, status TEXT NOT NULL, error TEXT, retcode INTEGER, "
+                     "attempts INTEGER NOT NULL DEFAULT 0, order_ticket INTEGER, bar_close_time REAL, "
+                     "decided_at REAL NOT NULL, sent_at REAL, acked_at REAL, fill_time REAL, signal_price REAL, "
+                     "requested_price REAL, fill_price REAL, slippage_points REAL, volume REAL, session TEXT NOT NULL)")
+        conn.execute("INSERT INTO executions (symbol, strategy, side, status, bar_close_time, decided_at, session) "
+                     "VALUES ('US30m', 'smc', 'BUY', 'rejected', 1.0, 2.0, 'asia')")
+
+    quality = ExecutionQuality(path)
+    quality.record(_entry(), reason='stops_level')
+    assert [r['observed_at'] for r in quality.summary()['recent']] == [START, None]
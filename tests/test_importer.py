@@ -0,0 +1,79 @@
+"""Historical data import and the candle store's day-by-day merge."""
+
+import numpy as np
+
+from src.candle_store import BAR_DTYPE, CandleStore, build_day_index
+from src.importer import MT4_COLUMNS, detect_format, import_files
+
+DAY = 86_400
+# 2024-01-02 00:00 UTC
+START = 1_704_153_600
+
+
+def _bars(times, price):
+    bars = np.zeros(len(times), dtype=BAR_DTYPE)
+    bars['time'] = times
+    for name in ('open', 'high', 'low', 'close'):
+        bars[name] = price
+    return bars
+
+
+def test_detect_format_parses_first_row(tmp_path):
+    mt4 = tmp_path / 'mt4.csv'
+    mt4.write_text('2024.01.02,00:00,37700,37710,37690,37705,120\n')
+    spec = detect_format(str(mt4))
+    assert spec['skip'] == 0 and spec['names'] == MT4_COLUMNS
+
+    plain = tmp_path / 'plain.csv'
+    plain.write_text('1704153600,37700,37710,37690,37705\n')
+    spec = detect_format(str(plain))
+    assert spec['skip'] == 0 and spec['names'][0] == 'time'
+
+    # A header whose first cell starts with digits is still a header
+    header = tmp_path / 'header.csv'
+    header.write_text('2024time,open,high,low,close,volume\n')
+    try:
+        detect_format(str(header))
+    except ValueError as e:
+        assert 'no time/date column' in str(e)
+    else:
+        raise AssertionError('header row was taken for data')
+
+    mt5 = tmp_path / 'mt5.csv'
+    mt5.write_text('<DATE>\t<TIME>\t<OPEN>\t<HIGH>\t<LOW>\t<CLOSE>\t<TICKVOL>\n'
+                   '2024.01.02\t00:00:00\t37700\t37710\t37690\t37705\t120\n')
+    spec = detect_format(str(mt5))
+    assert spec['skip'] > 0 and spec['names'][:2] == ['date', 'clock']
+
+
+def test_merge_keeps_untouched_days_and_rebuilds_index(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.merge('US30m', 'H1', _bars(np.arange(0, 3 * DAY, 3600), 1.0))
+
+    stats = store.merge('US30m', 'H1', _bars([DAY + 1800, DAY + 3600, 5 * DAY], 2.0))
+    assert stats == {'invalid': 0, 'duplicates': 1, 'total': 74, 'added': 2}
+
+    stored = np.array(store.load('US30m', 'H1'))
+    assert (np.diff(stored['time']) > 0).all()
+    assert (store.index('US30m', 'H1') == build_day_index(stored['time'])).all()
+    close = dict(zip(stored['time'].tolist(), stored['close'].tolist()))
+    assert close[DAY + 3600] == 2.0 and close[DAY] == 1.0 and close[5 * DAY] == 2.0
+
+
+def test_import_in_small_batches_later_files_win(tmp_path):
+    # a.csv lines are 26 bytes, so its chunk boundaries fall on line ends
+    first = tmp_path / 'a.csv'
+    second = tmp_path / 'b.csv'
+    first.write_text(''.join(f'{t},100,101,99,100\n' for t in range(START, START + 2 * DAY, 3600)))
+    second.write_text(''.join(f'{t},200,201,199,200\n' for t in range(START + DAY, START + 3 * DAY, 3600)))
+    store = CandleStore(str(tmp_path / 'store'))
+
+    report = import_files([str(first), str(second)], store, symbol='US30m', workers=1,
+                          chunk_bytes=4 * 26, batch_bytes=1024)
+    assert report['timeframe'] == 'H1'
+    assert report['parsed'] == 96
+    assert report['total'] == 72 and report['duplicates'] == 24
+    assert report['gaps'] == 0
+
+    stored = store.load('US30m', 'H1')
+    assert stored['close'][0] == 100 and stored['close'][24] == 200
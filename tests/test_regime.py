@@ -0,0 +1,56 @@
+"""Spread/volatility regime monitor."""
+
+import math
+
+import numpy as np
+
+from src.regime import HIGH, LOW, MEDIUM, RegimeMonitor
+
+RATES_DTYPE = np.dtype([('time', 'i8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8')])
+
+
+def _rates(start, count, bar_range, close=40_000.0):
+    rates = np.zeros(count, dtype=RATES_DTYPE)
+    rates['time'] = start + np.arange(count) * 300
+    rates['close'] = close
+    rates['high'] = close + bar_range / 2
+    rates['low'] = close - bar_range / 2
+    return rates
+
+
+def test_hysteresis_needs_the_margin_to_leave_a_regime():
+    monitor = RegimeMonitor(typical_daily_range=400, low_below=0.7, high_above=1.3, hysteresis=0.05)
+    path = []
+    for ratio in (1.32, 1.36, 1.27, 1.24, 0.67, 0.64, 0.73, 0.76):
+        monitor.regime = monitor._classify(ratio)
+        path.append(monitor.regime)
+    assert path == [MEDIUM, HIGH, HIGH, MEDIUM, MEDIUM, LOW, LOW, MEDIUM]
+
+
+def test_bars_drive_the_regime_and_are_read_once():
+    # Constant closes: realized volatility is 0, so the ATR sets the ratio
+    monitor = RegimeMonitor(typical_daily_range=10 * math.sqrt(276), atr_period=14)
+    assert monitor.on_bars(_rates(0, 20, bar_range=10)) == 20
+    assert monitor.regime == MEDIUM and monitor.state['warm']
+
+    rates = np.concatenate([_rates(0, 20, bar_range=10), _rates(20 * 300, 200, bar_range=20)])
+    assert monitor.on_bars(rates) == 200
+    assert monitor.regime == HIGH
+    assert monitor.on_bars(rates) == 0
+    assert monitor.state['last_bar_time'] == 219 * 300
+
+
+def test_wide_spread_against_typical_and_broker_limit():
+    monitor = RegimeMonitor(typical_daily_range=400, typical_spread=2.0, max_spread_points=500,
+                            spread_ticks=1, wide_spread_ratio=3.0)
+    monitor.on_tick(40_000.0, 40_002.0)
+    assert not monitor.spread_wide
+    monitor.on_tick(40_000.0, 40_007.0)
+    assert monitor.spread_wide and monitor.state['spread_ratio'] == 3.5
+
+    monitor.typical_spread = None
+    monitor.point = 0.01
+    monitor.on_tick(40_000.0, 40_004.0)
+    assert not monitor.spread_wide
+    monitor.on_tick(40_000.0, 40_006.0)
+    assert monitor.spread_wide
@@ -0,0 +1,111 @@
+"""Seqlock snapshot file: fixed region, restarts and reader consistency."""
+
+import struct
+import threading
+
+import pytest
+
+from src.shared_snapshot import HEADER, SEQ_OFFSET, SnapshotReader, SnapshotWriter
+
+
+def test_payload_grows_across_reads_without_remapping(tmp_path):
+    path = tmp_path / 'engine.snapshot'
+    writer = SnapshotWriter(path, capacity=256 * 1024)
+    reader = SnapshotReader(path)
+    assert reader.read() is None
+
+    seq = writer.publish({'n': 1})
+    assert reader.read() == (seq, {'n': 1})
+    assert reader.read() is None
+    mapping = reader._mm
+
+    big = {'rows': list(range(10_000))}
+    seq = writer.publish(big)
+    assert reader.read() == (seq, big)
+    # The region is fixed: neither side resized or remapped
+    assert writer.capacity == 256 * 1024 and reader._mm is mapping
+    assert path.stat().st_size == HEADER.size + 256 * 1024
+    writer.close()
+    reader.close()
+
+
+def test_oversized_payload_is_refused_and_last_version_kept(tmp_path):
+    path = tmp_path / 'engine.snapshot'
+    writer = SnapshotWriter(path, capacity=1024)
+    seq = writer.publish({'n': 1})
+
+    with pytest.raises(ValueError):
+        writer.publish({'rows': list(range(10_000))})
+    assert path.stat().st_size == HEADER.size + 1024
+    assert SnapshotReader(path).read() == (seq, {'n': 1})
+    assert writer.publish({'n': 2}) == seq + 2
+    writer.close()
+
+
+def test_reader_remaps_after_writer_restarts_larger(tmp_path):
+    path = tmp_path / 'engine.snapshot'
+    writer = SnapshotWriter(path, capacity=64)
+    seq = writer.publish({'n': 1})
+    writer.close()
+    reader = SnapshotReader(path)
+    assert reader.read() == (seq, {'n': 1})
+
+    writer = SnapshotWriter(path, capacity=64 * 1024)
+    magic, header_seq, length, capacity, published_at = HEADER.unpack_from(writer._mm, 0)
+    assert header_seq == seq and length > 0 and capacity == 64 * 1024 and published_at > 0
+    big = {'rows': list(range(5_000))}
+    seq = writer.publish(big)
+    assert reader.read() == (seq, big)
+    writer.close()
+    reader.close()
+
+
+def test_reader_retries_while_sequence_is_odd(tmp_path):
+    path = tmp_path / 'engine.snapshot'
+    writer = SnapshotWriter(path, capacity=64)
+    seq = writer.publish({'n': 1})
+    struct.pack_into('<Q', writer._mm, SEQ_OFFSET, seq + 1)
+    assert SnapshotReader(path, max_retries=3).read() is None
+    struct.pack_into('<Q', writer._mm, SEQ_OFFSET, seq)
+    assert SnapshotReader(path).read() == (seq, {'n': 1})
+    writer.close()
+
+
+def test_reopened_writer_continues_the_sequence(tmp_path):
+    path = tmp_path / 'engine.snapshot'
+    writer = SnapshotWriter(path, capacity=64)
+    seq = writer.publish({'n': 1})
+    writer.close()
+
+    # Reopening with a smaller capacity keeps the existing region and version
+    writer = SnapshotWriter(path, capacity=16)
+    assert writer.capacity == 64
+    assert SnapshotReader(path).read() == (seq, {'n': 1})
+    assert writer.publish({'n': 2}) > seq
+    writer.close()
+
+
+def test_concurrent_reads_of_a_growing_payload_are_consistent(tmp_path):
+    path = tmp_path / 'engine.snapshot'
+    writer = SnapshotWriter(path, capacity=64 * 1024)
+    reader = SnapshotReader(path, max_retries=10_000)
+    done = threading.Event()
+
+    def publish():
+        for n in range(1, 400):
+            writer.publish({'n': n, 'rows': [n] * (n * 20)})
+        done.set()
+
+    thread = threading.Thread(target=publish)
+    thread.start()
+    seen = 0
+    while not done.is_set() or seen == 0:
+        result = reader.read()
+        if result is not None:
+            payload = result[1]
+            assert payload['rows'] == [payload['n']] * (payload['n'] * 20)
+            seen += 1
+    thread.join()
+    writer.close()
+    reader.close()
+    assert seen > 0
@@ -0,0 +1,125 @@
+"""Signal history ring buffer."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.shadow import ShadowVariant
+from src.signal_history import SignalHistory
+from src.strategies import SMCStrategy
+
+
+def _result(signal, strength=0.0, reason=None, **details):
+    if reason:
+        details['reason'] = reason
+    return {'signal': signal, 'strength': strength, 'entry_price': 100.0 if signal != 'NONE' else None,
+            'details': details}
+
+
+def _fill(history, bars):
+    for i in range(bars):
+        signal = ('BUY', 'SELL', 'NONE')[i % 3]
+        history.append(i * 300, _result(signal, strength=i, reason='No EMA bias', ob=True), evaluated_at=i)
+
+
+def test_ring_wraps_and_keeps_newest_rows():
+    history = SignalHistory(capacity=8)
+    _fill(history, 20)
+    assert len(history) == 8
+    assert history.total_signals == 14
+
+    rows = history.query(include_none=True, limit=100)
+    assert [r['time'] for r in rows] == [i * 300 for i in range(19, 11, -1)]
+    assert rows[0]['details']['ob'] and rows[0]['details']['reason'] is None
+    assert history.last_signal()['signal'] == 'SELL' and history.last_signal()['time'] == 19 * 300
+
+
+def test_repeated_evaluations_update_the_last_row():
+    history = SignalHistory(capacity=4)
+    for t in range(3):
+        history.append(600, _result('NONE', reason='No EMA bias'), evaluated_at=t)
+    history.append(600, _result('BUY', strength=2.0), evaluated_at=3)
+    rows = history.query(include_none=True)
+    assert [(r['signal'], r['evaluations']) for r in rows] == [('BUY', 1), ('NONE', 3)]
+    assert rows[1]['evaluated_at'] == 2 and rows[1]['details']['reason'] == 'No EMA bias'
+
+
+def test_query_filters_across_both_ring_segments():
+    history = SignalHistory(capacity=8)
+    _fill(history, 13)   # rows 5..12, wrapped
+
+    buys = history.query(signal='BUY')
+    assert [r['time'] for r in buys] == [12 * 300, 9 * 300, 6 * 300]
+    assert [r['time'] for r in history.query(since=7 * 300, until=10 * 300)] == [10 * 300, 9 * 300, 7 * 300]
+    assert [r['time'] for r in history.query(min_strength=10)] == [12 * 300, 10 * 300]
+    assert [r['time'] for r in history.query(limit=2)] == [12 * 300, 10 * 300]
+    assert len(history.query(signal='NONE')) == 3
+
+
+def test_state_round_trip_keeps_newest_rows():
+    history = SignalHistory(capacity=8)
+    _fill(history, 10)
+    restored = SignalHistory(capacity=4)
+    restored.set_state(history.get_state())
+    assert [r['time'] for r in restored.query(include_none=True)] == [i * 300 for i in range(9, 5, -1)]
+    assert restored.total_signals == history.total_signals
+
+
+def test_zero_size_disables_the_ring():
+    strategy = SMCStrategy({'signal_history_size': 0, 'min_candles': 10})
+    assert strategy.signal_history is None
+    bars = np.zeros(20, dtype=[('time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8')])
+    assert strategy.analyze(bars, bars[:5])['signal'] == 'NONE'
+    assert strategy.get_status()['total_signals'] == 0
+    strategy.set_state(strategy.get_state())
+
+    # Shadow variants count their own signals
+    assert ShadowVariant('v', {}, {}).strategy.signal_history is None
+
+
+def test_file_backed_ring_is_readable_from_another_mapping(tmp_path):
+    path = tmp_path / 'engine.signals16'
+    writer = SignalHistory(16, path)
+    _fill(writer, 40)
+
+    reader = SignalHistory.open(path)
+    assert reader.capacity == 16 and len(reader) == 16
+    assert reader.total_signals == writer.total_signals
+    assert reader.query(include_none=True, limit=16) == writer.query(include_none=True, limit=16)
+
+    # Later writes show through the existing mapping
+    writer.append(10_000_000, _result('SELL', 90), 2.0)
+    assert reader.last_signal()['time'] == 10_000_000
+
+    # A restarted writer reuses the file and its rows
+    assert SignalHistory(16, path).query(limit=1) == reader.query(limit=1)
+
+
+def test_reader_never_sees_a_half_written_row(tmp_path):
+    path = tmp_path / 'engine.signals64'
+    writer = SignalHistory(64, path)
+    reader = SignalHistory.open(path)
+    done = threading.Event()
+
+    def write():
+        for i in range(3000):
+            writer.append(1000 + i, _result('BUY', i % 100), float(i))
+        done.set()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    while not done.is_set():
+        rows = reader.query(limit=64)
+        # Each row was written as a unit: its strength matches its bar time
+        assert all(r['strength'] == (r['time'] - 1000) % 100 for r in rows)
+        assert [r['time'] for r in rows] == sorted((r['time'] for r in rows), reverse=True)
+    thread.join()
+    assert reader.total_signals == 3000
+
+
+def test_open_rejects_other_files(tmp_path):
+    path = tmp_path / 'other'
+    path.write_bytes(b'x' * 100)
+    with pytest.raises(ValueError):
+        SignalHistory.open(path)
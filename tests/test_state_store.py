@@ -0,0 +1,28 @@
+"""Warm-state snapshot files."""
+
+from src.state_store import Snapshotter, load_state
+
+
+def test_snapshotter_rate_limits_unless_forced(tmp_path):
+    path = tmp_path / 'executor.state'
+    snapshotter = Snapshotter(path, interval_seconds=3600)
+
+    assert snapshotter.maybe_save(lambda: {'n': 1})
+    assert not snapshotter.maybe_save(lambda: {'n': 2})
+    assert load_state(path)['n'] == 1
+
+    assert snapshotter.maybe_save(lambda: {'n': 3}, force=True)
+    assert load_state(path)['n'] == 3
+
+
+def test_disabled_snapshotter_never_saves():
+    assert not Snapshotter(None).maybe_save(lambda: {'n': 1}, force=True)
+
+
+def test_load_state_rejects_stale_and_corrupt_files(tmp_path):
+    path = tmp_path / 'dashboard.state'
+    Snapshotter(path).maybe_save(lambda: {'n': 1})
+    assert load_state(path, max_age_seconds=-1) is None
+
+    path.write_bytes(b'not a snapshot')
+    assert load_state(path) is None
@@ -0,0 +1,93 @@
+"""Binary tick recorder: round trip, daily files and range replay."""
+
+import numpy as np
+import pytest
+
+from src.config import BotConfig
+from src.tick_recorder import MS_PER_DAY, TICK_DTYPE, TickReader, TickRecorder, start_from_config
+
+# 2024-01-02 00:00 UTC in milliseconds
+START_MSC = 1_704_153_600_000
+
+
+def _ticks(start_msc, n, step_ms=250):
+    ticks = np.zeros(n, dtype=TICK_DTYPE)
+    ticks['time_msc'] = start_msc + np.arange(n) * step_ms
+    ticks['bid'] = 40_000 + np.arange(n) * 0.5
+    ticks['ask'] = ticks['bid'] + 2.0
+    ticks['volume'] = 1.0
+    return ticks
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_recorded_ticks_read_back(tmp_path, compress):
+    recorder = TickRecorder(str(tmp_path), 'US30m', compress=compress)
+    ticks = _ticks(START_MSC, 1000)
+    # Mixed single ticks and bulk arrays, queued out of order
+    recorder.record_array(ticks[500:])
+    for tick in ticks[:500]:
+        recorder.record(int(tick['time_msc']), float(tick['bid']), float(tick['ask']), float(tick['volume']))
+    recorder.flush()
+
+    reader = TickReader(str(tmp_path), 'US30m')
+    assert reader.days() == ['2024-01-02']
+    assert np.array_equal(reader.load_day('2024-01-02'), ticks)
+    assert recorder.written == 1000 and recorder.dropped == 0
+
+
+def test_batches_split_at_utc_midnight(tmp_path):
+    recorder = TickRecorder(str(tmp_path), 'US30m')
+    ticks = _ticks(START_MSC + MS_PER_DAY - 1000, 8)
+    recorder.record_array(ticks)
+    recorder.flush()
+
+    reader = TickReader(str(tmp_path), 'US30m')
+    assert reader.days() == ['2024-01-02', '2024-01-03']
+    assert np.array_equal(reader.load_day('2024-01-02'), ticks[:4])
+    assert np.array_equal(reader.load_day('2024-01-03'), ticks[4:])
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_range_replay_uses_block_index(tmp_path, compress):
+    recorder = TickRecorder(str(tmp_path), 'US30m', compress=compress)
+    ticks = _ticks(START_MSC, 4000)
+    for block in np.split(ticks, 8):
+        recorder.record_array(block)
+        recorder.flush()
+
+    reader = TickReader(str(tmp_path), 'US30m')
+    assert len(reader.index('2024-01-02')) == 8
+
+    start, end = int(ticks['time_msc'][1234]), int(ticks['time_msc'][2345])
+    blocks = list(reader.iter_blocks('2024-01-02', start, end))
+    assert len(blocks) == 3
+    assert np.array_equal(np.concatenate(blocks), ticks[1234:2346])
+
+    bars = list(reader.iter_bars('2024-01-02', seconds=300))
+    assert [b['time'] for b in bars] == [START_MSC // 1000 + 300 * i for i in range(4)]
+    assert sum(b['tick_volume'] for b in bars) == 4000
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    recorder = TickRecorder(str(tmp_path), 'US30m', max_queue=10)
+    recorder.record_array(_ticks(START_MSC, 8))
+    recorder.record_array(_ticks(START_MSC, 5))
+    recorder.record(START_MSC, 1.0, 2.0)
+    recorder.record(START_MSC, 1.0, 2.0)
+    recorder.record(START_MSC, 1.0, 2.0)
+    assert recorder.dropped == 6
+    assert recorder.get_status()['queued'] == 10
+
+
+def test_start_from_config_reads_typed_section(tmp_path):
+    assert start_from_config(BotConfig.parse({})) is None
+
+    config = BotConfig.parse({'broker': {'symbol': 'US30m'},
+                              'data': {'tick_recorder': {'enabled': True, 'directory': str(tmp_path),
+                                                         'compress': True, 'flush_seconds': 60}}})
+    recorder = start_from_config(config)
+    try:
+        assert recorder.path == tmp_path / 'US30m'
+        assert recorder.compress and recorder.flush_seconds == 60
+    finally:
+        recorder.stop()
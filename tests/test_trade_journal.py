@@ -0,0 +1,99 @@
+"""Trade journal: keyset paging, hourly rollups and MT5 deal sync."""
+
+import time
+from types import SimpleNamespace
+
+from src.trade_journal import TradeJournal, sync_mt5_deals
+
+# 2024-01-02 00:00 UTC
+START = 1_704_153_600
+
+
+def _trade(i, close_time, profit, strategy='smc', **extra):
+    return {'position_id': i, 'symbol': 'US30m', 'strategy': strategy, 'side': 'BUY', 'volume': 0.1,
+            'open_time': close_time - 600, 'close_time': close_time, 'open_price': 100.0,
+            'close_price': 100.0 + profit, 'sl': 99.0, 'profit': profit, **extra}
+
+
+def test_keyset_pages_cover_every_trade_once(tmp_path):
+    journal = TradeJournal(tmp_path / 'trades.sqlite')
+    # Several trades share a close time, so the cursor needs the id tie-break
+    for i in range(23):
+        assert journal.record(_trade(i, START + (i // 3) * 60, 1.0))
+    assert not journal.record(_trade(0, START, 1.0))
+
+    seen, cursor = [], None
+    while True:
+        page = journal.page(limit=5, cursor=cursor)
+        seen.extend(t['position_id'] for t in page['trades'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert sorted(seen) == list(range(23))
+    assert len(seen) == len(set(seen))
+    assert seen[0] == 22
+
+    filtered = journal.page(limit=50, strategy='other')
+    assert filtered == {'trades': [], 'next_cursor': None}
+
+
+def test_rollup_summary_by_day_hour_and_session(tmp_path):
+    journal = TradeJournal(tmp_path / 'trades.sqlite')
+    journal.record(_trade(1, START + 2 * 3600, 2.0))                     # ASIA
+    journal.record(_trade(2, START + 8 * 3600, -1.0, commission=-0.5))   # LONDON
+    journal.record(_trade(3, START + 86400 + 14 * 3600, 3.0))            # NEW_YORK, next day
+
+    by_day = journal.summary('day')
+    assert [g['key'] for g in by_day['groups']] == ['2024-01-02', '2024-01-03']
+    assert by_day['groups'][0]['trades'] == 2 and by_day['groups'][0]['profit'] == 0.5
+    assert by_day['total']['trades'] == 3 and by_day['total']['wins'] == 2
+    assert by_day['total']['profit_factor'] == round(5.0 / 1.5, 2)
+    assert by_day['total']['avg_r'] == round((2.0 - 1.0 + 3.0) / 3, 3)
+
+    by_session = journal.summary('session')
+    assert [g['key'] for g in by_session['groups']] == ['ASIA', 'LONDON', 'NEW_YORK']
+    assert [g['key'] for g in journal.summary('hour')['groups']] == [2, 8, 14]
+    assert journal.summary('day', since=START + 86400)['total']['trades'] == 1
+
+
+class _StubMT5:
+    DEAL_ENTRY_IN, DEAL_ENTRY_OUT, DEAL_ENTRY_OUT_BY = 0, 1, 3
+    DEAL_TYPE_BUY = 0
+
+    def __init__(self, deals, offset):
+        self.deals = deals
+        self.offset = offset
+        self.order_lookups = []
+
+    def symbol_info_tick(self, symbol):
+        return SimpleNamespace(time=int(time.time() + self.offset))
+
+    def history_deals_get(self, start, end):
+        return self.deals
+
+    def history_orders_get(self, position):
+        self.order_lookups.append(position)
+        return [SimpleNamespace(sl=99.0, tp=105.0)]
+
+
+def _deal(position_id, entry, server_time, price, profit=0.0):
+    return SimpleNamespace(position_id=position_id, symbol='US30m', magic=7, entry=entry, type=0,
+                           time=server_time, price=price, volume=0.1, profit=profit,
+                           commission=0.0, swap=0.0)
+
+
+def test_sync_stores_utc_and_skips_journaled_positions(tmp_path):
+    journal = TradeJournal(tmp_path / 'trades.sqlite')
+    offset = 2 * 3600
+    open_server, close_server = START + 12 * 3600, START + 13 * 3600
+    mt5 = _StubMT5([_deal(1, 0, open_server, 100.0), _deal(1, 1, close_server, 102.0, 2.0)], offset)
+
+    assert sync_mt5_deals(mt5, journal, 'US30m', magic=7) == 1
+    trade = journal.page()['trades'][0]
+    assert trade['open_time'] == open_server - offset
+    assert trade['close_time'] == close_server - offset
+    assert trade['session'] == 'LONDON'
+    assert mt5.order_lookups == [1]
+
+    assert sync_mt5_deals(mt5, journal, 'US30m', magic=7) == 0
+    assert mt5.order_lookups == [1]
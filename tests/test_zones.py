@@ -0,0 +1,137 @@
+"""ZoneBook lifecycle and SMCStrategy zone registration."""
+
+import numpy as np
+import pytest
+
+from src.strategies import SMCStrategy
+from src.strategies.bars import Bars
+from src.zones import ZoneBook
+
+
+def test_query_matches_intersecting_zones_only():
+    book = ZoneBook()
+    book.add('OB', 'bullish', 100, 110, created_time=1)
+    book.add('FVG', 'bearish', 200, 205, created_time=2)
+    book.add('OB', 'bearish', 108, 130, created_time=3)
+
+    assert {z.created_time for z in book.query(105, 109)} == {1, 3}
+    assert [z.created_time for z in book.query(115, 120)] == [3]
+    assert [z.kind for z in book.query(100, 300, kind='FVG')] == ['FVG']
+    assert book.query(150, 190) == []
+
+
+def test_add_same_zone_refreshes_bounds():
+    book = ZoneBook()
+    book.add('OB', 'bullish', 100, 110, created_time=1)
+    book.add('OB', 'bullish', 101, 112, created_time=1)
+
+    assert len(book) == 1
+    assert book.query(111, 111)[0].low == 101
+    assert book.query(100, 100.5) == []
+
+
+def test_update_counts_touches_once_per_bar_and_fills():
+    book = ZoneBook()
+    book.add('OB', 'bullish', 100, 110, created_time=1)
+
+    # Bullish zones fill from above
+    touched = book.update(bar_time=2, high=115, low=107.5)
+    assert len(touched) == 1
+    zone = touched[0]
+    assert zone.touches == 1
+    assert zone.fill_pct == pytest.approx(0.25)
+
+    # Same bar again (forming bar re-polled): no new touch, fill only deepens
+    book.update(bar_time=2, high=115, low=108)
+    assert zone.touches == 1
+    assert zone.fill_pct == pytest.approx(0.25)
+
+    book.update(bar_time=3, high=106, low=99)
+    assert zone.touches == 2
+    assert len(book) == 0
+
+
+def test_zone_not_touched_by_its_own_bar():
+    book = ZoneBook()
+    book.add('FVG', 'bearish', 100, 110, created_time=5)
+    assert book.update(bar_time=5, high=105, low=95) == []
+
+
+def test_expire_and_compact():
+    book = ZoneBook(max_age_seconds=100, max_zones=3)
+    for t in range(5):
+        book.add('OB', 'bullish', 100 + t, 101 + t, created_time=t * 10)
+    # Capped at max_zones, oldest dropped first
+    assert [z.created_time for z in book.active()] == [20, 30, 40]
+
+    book.expire(now=125)
+    assert [z.created_time for z in book.active()] == [30, 40]
+
+
+def test_width_bound_shrinks_when_widest_zone_goes():
+    book = ZoneBook(max_age_seconds=100)
+    book.add('OB', 'bullish', 0, 1000, created_time=0)
+    book.add('FVG', 'bearish', 500, 510, created_time=50)
+    assert book._max_width == 1000
+
+    book.expire(now=120)
+    assert [z.created_time for z in book.active()] == [50]
+    assert book._max_width == 10
+    assert book.query(505, 506)[0].created_time == 50
+
+
+def test_out_of_order_and_filled_zones_keep_age_order():
+    book = ZoneBook(max_age_seconds=100)
+    book.add('OB', 'bullish', 100, 110, created_time=30)
+    book.add('OB', 'bullish', 200, 210, created_time=10)
+    book.add('FVG', 'bullish', 300, 310, created_time=20)
+    assert [z.created_time for z in book.active()] == [10, 20, 30]
+
+    # Filled zone leaves the book at once; expiry later skips it
+    book.update(bar_time=40, high=320, low=299)
+    assert [z.created_time for z in book.active()] == [10, 30]
+    book.expire(now=125)
+    assert [z.created_time for z in book.active()] == [30]
+    version = book.version
+    book.expire(now=125)
+    assert book.version == version
+
+
+def test_state_round_trip():
+    book = ZoneBook()
+    book.add('OB', 'bullish', 100, 110, created_time=1)
+    book.update(bar_time=2, high=115, low=105)
+
+    restored = ZoneBook()
+    restored.set_state(book.get_state())
+    assert [z.to_dict() for z in restored.active()] == [z.to_dict() for z in book.active()]
+
+
+def _bars(n, timed=True, start=0):
+    # Rising closes; the last two bars form a bullish OB (bullish bar, then a lower close)
+    close = np.linspace(100, 200, n)
+    open_ = close - 1
+    close[-1] = close[-2] - 2
+    open_[-1] = close[-2]
+    time = np.arange(start, start + n * 300, 300, dtype=float) if timed else np.arange(n)
+    return Bars(time, open_, close + 1, open_ - 1, close, timed=timed)
+
+
+def test_strategy_registers_zones_from_last_closed_bar():
+    strategy = SMCStrategy({'min_candles': 10})
+    bias = _bars(20, start=-10**6)
+    entry = _bars(30)
+
+    strategy.analyze(entry, bias, forming=True)
+    # The OB pattern completes on the forming bar, so nothing is registered yet
+    assert strategy.zone_book.active(kind='OB') == []
+
+    strategy.analyze(entry, bias)
+    zones = strategy.zone_book.active(kind='OB')
+    assert [z.created_time for z in zones] == [float(entry.time[-1])]
+
+
+def test_strategy_skips_zone_book_without_bar_times():
+    strategy = SMCStrategy({'min_candles': 10})
+    strategy.analyze(_bars(30, timed=False), _bars(20))
+    assert len(strategy.zone_book) == 0